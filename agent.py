@@ -1,68 +1,127 @@
 import random
 from environment import Grid, Coord, manhattan
-from typing import List, Dict, Optional, Tuple, Set 
-import heapq
+from danger import DangerMap
+from dstar import DStarLite
+from lookahead import LookaheadPlanner
+from jps import JumpPointSearch
+from telemetry import SearchStats
+from pathcache import PathCache
+from typing import Callable, List, Optional, Set, TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from spatial import SpatialIndex
+    from agentstore import AgentStore
+    from hpa import HPAPlanner
+
+
+HUMAN_PLANNERS = ("astar", "dstar", "hpa", "lookahead", "jps")
+
+
+class Agent:
+    """Shared position handling: every position change is reported to the owning SpatialIndex.
+
+    Once attached to an AgentStore (Game does this), the agent is a lightweight handle and its
+    position lives in the store's arrays instead of on the object.
+    """
+    __slots__ = ("grid", "_pos", "_index", "_seq", "_store", "_slot")
+    kind = "agent"
 
-class Human:
     def __init__(self, pos: Coord, grid: Grid):
-        self.pos = pos
+        self._index = None # Set by SpatialIndex.add
+        self._store: Optional["AgentStore"] = None # Set by AgentStore.attach
+        self._slot = -1
+        self._pos = pos
         self.grid = grid
+
+    @property
+    def pos(self) -> Coord:
+        if self._store is not None:
+            return self._store.get(self._slot)
+        return self._pos
+
+    @pos.setter
+    def pos(self, new_pos: Coord):
+        if self._store is not None:
+            old_pos = self._store.get(self._slot)
+            self._store.set(self._slot, new_pos)
+        else:
+            old_pos = self._pos
+            self._pos = new_pos
+        if self._index is not None:
+            self._index.move(self, old_pos, new_pos)
+
+
+class Human(Agent):
+    __slots__ = ("path", "planner", "_dstar", "lookahead")
+    kind = "human"
+
+    def __init__(self, pos: Coord, grid: Grid, planner: str = "astar"):
+        if planner not in HUMAN_PLANNERS:
+            raise ValueError(f"Unknown human planner '{planner}'. Expected one of {HUMAN_PLANNERS}.")
+        super().__init__(pos, grid)
         self.path: List[Coord] = [] # Stores the full calculated path for visualization
+        # "astar": full search every turn. "dstar": incremental D* Lite that keeps its state between turns.
+        # "hpa": hierarchical search over the grid's cluster graph, for very large maps.
+        # "lookahead": simulates its own moves against predicted zombie replies, several turns deep.
+        # "jps": Jump Point Search, falling back to A* when the route it finds crosses danger.
+        self.planner = planner
+        self._dstar: Optional[DStarLite] = None
+        # Built on first use; replace it to change its depth or time budget
+        self.lookahead: Optional[LookaheadPlanner] = None
+
+    def _incremental_path(self, zombies: List["Zombie"], danger: Optional[DangerMap] = None) -> Optional[List[Coord]]:
+        """D* Lite path to the cheapest safe zone, repairing only cells whose danger changed since last turn."""
+        if not self.grid.safe_zones:
+            return None
+        if danger is None:
+            danger = DangerMap(self.grid, [z.pos for z in zombies])
+
+        if self._dstar is None or self._dstar.grid is not self.grid:
+            self._dstar = DStarLite(self.grid, self.pos, self.grid.safe_zones)
+        self._dstar.update(self.pos, danger.penalties)
+        return self._dstar.path()
+
+    def _hierarchical_path(self, goal: Coord, zombies: List["Zombie"],
+                           danger: Optional[DangerMap] = None) -> Optional[List[Coord]]:
+        """HPA* path to goal; danger penalties steer the refinement inside each cluster."""
+        if danger is None:
+            danger = DangerMap(self.grid, [z.pos for z in zombies])
+        return self.grid.hierarchy().find_path(self.pos, goal, danger.penalties)
 
-    def _a_star_path(self, goal: Coord, zombies: List["Zombie"]) -> Optional[List[Coord]]:
+    def _a_star_path(self, goal: Coord, zombies: List["Zombie"], danger: Optional[DangerMap] = None,
+                     stats: Optional[SearchStats] = None) -> Optional[List[Coord]]:
         """A* pathfinding from self.pos to goal, returning the full path, prioritizing paths away from zombies."""
         if not self.grid.safe_zones:
             return None
+
+        # Danger penalties are computed once per turn, not once per expanded node
+        if danger is None:
+            danger = DangerMap(self.grid, [z.pos for z in zombies])
+        penalties = danger.penalties
         
-        # Ensure goal is the nearest safe zone
-        nearest_safe = min(self.grid.safe_zones, key=lambda s: manhattan(s, self.pos))
-        goal = nearest_safe
-        
+        # Ensure goal is the safe zone nearest by path length (from the grid's cached distance field)
+        goal = self.grid.nearest_safe_zone(self.pos)
+        if goal is None:
+            return None # No safe zone is reachable: skip the search that would fail anyway
+
         if self.pos == goal:
             return []
 
-        g_cost: Dict[Coord, int] = {self.pos: 0} # Actual distance cost (unpenalized)
-        came_from: Dict[Coord, Optional[Coord]] = {self.pos: None}
-        priority_queue: List[Tuple[int, Coord]] = [(manhattan(self.pos, goal), self.pos)]
-
-        while priority_queue:
-            _, current = heapq.heappop(priority_queue)
-
-            if current == goal:
-                path: List[Coord] = []
-                while came_from[current] is not None:
-                    path.append(current)
-                    current = came_from[current]
-                # Return the path in order from next step to goal (excluding current position)
-                return path[::-1] 
-
-            for neighbor in self.grid.neighbors(current):
-                if not self.grid.passable(neighbor):
-                    continue
-
-                # 1. ACTUAL PATH COST (G-Cost): Cost from start (current g + 1)
-                new_g = g_cost[current] + 1
-                
-                # 2. DANGER PENALTY (used for F-Cost priority only)
-                # Adds a heavy penalty for neighboring a zombie (Manhattan distance <= 1)
-                danger_penalty_magnitude = sum(1 for z in zombies if manhattan(neighbor, z.pos) <= 1)
-                
-                # 3. TOTAL PRIORITY COST (F-Cost) = G-Cost + Heuristic + Penalty
-                f_score_priority = new_g + manhattan(neighbor, goal) + danger_penalty_magnitude * 1000
-
-                # Check if this path is better (A* optimization)
-                # IMPORTANT: Use UNPENALIZED new_g for comparison against g_cost
-                if neighbor not in g_cost or new_g < g_cost[neighbor]:
-                    # Update g_cost using the UNPENALIZED cost
-                    g_cost[neighbor] = new_g
-                    came_from[neighbor] = current
-                    # Push to queue using the PENALIZED F-Cost for prioritization
-                    heapq.heappush(priority_queue, (f_score_priority, neighbor))
-
-        return None # No path found
-
-    def move(self, direction: str, zombies: List["Zombie"] = []):
+        # The distance field is the exact remaining distance on single-zone maps
+        heuristic = self.grid.heuristic_to_safety(goal)
+
+        if self.planner == "jps":
+            # JPS only handles uniform costs: keep its route unless it passes a penalized cell
+            path = JumpPointSearch(self.grid, goal).search(self.pos, heuristic, stats)
+            if path is None or not any(cell in penalties for cell in path):
+                return path
+
+        # Danger penalties (by default 1000 per zombie within distance 1) raise a cell's priority
+        # only; the g-cost stays the unpenalized step count. Returns next step .. goal, or None.
+        return self.grid.search_engine().find_path(self.pos, goal, heuristic, penalties, stats=stats).path
+
+    def move(self, direction: str, zombies: List["Zombie"] = [], danger: Optional[DangerMap] = None,
+             stats: Optional[SearchStats] = None):
         x, y = self.pos
         
         if direction == "up":
@@ -78,12 +137,21 @@ class Human:
             new_pos = (x + 1, y)
             self.path = [] # Clear path on manual move
         elif direction == "auto":
-            # 1. Determine goal (nearest safe zone)
-            nearest_safe = min(self.grid.safe_zones, key=lambda s: manhattan(s, self.pos)) if self.grid.safe_zones else self.pos
+            # 1. Determine goal (nearest safe zone by path length)
+            nearest_safe = self.grid.nearest_safe_zone(self.pos) if self.grid.safe_zones else None
             
             # CRITICAL FIX: RECALCULATE PATH EVERY TURN. 
             # This ensures the human reacts to the latest zombie positions.
-            self.path = self._a_star_path(nearest_safe, zombies)
+            if self.planner == "dstar":
+                self.path = self._incremental_path(zombies, danger)
+            elif self.planner == "hpa":
+                self.path = self._hierarchical_path(nearest_safe, zombies, danger) if nearest_safe else None
+            elif self.planner == "lookahead":
+                if self.lookahead is None or self.lookahead.grid is not self.grid:
+                    self.lookahead = LookaheadPlanner(self.grid)
+                self.path = self.lookahead.plan(self.pos, (z.pos for z in zombies), stats)
+            else:
+                self.path = self._a_star_path(nearest_safe, zombies, danger, stats)
             
             # 2. Execute move along the path
             if self.path:
@@ -102,56 +170,90 @@ class Human:
             self.pos = new_pos
 
 
-class Zombie:
+class Zombie(Agent):
+    __slots__ = ("path_cache", "search")
+    kind = "zombie"
+
     def __init__(self, pos: Coord, grid: Grid):
-        self.pos = pos
-        self.grid = grid
+        super().__init__(pos, grid)
+        self.path_cache: Optional[PathCache] = None # Shared LRU path cache, assigned by Game when enabled
+        self.search = "astar" # "astar" or "jps" (Jump Point Search), assigned by Game
 
     # MODIFIED: Accepts occupied_cells to prevent collision
-    def a_star_search(self, start: Coord, goal: Coord, occupied_cells: Set[Coord]) -> Optional[Coord]:
+    def a_star_search(self, start: Coord, goal: Coord, occupied_cells: Set[Coord],
+                      stats: Optional[SearchStats] = None) -> Optional[Coord]:
         """A* pathfinding towards the goal (human), avoiding occupied cells."""
-        g_cost: Dict[Coord, int] = {start: 0}
-        came_from: Dict[Coord, Optional[Coord]] = {start: None}
-        priority_queue: List[Tuple[int, Coord]] = [(manhattan(start, goal), start)]
-        
+        cache = self.path_cache
+        if cache is not None:
+            cached_step = cache.next_step(start, goal, self.grid.version, occupied_cells)
+            if cached_step is not None:
+                return cached_step
+
+        heuristic = self.grid.heuristic_to(goal)
+        if self.search == "jps":
+            route = JumpPointSearch(self.grid, goal, occupied_cells).search(start, heuristic, stats)
+            if route:
+                if cache is not None and self._unobstructed(route, start, heuristic, occupied_cells):
+                    cache.store(start, route, goal, self.grid.version)
+                return route[0]
+            if route is not None:
+                return None # Already on the goal, like A* below
+
+            if stats is not None:
+                stats.fallback = True
+            return self._random_step(start, occupied_cells)
+
+        # Cells already claimed by a higher-priority zombie are walls for this search (the goal excepted)
+        route = self.grid.search_engine().find_path(start, goal, heuristic, blocked=occupied_cells, stats=stats).path
+        if route is not None:
+            if cache is not None and self._unobstructed(route, start, heuristic, occupied_cells):
+                # Keep the whole route, not just its first step, for later turns and other zombies
+                cache.store(start, route, goal, self.grid.version)
+            return route[0] if route else None
 
-        while priority_queue:
-            _, current = heapq.heappop(priority_queue)
-            if current == goal:
-                path: List[Coord] = []
-                while came_from[current] is not None:
-                    path.append(current)
-                    current = came_from[current]
-                return path[-1] if path else None
-
-            for neighbor in self.grid.neighbors(current):
-                if not self.grid.passable(neighbor):
-                    continue
-                
-                # NEW CHECK: Prevent movement to a cell already claimed by a higher-priority zombie
-                if neighbor in occupied_cells and neighbor != goal: 
-                    continue
-
-                new_g = g_cost[current] + 1
-                if neighbor not in g_cost or new_g < g_cost[neighbor]:
-                    g_cost[neighbor] = new_g
-                    f_cost = new_g + manhattan(neighbor, goal)
-                    came_from[neighbor] = current
-                    heapq.heappush(priority_queue, (f_cost, neighbor))
+        if stats is not None:
+            stats.fallback = True
+        return self._random_step(start, occupied_cells)
 
+    @staticmethod
+    def _unobstructed(route: List[Coord], start: Coord, heuristic: Callable[[Coord], int],
+                      occupied_cells: Set[Coord]) -> bool:
+        """Whether a route searched around this turn's claims is still a true shortest path.
+
+        Only those may go into the path cache, which replays them on later turns. A route is
+        certainly shortest if nothing was blocked, or if it is as short as the (admissible)
+        heuristic's lower bound; otherwise it may be a detour around a claimed cell.
+        """
+        return not occupied_cells or len(route) == heuristic(start)
+
+    def _random_step(self, start: Coord, occupied_cells: Set[Coord]) -> Coord:
+        """Fallback move when no path is found: a random free neighbor, or stay put."""
         valid_moves = [n for n in self.grid.neighbors(start) if self.grid.passable(n)]
         # Filter random moves to avoid occupied cells
         valid_moves = [n for n in valid_moves if n not in occupied_cells] 
         return random.choice(valid_moves) if valid_moves else start
 
     # MODIFIED: Accepts occupied_cells set
-    def chase(self, humans: List[Human], occupied_cells: Set[Coord]) -> Coord:
-        """Chase nearest human, avoiding cells in occupied_cells."""
+    def chase(self, humans: List[Human], occupied_cells: Set[Coord], index: Optional["SpatialIndex"] = None,
+              stats: Optional[SearchStats] = None, hpa: Optional["HPAPlanner"] = None) -> Coord:
+        """Chase nearest human, avoiding cells in occupied_cells (with HPA* instead of A* if hpa is given)."""
         if not humans:
             return self.pos
-        nearest = min(humans, key=lambda h: manhattan(h.pos, self.pos))
+        if index is not None:
+            # Bucketed ring search instead of scanning every human
+            nearest = index.nearest(self.pos, "human")
+        else:
+            nearest = min(humans, key=lambda h: manhattan(h.pos, self.pos))
+        if hpa is not None:
+            # Coarse route over the cluster graph; only its first leg is refined
+            next_step = hpa.next_step(self.pos, nearest.pos, occupied_cells)
+            if next_step is None:
+                if stats is not None:
+                    stats.fallback = True
+                next_step = self._random_step(self.pos, occupied_cells)
+            return next_step
         # Pass occupied_cells to A* search
-        next_step = self.a_star_search(self.pos, nearest.pos, occupied_cells)
+        next_step = self.a_star_search(self.pos, nearest.pos, occupied_cells, stats)
         return next_step if next_step else self.pos
 
     def move_to(self, pos: Coord):
@@ -0,0 +1,185 @@
+import numpy as np
+from environment import Grid, ArrayGrid, Coord
+from typing import Optional, Tuple
+
+HUMAN = 0
+ZOMBIE = 1
+KIND_CODES = {"human": HUMAN, "zombie": ZOMBIE}
+
+# Neighbor offsets in Grid.neighbors order (right, left, down, up)
+DX = np.array([1, -1, 0, 0], dtype=np.int64)
+DY = np.array([0, 0, 1, -1], dtype=np.int64)
+UNREACHABLE = np.iinfo(np.int32).max
+CLAIM_ROUNDS = 5 # A zombie that loses a contested cell retries against its remaining neighbors
+
+
+def grid_masks(grid: Grid) -> Tuple[np.ndarray, np.ndarray]:
+    """Flat (passable, safe) boolean arrays indexed by cell id."""
+    if isinstance(grid, ArrayGrid):
+        cells = np.frombuffer(grid.cells, dtype=np.uint8)
+        return (cells & ArrayGrid.OBSTACLE) == 0, (cells & ArrayGrid.SAFE) != 0
+    size = grid.width * grid.height
+    passable = np.ones(size, dtype=bool)
+    safe = np.zeros(size, dtype=bool)
+    for mask, cells, value in ((passable, grid.obstacles, False), (safe, grid.safe_zones, True)):
+        inside = [y * grid.width + x for x, y in cells if 0 <= x < grid.width and 0 <= y < grid.height]
+        mask[np.array(inside, dtype=np.intp)] = value
+    return passable, safe
+
+
+class AgentStore:
+    """Struct-of-arrays agent storage: positions in NumPy int arrays plus kind and alive masks.
+
+    Human and Zombie objects become lightweight `__slots__` handles onto a slot of this store,
+    so bulk operations (zombie movement, catch detection, victory checks, rendering) can run
+    over the arrays without touching per-agent Python objects. Slots are never reused, so a
+    handle's slot stays valid for the whole game.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.size = 0
+        self.xs = np.zeros(capacity, dtype=np.int32)
+        self.ys = np.zeros(capacity, dtype=np.int32)
+        self.kinds = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def _grow(self, needed: int):
+        capacity = len(self.xs)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name in ("xs", "ys", "kinds", "alive"):
+            old = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=old.dtype)
+            grown[:self.size] = old[:self.size]
+            setattr(self, name, grown)
+
+    def add(self, kind: str, pos: Coord) -> int:
+        """Allocates a slot for a new agent and returns it."""
+        self._grow(self.size + 1)
+        slot = self.size
+        self.xs[slot], self.ys[slot] = pos
+        self.kinds[slot] = KIND_CODES[kind]
+        self.alive[slot] = True
+        self.size += 1
+        return slot
+
+    def add_many(self, kind: str, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Allocates slots for many agents at once; returns their slot ids."""
+        count = len(xs)
+        self._grow(self.size + count)
+        slots = np.arange(self.size, self.size + count)
+        self.xs[slots] = xs
+        self.ys[slots] = ys
+        self.kinds[slots] = KIND_CODES[kind]
+        self.alive[slots] = True
+        self.size += count
+        return slots
+
+    def attach(self, agent):
+        """Moves an agent's position into the store and turns the agent into a handle on it."""
+        agent._slot = self.add(agent.kind, agent._pos)
+        agent._store = self
+
+    def kill(self, slot: int):
+        self.alive[slot] = False
+
+    def get(self, slot: int) -> Coord:
+        return (int(self.xs[slot]), int(self.ys[slot]))
+
+    def set(self, slot: int, pos: Coord):
+        self.xs[slot], self.ys[slot] = pos
+
+    def slots(self, kind: str) -> np.ndarray:
+        """Slot ids of all live agents of a kind, in allocation order."""
+        n = self.size
+        return np.flatnonzero(self.alive[:n] & (self.kinds[:n] == KIND_CODES[kind]))
+
+    def positions(self, kind: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(xs, ys) arrays of all live agents of a kind."""
+        slots = self.slots(kind)
+        return self.xs[slots], self.ys[slots]
+
+    def count(self, kind: str) -> int:
+        return len(self.slots(kind))
+
+    def cell_ids(self, slots: np.ndarray, width: int) -> np.ndarray:
+        return self.ys[slots].astype(np.int64) * width + self.xs[slots]
+
+    def step_downhill(self, slots: np.ndarray, dist: np.ndarray, passable: np.ndarray, width: int, height: int,
+                      rng: np.random.Generator, targets: Optional[np.ndarray] = None) -> np.ndarray:
+        """One flow-field step for every slot at once: each zombie moves to a neighbor closer on `dist`.
+
+        Neighbors equally close on `dist` are broken toward the slot's entry in `targets` (the
+        cell id of the human it chases, if given) by closing the larger of the x and y gaps
+        first, then at random with `rng`. A fixed neighbor order would let a human stepping back
+        and forth between two cells drag the zombies into the same two-cell shuffle forever.
+
+        Claims are resolved in slot order like Game's sequential loop: the first zombie to target
+        a cell gets it, zombies that stay put keep their cell, and a human's cell (distance 0) may
+        be shared. Losers retry against their remaining neighbors for a few rounds, then stay.
+        Writes the new positions back and returns the new cell ids.
+        """
+        n = len(slots)
+        xs = self.xs[slots].astype(np.int64)
+        ys = self.ys[slots].astype(np.int64)
+        cur = ys * width + xs
+        cur_d = dist[cur]
+
+        # (n, 4) neighbor ids and distances; off-grid and unreachable neighbors get -1
+        nx = xs[:, None] + DX
+        ny = ys[:, None] + DY
+        inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+        nid = np.where(inside, ny * width + nx, 0)
+        nd = np.where(inside, dist[nid], -1)
+        open_cell = inside & passable[nid]
+        if targets is not None:
+            tx, ty = targets % width, targets // width
+            gap = np.maximum(np.abs(nx - tx[:, None]), np.abs(ny - ty[:, None]))
+
+        target = cur.copy()
+        claimed = np.zeros(width * height, dtype=bool)
+        pending = np.arange(n)
+        for _ in range(CLAIM_ROUNDS):
+            if not len(pending):
+                break
+            rows = np.arange(len(pending))
+            p_nid = nid[pending]
+            p_nd = nd[pending]
+            free = ~claimed[p_nid]
+
+            # Downhill: strictly closer neighbor, ties broken as described above; goal cells ignore claims
+            cand = np.where((p_nd >= 0) & (free | (p_nd == 0)), p_nd, UNREACHABLE)
+            best_d = cand.min(axis=1)
+            tied = cand == best_d[:, None]
+            if targets is not None:
+                p_gap = np.where(tied, gap[pending], UNREACHABLE)
+                tied &= p_gap == p_gap.min(axis=1)[:, None]
+            best_k = np.where(tied, rng.random(tied.shape), -1.0).argmax(axis=1)
+            p_cur_d = cur_d[pending]
+            choice = np.where(best_d < p_cur_d, p_nid[rows, best_k], cur[pending])
+
+            # No human reachable: wander to a random open, unclaimed neighbor
+            lost = p_cur_d < 0
+            if lost.any():
+                valid = open_cell[pending[lost]] & free[lost]
+                pick = (rng.random(valid.shape) * valid).argmax(axis=1)
+                wander = p_nid[lost][np.arange(len(pick)), pick]
+                choice[lost] = np.where(valid.any(axis=1), wander, cur[pending[lost]])
+
+            # First claimant per cell wins (pending is in slot order, so a stable sort keeps it)
+            order = np.argsort(choice, kind="stable")
+            sorted_choice = choice[order]
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = sorted_choice[1:] != sorted_choice[:-1]
+            win = np.empty(len(order), dtype=bool)
+            win[order] = first
+            win |= (choice == cur[pending]) | (dist[choice] == 0)
+
+            claimed[choice[win]] = True
+            target[pending[win]] = choice[win]
+            pending = pending[~win]
+
+        self.xs[slots] = target % width
+        self.ys[slots] = target // width
+        return target
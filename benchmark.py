@@ -0,0 +1,219 @@
+"""Pathfinding and episode benchmarks with fixed seeds.
+
+Usage:
+    python benchmark.py --preset quick --out bench.json
+    python benchmark.py --preset standard --out bench.json --baseline baseline.json
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from danger import DangerMap
+from headless import run_episode
+from scenario import setup_new_game
+from telemetry import SearchStats
+
+# (grid sizes, obstacle densities, zombie counts, calls per case)
+PRESETS = {
+    "quick": ([15, 50], [0.1, 0.3], [3, 30], 20),
+    "standard": ([15, 50, 200, 1000], [0.1, 0.3, 0.45], [3, 30, 300], 10),
+}
+SEED = 1234
+
+
+class NodeCounter:
+    """Counts Grid.neighbors calls (one per node expansion in every search) on one grid instance."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.count = 0
+
+    def __enter__(self):
+        original = self.grid.neighbors
+
+        def counting_neighbors(pos):
+            self.count += 1
+            return original(pos)
+
+        self.grid.neighbors = counting_neighbors
+        return self
+
+    def __exit__(self, *exc):
+        del self.grid.neighbors # Drop the instance override, restoring the class method
+
+
+def time_calls(fn: Callable[[], object], calls: int) -> List[float]:
+    """Wall time of each call in milliseconds."""
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(name: str, params: Dict, timings: List[float], nodes: Optional[int] = None, **extra) -> Dict:
+    result = {
+        "name": name,
+        "params": params,
+        "calls": len(timings),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "min_ms": round(min(timings), 4),
+    }
+    if nodes is not None:
+        result["nodes_expanded"] = nodes
+    result.update(extra)
+    return result
+
+
+def bench_map_case(size: int, density: float, zombies: int, calls: int) -> List[Dict]:
+    """Search and per-turn benchmarks on one seeded map."""
+    params = {"size": size, "density": density, "zombies": zombies}
+    num_obstacles = int(size * size * density)
+    results = []
+
+    # Map generation (setup_new_game) on its own seed stream
+    random.seed(SEED)
+    setup_calls = max(1, calls // 5) if size >= 200 else calls
+    timings = time_calls(lambda: setup_new_game(size, num_obstacles, zombies, verbose=False), setup_calls)
+    results.append(summarize("setup_new_game", params, timings))
+
+    random.seed(SEED)
+    game = setup_new_game(size, num_obstacles, zombies, verbose=False)
+    grid = game.grid
+    human = game.humans[0]
+    zombie = game.zombies[0]
+
+    # Grid.check_connectivity from the human start to the safe zone
+    timings = time_calls(lambda: grid.check_connectivity(human.pos, grid.safe_zones), calls)
+    with NodeCounter(grid) as counter:
+        grid.check_connectivity(human.pos, grid.safe_zones)
+    results.append(summarize("check_connectivity", params, timings, counter.count))
+
+    # Zombie.a_star_search from a zombie to the human (no claimed cells)
+    # A* runs on the grid's SearchEngine, which does not call Grid.neighbors, so its stats count the nodes
+    timings = time_calls(lambda: zombie.a_star_search(zombie.pos, human.pos, set()), calls)
+    stats = SearchStats()
+    zombie.a_star_search(zombie.pos, human.pos, set(), stats)
+    results.append(summarize("zombie_a_star", params, timings, stats.expanded))
+
+    # Human._a_star_path to the nearest safe zone, danger map built once like Game.human_turn does
+    danger = DangerMap(grid, [z.pos for z in game.zombies])
+    goal = next(iter(grid.safe_zones))
+    timings = time_calls(lambda: human._a_star_path(goal, game.zombies, danger), calls)
+    stats = SearchStats()
+    human._a_star_path(goal, game.zombies, danger, stats)
+    results.append(summarize("human_a_star", params, timings, stats.expanded))
+
+    # Game.step("auto") per turn, until the game ends or calls run out
+    timings = []
+    for _ in range(calls):
+        if game.game_over:
+            break
+        start = time.perf_counter()
+        game.step("auto")
+        timings.append((time.perf_counter() - start) * 1000)
+    if timings:
+        results.append(summarize("game_step", params, timings))
+
+    return results
+
+
+def bench_episodes(size: int, episodes: int) -> Dict:
+    """Full auto-mode episode throughput (single process) with default obstacle/zombie ratios."""
+    params = {"size": size}
+    num_obstacles = int(size * size * 0.13)
+    timings = []
+    turns = 0
+    for seed in range(SEED, SEED + episodes):
+        start = time.perf_counter()
+        result = run_episode(seed, size, num_obstacles, 3)
+        timings.append((time.perf_counter() - start) * 1000)
+        turns += result["turns"]
+    total_s = sum(timings) / 1000
+    return summarize("episode", params, timings, episodes_per_s=round(episodes / total_s, 2),
+                     turns_per_s=round(turns / total_s, 2))
+
+
+def run_suite(preset: str) -> Dict:
+    sizes, densities, zombie_counts, calls = PRESETS[preset]
+    results = []
+    for size in sizes:
+        # Fewer repeats on big maps keep the standard preset to a reasonable run time
+        case_calls = calls if size <= 200 else max(2, calls // 5)
+        for density in densities:
+            for zombies in zombie_counts:
+                if zombies > size * size // 20:
+                    continue # Spawn rules cannot fit this many zombies far enough from the human
+                print(f"  size={size} density={density} zombies={zombies}", file=sys.stderr)
+                results.extend(bench_map_case(size, density, zombies, case_calls))
+        if size <= 50:
+            results.append(bench_episodes(size, calls))
+
+    return {
+        "meta": {
+            "preset": preset,
+            "seed": SEED,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def _key(result: Dict) -> str:
+    return result["name"] + " " + json.dumps(result["params"], sort_keys=True)
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> int:
+    """Prints median-time ratios against a baseline; returns the number of regressions."""
+    base = {_key(r): r for r in baseline["results"]}
+    regressions = 0
+    print(f"{'benchmark':<70} {'base ms':>10} {'now ms':>10} {'ratio':>7}")
+    for r in current["results"]:
+        b = base.get(_key(r))
+        if b is None:
+            continue
+        ratio = r["median_ms"] / b["median_ms"] if b["median_ms"] else float("inf")
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  SLOWER"
+            regressions += 1
+        elif ratio < 1 - tolerance:
+            flag = "  faster"
+        print(f"{_key(r):<70} {b['median_ms']:>10.3f} {r['median_ms']:>10.3f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Zombie Surviver pathfinding and episodes.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--out", default="bench.json", help="Where to write the JSON results.")
+    parser.add_argument("--baseline", default=None, help="Earlier results file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Relative median change treated as noise when comparing (default 0.10).")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.preset)
+    with open(args.out, "w") as out:
+        json.dump(results, out, indent=2)
+    print(f"{len(results['results'])} benchmark results -> {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{regressions} benchmark(s) slower than baseline beyond {args.tolerance:.0%}.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import numpy as np
+from collections import Counter
+from environment import Grid, Coord
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+DANGER_FALLOFFS = ("flat", "linear")
+
+
+class DangerMap:
+    """Per-cell danger penalty from all zombie positions, kept up to date as zombies move.
+
+    A cell within `radius` steps (Manhattan) of a zombie is penalized by `weight` per zombie.
+    With falloff "linear" the penalty shrinks with distance: weight * (radius + 1 - d) / (radius + 1).
+    The defaults (radius 1, weight 1000, "flat") match the original hard-coded rule.
+
+    `penalties` is sparse (only penalized cells), which is what the searches look up. Game keeps
+    one map and calls `update` every turn: only the danger diamonds of cells whose zombie count
+    changed are added or subtracted, so a turn costs O(moved zombies x diamond), not O(area).
+    """
+
+    def __init__(self, grid: Grid, zombie_positions: Union[Iterable[Coord], np.ndarray], radius: int = 1,
+                 weight: int = 1000, falloff: str = "flat"):
+        if falloff not in DANGER_FALLOFFS:
+            raise ValueError(f"Unknown danger falloff '{falloff}'. Expected one of {DANGER_FALLOFFS}.")
+        self.width = grid.width
+        self.height = grid.height
+        self.radius = radius
+        self.weight = weight
+        self.falloff = falloff
+        self.penalties: Dict[Coord, int] = {}
+        self.changed: Set[Coord] = set() # Cells whose penalty changed in the last update
+        self._counts: Counter = Counter() # Zombies per cell
+        self._offsets = self._diamond()
+        self.update(zombie_positions)
+
+    def _diamond(self) -> List[Tuple[int, int, int]]:
+        """(dx, dy, penalty) for every offset inside the danger diamond with a non-zero penalty."""
+        r = self.radius
+        offsets = []
+        for dy in range(-r, r + 1):
+            for dx in range(-(r - abs(dy)), r - abs(dy) + 1):
+                d = abs(dx) + abs(dy)
+                w = self.weight * (r + 1 - d) // (r + 1) if self.falloff == "linear" else self.weight
+                if w:
+                    offsets.append((dx, dy, w))
+        return offsets
+
+    def update(self, zombie_positions: Union[Iterable[Coord], np.ndarray]):
+        """Moves the map to a new set of zombie positions, touching only cells around those that changed."""
+        if isinstance(zombie_positions, np.ndarray):
+            zombie_positions = map(tuple, zombie_positions.reshape(-1, 2).tolist())
+        counts = Counter(zombie_positions)
+        old = self._counts
+        penalties, changed = self.penalties, set()
+        w, h = self.width, self.height
+        for cell in old.keys() | counts.keys():
+            delta = counts.get(cell, 0) - old.get(cell, 0)
+            if not delta:
+                continue
+            x, y = cell
+            for dx, dy, weight in self._offsets:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < w and 0 <= ny < h:
+                    pos = (nx, ny)
+                    value = penalties.get(pos, 0) + delta * weight
+                    if value:
+                        penalties[pos] = value
+                    else:
+                        del penalties[pos]
+                    changed.add(pos)
+        self._counts = counts
+        self.changed = changed
+
+    @property
+    def costs(self) -> np.ndarray:
+        """Dense (height, width) int array of the penalties, built on request."""
+        costs = np.zeros((self.height, self.width), dtype=np.int64)
+        for (x, y), value in self.penalties.items():
+            costs[y, x] = value
+        return costs
+
+    def penalty(self, pos: Coord) -> int:
+        return self.penalties.get(pos, 0)
@@ -0,0 +1,160 @@
+import heapq
+from environment import Grid, Coord, manhattan
+from typing import Dict, List, Optional, Set, Tuple
+
+INF = float("inf")
+
+
+class DStarLite:
+    """Incremental planner (D* Lite) from a moving start to the grid's safe zones.
+
+    The search runs backward from every safe zone, so its state stays valid while the start
+    moves. Entering a cell costs 1 plus that cell's danger penalty. Between turns only the cells
+    whose penalty changed, and the cells around obstacles added or removed since the last update
+    (noticed through grid.version), are repaired, so replanning work scales with how much changed
+    rather than with the size of the map.
+    """
+
+    def __init__(self, grid: Grid, start: Coord, goals: Set[Coord]):
+        self.grid = grid
+        self.goals = set(goals)
+        self.start = start
+        self.last_start = start
+        self.km = 0
+        self.g: Dict[Coord, float] = {}
+        self.rhs: Dict[Coord, float] = {}
+        self.penalties: Dict[Coord, int] = {}
+        self.queue: List[Tuple[float, float, Coord]] = []
+        self.queued: Dict[Coord, Tuple[float, float]] = {} # Current key of every live queue entry
+        self._version = grid.version
+        self._obstacles = set(grid.obstacles)
+
+        for goal in self.goals:
+            self.rhs[goal] = 0
+            self._push(goal, self._key(goal))
+
+    # --- D* Lite primitives ---
+    def _h(self, s: Coord) -> int:
+        return manhattan(self.start, s)
+
+    def _cost(self, v: Coord) -> int:
+        """Cost of entering cell v."""
+        return 1 + self.penalties.get(v, 0)
+
+    def _key(self, s: Coord) -> Tuple[float, float]:
+        m = min(self.g.get(s, INF), self.rhs.get(s, INF))
+        return (m + self._h(s) + self.km, m)
+
+    def _push(self, s: Coord, key: Tuple[float, float]):
+        self.queued[s] = key
+        heapq.heappush(self.queue, (key[0], key[1], s))
+
+    def _top_key(self) -> Tuple[float, float]:
+        # Drop stale heap entries (lazy deletion) until the top one is live
+        while self.queue:
+            k1, k2, s = self.queue[0]
+            if self.queued.get(s) == (k1, k2):
+                return (k1, k2)
+            heapq.heappop(self.queue)
+        return (INF, INF)
+
+    def _update_vertex(self, u: Coord):
+        if u not in self.goals:
+            best = INF
+            for s in self.grid.neighbors(u):
+                cost = self._cost(s) + self.g.get(s, INF)
+                if cost < best:
+                    best = cost
+            self.rhs[u] = best
+
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u, self._key(u))
+        else:
+            self.queued.pop(u, None)
+
+    def compute_shortest_path(self) -> int:
+        """Repairs the search state; returns the number of vertices expanded."""
+        expanded = 0
+        while (self._top_key() < self._key(self.start)
+               or self.rhs.get(self.start, INF) != self.g.get(self.start, INF)):
+            k1, k2, u = heapq.heappop(self.queue)
+            del self.queued[u]
+            k_new = self._key(u)
+            expanded += 1
+
+            if (k1, k2) < k_new:
+                self._push(u, k_new)
+            elif self.g.get(u, INF) > self.rhs.get(u, INF):
+                self.g[u] = self.rhs[u]
+                for p in self.grid.neighbors(u):
+                    self._update_vertex(p)
+            else:
+                self.g[u] = INF
+                self._update_vertex(u)
+                for p in self.grid.neighbors(u):
+                    self._update_vertex(p)
+
+            if not self.queue:
+                break
+        return expanded
+
+    def _apply_obstacle_changes(self):
+        """Repairs the cells around obstacles added or removed since the last update."""
+        if self.grid.version == self._version:
+            return
+        changed = self._obstacles ^ self.grid.obstacles
+        self._obstacles = set(self.grid.obstacles)
+        self._version = self.grid.version
+        for cell in changed:
+            if cell in self._obstacles:
+                # A new obstacle has no edges left: it drops out of the search and its
+                # neighbors re-derive their rhs without it
+                self.goals.discard(cell)
+                self.g[cell] = self.rhs[cell] = INF
+                self.queued.pop(cell, None)
+            else:
+                self._update_vertex(cell)
+            # neighbors() of an obstacle is empty, so walk the four cells directly
+            x, y = cell
+            for u in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if self.grid.in_bounds(u) and self.grid.passable(u):
+                    self._update_vertex(u)
+
+    # --- Per-turn API ---
+    def update(self, start: Coord, penalties: Dict[Coord, int]) -> int:
+        """Moves the start and applies the new danger penalties; returns vertices expanded."""
+        if start != self.start:
+            self.start = start
+            self.km += manhattan(self.last_start, start)
+            self.last_start = start
+
+        # Only cells whose penalty changed alter edge costs (edges into that cell)
+        old = self.penalties
+        changed = [c for c in old.keys() | penalties.keys() if old.get(c, 0) != penalties.get(c, 0)]
+        self.penalties = dict(penalties)
+        for cell in changed:
+            for u in self.grid.neighbors(cell):
+                self._update_vertex(u)
+        self._apply_obstacle_changes()
+
+        return self.compute_shortest_path()
+
+    def path(self) -> Optional[List[Coord]]:
+        """Path from start (exclusive) to the cheapest safe zone, or None if unreachable."""
+        if self.g.get(self.start, INF) == INF and self.start not in self.goals:
+            return None
+
+        path: List[Coord] = []
+        current = self.start
+        limit = self.grid.width * self.grid.height
+        while current not in self.goals:
+            best, best_cost = None, INF
+            for s in self.grid.neighbors(current):
+                cost = self._cost(s) + self.g.get(s, INF)
+                if cost < best_cost:
+                    best, best_cost = s, cost
+            if best is None or len(path) >= limit:
+                return None
+            path.append(best)
+            current = best
+        return path
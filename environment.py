@@ -1,5 +1,7 @@
 import random
-from typing import List, Tuple, Set,Deque
+from array import array
+from bisect import bisect_left
+from typing import List, Tuple, Set, Deque, Dict, Iterable, Optional, Callable
 from collections import deque
 
 Coord = Tuple[int, int]
@@ -8,6 +10,12 @@ class Grid:
     def __init__(self, width: int, height: int, obstacles: Set[Coord] = None, safe_zones: Set[Coord] = None):
         self.width = width
         self.height = height
+        self.version = 0 # Bumped whenever obstacles change; caches derived from the map key on it
+        self._landmarks: Optional["LandmarkHeuristic"] = None
+        self._hierarchy = None # HPAPlanner, built on first use by hierarchy()
+        self._jump_tables = None # jps.JumpTables, built on first use by jump_tables()
+        self._search_engine = None # search.SearchEngine, built on first use by search_engine()
+        self._safe_distances = None # Built on first use by safe_distance_ids(), or supplied by a map library
         self.obstacles = set(obstacles) if obstacles else set()
         self.safe_zones = set(safe_zones) if safe_zones else set()
 
@@ -19,6 +27,8 @@ class Grid:
         return pos not in self.obstacles
 
     def neighbors(self, pos: Coord) -> List[Coord]:
+        if not self.passable(pos):
+            return [] # An obstacle is never on a path, so it has no edges (same as ArrayGrid)
         x, y = pos
         results = [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]
         results = filter(self.in_bounds, results)
@@ -36,11 +46,21 @@ class Grid:
     def add_obstacle(self, pos: Coord):
         if self.in_bounds(pos):
             self.obstacles.add(pos)
+            self._obstacles_changed()
+
+    def _obstacles_changed(self):
+        """Invalidates everything precomputed from the obstacle layout."""
+        self.version += 1
+        self._landmarks = None
+        self._jump_tables = None
+        self._search_engine = None
+        self._safe_distances = None
 
     def add_safe_zone(self, pos: Coord):
         if self.in_bounds(pos):
             self.safe_zones.add(pos)
-            
+            self._safe_distances = None
+
     def generate_random_obstacles(self, count: int, exclude_coords: Set[Coord]):
         """Generates a specified number of obstacles, excluding key locations."""
         generated_count = 0
@@ -51,9 +71,47 @@ class Grid:
             
             # Only add the obstacle if it's not a key location (safe zone, human start)
             if pos not in self.obstacles and pos not in self.safe_zones and pos not in exclude_coords:
-                self.obstacles.add(pos)
+                self.add_obstacle(pos)
                 generated_count += 1
 
+    def generate_connected_obstacles(self, count: int, start: Coord, exclude_coords: Set[Coord]) -> List[Coord]:
+        """Places `count` uniformly random obstacles in one pass, keeping start connected to a safe zone.
+
+        One open path from start to safety is maintained. A candidate off that path cannot cut
+        start from safety, so it is placed at once. A candidate on the path is placed only if
+        `_PathKeeper` finds a detour around it; otherwise it is a cut cell and is rejected, and
+        it stays open for good since later obstacles can only keep it a cut cell. Every cell is
+        drawn at most once, so nothing is retried. Returns the final path (excluding start).
+        """
+        w, total = self.width, self.width * self.height
+        # 0: untried, 1: obstacle, 2: reserved, CUT: rejected because it is a cut cell
+        state = bytearray(total)
+        for x, y in self.obstacles:
+            if self.in_bounds((x, y)):
+                state[y * w + x] = 1
+        for x, y in {start, *self.safe_zones, *exclude_coords}:
+            if self.in_bounds((x, y)) and state[y * w + x] == 0:
+                state[y * w + x] = 2
+        untried = state.count(0)
+        if count > untried:
+            raise ValueError(f"Cannot place {count} obstacles: only {untried} free cells.")
+
+        keeper = _PathKeeper(state, w, start[1] * w + start[0],
+                             {y * w + x for x, y in self.safe_zones if self.in_bounds((x, y))})
+        placed = 0
+        while placed < count:
+            if untried == 0:
+                raise ValueError(f"Only {placed} of {count} obstacles fit without cutting start from the safe zone.")
+            cid = random.randrange(total)
+            if state[cid]:
+                continue
+            untried -= 1
+            if not keeper.block(cid):
+                continue
+            self.add_obstacle((cid % w, cid // w))
+            placed += 1
+        return [(c % w, c // w) for c in keeper.path[1:]]
+
     def check_connectivity(self, start: Coord, goals: Set[Coord]) -> bool:
         """Checks if a path exists from start to any goal position using BFS."""
         if start in goals:
@@ -72,6 +130,559 @@ class Grid:
                     visited.add(neighbor)
                     queue.append(neighbor)
         return False
+
+    def cell_id(self, pos: Coord) -> int:
+        return pos[1] * self.width + pos[0]
+
+    def coord(self, cell_id: int) -> Coord:
+        return (cell_id % self.width, cell_id // self.width)
+
+    # --- Landmark (ALT) heuristic ---
+    @property
+    def landmarks(self) -> Optional["LandmarkHeuristic"]:
+        """The prepared landmark tables, or None if not prepared (or obstacles changed since)."""
+        return self._landmarks
+
+    def prepare_landmarks(self, count: int = 4) -> "LandmarkHeuristic":
+        """Picks landmarks and computes their BFS distance tables; cached until obstacles change."""
+        if self._landmarks is None or len(self._landmarks.landmarks) < count:
+            self._landmarks = LandmarkHeuristic(self, count)
+        return self._landmarks
+
+    def heuristic_to(self, goal: Coord) -> Callable[[Coord], int]:
+        """Admissible distance-to-goal estimate: ALT if landmarks are prepared, Manhattan otherwise."""
+        if self._landmarks is not None:
+            return self._landmarks.heuristic_to(goal)
+        gx, gy = goal
+        return lambda pos: abs(pos[0] - gx) + abs(pos[1] - gy)
+
+    # --- Hierarchical (HPA*) planner ---
+    def hierarchy(self, cluster_size: int = 16):
+        """Shared HPA* planner for this grid, built on first use; it repairs itself when obstacles change."""
+        if self._hierarchy is None or self._hierarchy.cluster_size != cluster_size:
+            from hpa import HPAPlanner # Imported here because hpa imports this module
+            self._hierarchy = HPAPlanner(self, cluster_size)
+        return self._hierarchy
+
+    # --- Jump Point Search ---
+    def jump_tables(self):
+        """Padded open-cell mask and horizontal jump distances for JPS; rebuilt when obstacles change."""
+        if self._jump_tables is None:
+            from jps import JumpTables # Imported here because jps imports this module
+            self._jump_tables = JumpTables(self)
+        return self._jump_tables
+
+    # --- A* shared by humans and zombies ---
+    def search_engine(self):
+        """Shared A* engine with per-cell neighbor ids and reusable cost arrays; rebuilt when obstacles change."""
+        if self._search_engine is None:
+            from search import SearchEngine # Imported here because search imports this module
+            self._search_engine = SearchEngine(self)
+        return self._search_engine
+
+    def safe_distance_ids(self):
+        """Step distance to the nearest safe zone by cell id (-1: unreachable); kept until the map changes."""
+        if self._safe_distances is None:
+            self._safe_distances = self.distance_ids(self.safe_zones)
+        return self._safe_distances
+
+    def nearest_safe_zone(self, pos: Coord) -> Optional[Coord]:
+        """Safe zone closest to pos by path length, or None if none is reachable.
+
+        Walks the cached distance field downhill, so it costs one step per cell of the route
+        rather than a search, and never picks a zone that is near but walled off.
+        """
+        dist = self.safe_distance_ids()
+        w, h = self.width, self.height
+        x, y = pos
+        d = dist[y * w + x]
+        if d < 0:
+            return None
+        if len(self.safe_zones) == 1:
+            return next(iter(self.safe_zones))
+        # Walls and unreachable cells are -1, so any in-bounds neighbor at d - 1 is a step closer
+        while d > 0:
+            d -= 1
+            if x + 1 < w and dist[y * w + x + 1] == d:
+                x += 1
+            elif x > 0 and dist[y * w + x - 1] == d:
+                x -= 1
+            elif y + 1 < h and dist[(y + 1) * w + x] == d:
+                y += 1
+            else:
+                y -= 1
+        return (x, y)
+
+    def heuristic_to_safety(self, goal: Coord) -> Callable[[Coord], int]:
+        """Admissible estimate towards safe zone `goal` read from the cached distance field.
+
+        With a single safe zone the field is the exact remaining distance. With several it only
+        gives the distance to the nearest zone, so it is combined with heuristic_to(goal).
+        """
+        dist = self.safe_distance_ids()
+        w = self.width
+        if len(self.safe_zones) == 1:
+            return lambda pos: dist[pos[1] * w + pos[0]]
+        estimate = self.heuristic_to(goal)
+
+        def h(pos: Coord) -> int:
+            d = dist[pos[1] * w + pos[0]]
+            e = estimate(pos)
+            return d if d > e else e
+
+        return h
+
+    def distance_ids(self, sources: Iterable[Coord]) -> array:
+        """Multi-source BFS as a flat int array indexed by cell id, -1 where unreachable."""
+        dist = array("i", [-1]) * (self.width * self.height)
+        for pos, d in self.distance_field(sources).items():
+            dist[pos[1] * self.width + pos[0]] = d
+        return dist
+
+    def distance_field(self, sources: Iterable[Coord]) -> Dict[Coord, int]:
+        """Multi-source BFS: step distance from every reachable cell to the nearest source."""
+        dist: Dict[Coord, int] = {}
+        queue: Deque[Coord] = deque()
+        for s in sources:
+            if s not in dist:
+                dist[s] = 0
+                queue.append(s)
+
+        while queue:
+            current = queue.popleft()
+            next_dist = dist[current] + 1
+            for neighbor in self.neighbors(current):
+                if neighbor not in dist:
+                    dist[neighbor] = next_dist
+                    queue.append(neighbor)
+        return dist
     
+
+CUT = 3 # Generator cell state: a cell whose removal would cut start from the safe zone
+
+
+class _PathKeeper:
+    """An open path from a start cell to a goal set, kept open as cells are blocked one by one.
+
+    `state` is the generator's cell array (1 marks obstacles, CUT known cut cells); `block`
+    writes to it. Cells on the path know their position, so blocking a cell off the path costs
+    O(1). For one on the path, two BFS grow from the cells just before and after it, the smaller
+    frontier expanding next; the back one also starts from every goal. The front side stops on
+    any path cell after the blocked one and the back side on any before it; where they meet,
+    the route replaces the stretch of path it bypasses. Disconnection is only reported once one
+    side is exhausted.
+
+    Known cut cells lie on every route, always in the same order, so a detour around path[k]
+    only ever needs to cross the nearest one before k and the nearest one after it. All other
+    cut cells are walls, which keeps both searches within a few pockets of the blocked cell
+    however dense the map gets. BFS bookkeeping lives in flat arrays reused through per-search
+    stamps, as in search.SearchEngine.
+    """
+
+    def __init__(self, state: bytearray, width: int, origin: int, goals: Set[int]):
+        self.state = state
+        self.width = width
+        total = len(state)
+        self.index = array("i", [-1]) * total # Position of each cell on the path, -1 if off it
+        self.parent = (array("i", [-1]) * total, array("i", [-1]) * total)
+        self.seen = (array("I", [0]) * total, array("I", [0]) * total) # Stamp: reached by that side
+        self.goals = sorted(goals)
+        self.cuts: List[int] = [] # CUT cells in path order; they stay on the path, in this order
+        self.goal = bytearray(total)
+        for cid in goals:
+            self.goal[cid] = 1
+        self.path = self._shortest(origin)
+        self.stamp = 1 # Stamp 1 was used by _shortest
+        for i, cid in enumerate(self.path):
+            self.index[cid] = i
+
+    def _shortest(self, origin: int) -> List[int]:
+        """BFS path from origin to the nearest goal, on the first side's arrays."""
+        state, goal, seen, parent, w = self.state, self.goal, self.seen[0], self.parent[0], self.width
+        total = len(state)
+        seen[origin] = 1
+        parent[origin] = -1
+        frontier = [origin]
+        end = origin if goal[origin] else -1
+        while end < 0:
+            if not frontier:
+                raise ValueError("Start cannot reach any safe zone before obstacles are placed.")
+            next_frontier = []
+            for cid in frontier:
+                x = cid % w
+                for n in (cid + 1 if x + 1 < w else -1, cid - 1 if x else -1,
+                          cid + w if cid + w < total else -1, cid - w):
+                    if n >= 0 and not seen[n] and state[n] != 1:
+                        seen[n] = 1
+                        parent[n] = cid
+                        if goal[n]:
+                            end = n
+                        next_frontier.append(n)
+            frontier = next_frontier
+        path = [end]
+        while parent[path[-1]] >= 0:
+            path.append(parent[path[-1]])
+        return path[::-1]
+
+    def block(self, cid: int) -> bool:
+        """Marks cid an obstacle unless that would cut the path's ends apart (then it is marked CUT)."""
+        k = self.index[cid]
+        self.state[cid] = 1
+        if k < 0:
+            return True
+        route = self._detour(k)
+        if route is None:
+            self.state[cid] = CUT
+            self.cuts.insert(bisect_left(self.cuts, k, key=self.index.__getitem__), cid)
+            return False
+        first, last, cells = route
+        index, path = self.index, self.path
+        for old in path[first:last + 1]:
+            index[old] = -1
+        path[first:last + 1] = cells
+        for i in range(first, len(path)):
+            index[path[i]] = i
+        return True
+
+    def _detour(self, k: int) -> Optional[Tuple[int, int, List[int]]]:
+        """(first, last, cells): path[first..last] replaced by cells avoids path[k]; None if none can."""
+        state, index, path, w = self.state, self.index, self.path, self.width
+        total = len(state)
+        if self.stamp == 0xFFFFFFFF:
+            self.seen = (array("I", [0]) * total, array("I", [0]) * total)
+            self.stamp = 0
+        self.stamp += 1
+        stamp = self.stamp
+        seen, parent = self.seen, self.parent
+        # Only the nearest cut cells on either side of k may be crossed (see the class docstring)
+        at = bisect_left(self.cuts, k, key=index.__getitem__)
+        passes = (self.cuts[at - 1] if at else -1, self.cuts[at] if at < len(self.cuts) else -1)
+        # The back side also starts from every goal, so it is only exhausted once all are cut off
+        frontiers = [[path[k - 1]], [path[k + 1]] + [g for g in self.goals if g != path[k + 1]]]
+        for side in (0, 1):
+            for cid in frontiers[side]:
+                seen[side][cid] = stamp
+                parent[side][cid] = -1
+
+        while frontiers[0] and frontiers[1]:
+            near = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            mine, theirs, up = seen[near], seen[1 - near], parent[near]
+            next_frontier = []
+            for cid in frontiers[near]:
+                x = cid % w
+                for n in (cid + 1 if x + 1 < w else -1, cid - 1 if x else -1,
+                          cid + w if cid + w < total else -1, cid - w):
+                    if n < 0 or mine[n] == stamp:
+                        continue
+                    cell = state[n]
+                    if cell == 1:
+                        continue
+                    i = index[n]
+                    if theirs[n] == stamp or (i >= 0 and (i > k if near == 0 else i < k)):
+                        front, back = (cid, n) if near == 0 else (n, cid)
+                        return self._splice(front, back, k)
+                    if cell == CUT and n not in passes:
+                        continue
+                    mine[n] = stamp
+                    up[n] = cid
+                    next_frontier.append(n)
+            frontiers[near] = next_frontier
+        return None
+
+    def _splice(self, front: int, back: int, k: int) -> Tuple[int, int, List[int]]:
+        stamp, index = self.stamp, self.index
+        # Front half, start side first; cut where it last left the path (it may rejoin before k - 1)
+        head = [front]
+        while self.seen[0][head[-1]] == stamp and self.parent[0][head[-1]] >= 0:
+            head.append(self.parent[0][head[-1]])
+        head.reverse()
+        cut = min(range(len(head)), key=lambda h: index[head[h]] if index[head[h]] >= 0 else k)
+        # Back half, goal side last; cut where it first rejoins the path furthest along
+        tail = [back]
+        while self.seen[1][tail[-1]] == stamp and self.parent[1][tail[-1]] >= 0:
+            tail.append(self.parent[1][tail[-1]])
+        rejoin = max(range(len(tail)), key=lambda t: index[tail[t]] if index[tail[t]] >= 0 else k)
+        if index[tail[rejoin]] < 0:
+            # It never rejoins the path: it ends at another goal, which then ends the new path
+            return index[head[cut]], len(self.path) - 1, head[cut:] + tail
+        return index[head[cut]], index[tail[rejoin]], head[cut:] + tail[:rejoin + 1]
+
+
+class ArrayGrid(Grid):
+    """Grid backend that stores cell flags in a flat bytearray indexed by cell id (y * width + x).
+
+    Adjacency is precomputed once per map as a flat array of cell ids, four slots per cell
+    (-1 where there is no passable neighbor, and all four for an obstacle). `neighbors` keeps the Grid API but returns a
+    cached list per cell instead of allocating tuples, a filter and a list on every call.
+    Callers must treat the returned lists as read-only.
+
+    `cells` can also be a read-only view of flags, such as a map library record (see
+    `from_cells`). It is copied into a bytearray on the first write, and the obstacle and safe
+    zone sets are only built the first time something reads them.
+    """
+    OBSTACLE = 1
+    SAFE = 2
+
+    def __init__(self, width: int, height: int, obstacles: Set[Coord] = None, safe_zones: Set[Coord] = None):
+        self.cells = bytearray(width * height)
+        self._adjacency: Optional[array] = None
+        self._neighbor_cache: List[Optional[List[Coord]]] = []
+        self._obstacles: Optional[Set[Coord]] = set()
+        self._safe_zones: Optional[Set[Coord]] = set()
+        super().__init__(width, height, obstacles, safe_zones)
+
+    @classmethod
+    def from_grid(cls, grid: Grid) -> "ArrayGrid":
+        return cls(grid.width, grid.height, grid.obstacles, grid.safe_zones)
+
+    @classmethod
+    def from_cells(cls, width: int, height: int, cells, safe_distances=None) -> "ArrayGrid":
+        """Wraps an existing buffer of cell flags without copying it; a read-only one is copied on the first write.
+
+        `safe_distances`, if given, is used as `safe_distance_ids()` (indexable by cell id);
+        it must match the safe zones in `cells`.
+        """
+        grid = cls(width, height)
+        grid.cells = cells
+        grid._obstacles = None
+        grid._safe_zones = None
+        grid._safe_distances = safe_distances
+        return grid
+
+    def _writable_cells(self) -> bytearray:
+        """`cells`, first copied out of the buffer given to from_cells if that is not a bytearray."""
+        if not isinstance(self.cells, bytearray):
+            self.cells = bytearray(self.cells)
+        return self.cells
+
+    def _flagged(self, flag: int) -> Set[Coord]:
+        w = self.width
+        return {(cid % w, cid // w) for cid, cell in enumerate(self.cells) if cell & flag}
+
+    # --- Set views kept for code that reads grid.obstacles / grid.safe_zones directly ---
+    @property
+    def obstacles(self) -> Set[Coord]:
+        if self._obstacles is None:
+            self._obstacles = self._flagged(self.OBSTACLE)
+        return self._obstacles
+
+    @obstacles.setter
+    def obstacles(self, value: Set[Coord]):
+        cells = self._writable_cells()
+        for pos in self.obstacles:
+            cells[self.cell_id(pos)] &= ~self.OBSTACLE
+        self._obstacles = set()
+        for pos in value:
+            if self.in_bounds(pos):
+                self._obstacles.add(pos)
+                cells[self.cell_id(pos)] |= self.OBSTACLE
+        self._invalidate_adjacency()
+        self._obstacles_changed()
+
+    @property
+    def safe_zones(self) -> Set[Coord]:
+        if self._safe_zones is None:
+            self._safe_zones = self._flagged(self.SAFE)
+        return self._safe_zones
+
+    @safe_zones.setter
+    def safe_zones(self, value: Set[Coord]):
+        cells = self._writable_cells()
+        for pos in self.safe_zones:
+            cells[self.cell_id(pos)] &= ~self.SAFE
+        self._safe_zones = set()
+        self._safe_distances = None
+        for pos in value:
+            self.add_safe_zone(pos)
+
+    # --- Grid API ---
+    def passable(self, pos: Coord) -> bool:
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return True # Same answer as Grid: out-of-bounds cells are never in the obstacle set
+        return not self.cells[y * self.width + x] & self.OBSTACLE
+
+    def is_safe(self, pos: Coord) -> bool:
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return bool(self.cells[y * self.width + x] & self.SAFE)
+
+    def neighbors(self, pos: Coord) -> List[Coord]:
+        cid = pos[1] * self.width + pos[0]
+        cached = self._neighbor_cache[cid]
+        if cached is None:
+            adjacency = self.adjacency()
+            base = cid * 4
+            cached = [(n % self.width, n // self.width) for n in adjacency[base:base + 4] if n >= 0]
+            self._neighbor_cache[cid] = cached
+        return cached
+
+    def neighbor_ids(self, cell_id: int) -> List[int]:
+        base = cell_id * 4
+        return [n for n in self.adjacency()[base:base + 4] if n >= 0]
+
+    def add_obstacle(self, pos: Coord):
+        if not self.in_bounds(pos) or pos in self.obstacles:
+            return
+        self._obstacles.add(pos)
+        cid = self.cell_id(pos)
+        self._writable_cells()[cid] |= self.OBSTACLE
+        self._obstacles_changed()
+        if self._adjacency is not None:
+            # Patch the four neighbors in place instead of rebuilding the whole table
+            adjacency = self._adjacency
+            for slot in range(cid * 4, cid * 4 + 4):
+                n = adjacency[slot]
+                if n < 0:
+                    continue
+                adjacency[slot] = -1 # The obstacle loses its own edges too, as in a full rebuild
+                for back in range(n * 4, n * 4 + 4):
+                    if adjacency[back] == cid:
+                        adjacency[back] = -1
+                self._neighbor_cache[n] = None
+            self._neighbor_cache[cid] = None
+
+    def add_safe_zone(self, pos: Coord):
+        if self.in_bounds(pos):
+            self.safe_zones.add(pos)
+            self._writable_cells()[self.cell_id(pos)] |= self.SAFE
+            self._safe_distances = None
+
+    def adjacency(self) -> array:
+        """Flat int array of passable neighbor ids, four slots per cell, built once per map."""
+        if self._adjacency is None:
+            w, h = self.width, self.height
+            cells = self.cells
+            adjacency = array("i", [-1]) * (w * h * 4)
+            for cid in range(w * h):
+                if cells[cid] & 1:
+                    continue # Obstacles keep all four slots at -1
+                x = cid % w
+                base = cid * 4
+                # Same neighbor order as Grid.neighbors: right, left, down, up
+                if x + 1 < w and not cells[cid + 1] & 1:
+                    adjacency[base] = cid + 1
+                if x > 0 and not cells[cid - 1] & 1:
+                    adjacency[base + 1] = cid - 1
+                if cid + w < w * h and not cells[cid + w] & 1:
+                    adjacency[base + 2] = cid + w
+                if cid >= w and not cells[cid - w] & 1:
+                    adjacency[base + 3] = cid - w
+            self._adjacency = adjacency
+        return self._adjacency
+
+    def _invalidate_adjacency(self):
+        self._adjacency = None
+        self._neighbor_cache = [None] * (self.width * self.height)
+
+    def check_connectivity(self, start: Coord, goals: Set[Coord]) -> bool:
+        """Checks if a path exists from start to any goal position using BFS over cell ids."""
+        if start in goals:
+            return True
+
+        goal_ids = {self.cell_id(g) for g in goals if self.in_bounds(g)}
+        adjacency = self.adjacency()
+        start_id = self.cell_id(start)
+        visited = bytearray(self.width * self.height)
+        visited[start_id] = 1
+        queue: Deque[int] = deque([start_id])
+
+        while queue:
+            current = queue.popleft()
+            base = current * 4
+            for n in adjacency[base:base + 4]:
+                if n < 0 or visited[n]:
+                    continue
+                if n in goal_ids:
+                    return True
+                visited[n] = 1
+                queue.append(n)
+        return False
+
+    def distance_ids(self, sources: Iterable[Coord]) -> array:
+        """Multi-source BFS over cell ids: flat int array of step distances, -1 where unreachable."""
+        adjacency = self.adjacency()
+        dist = array("i", [-1]) * (self.width * self.height)
+        queue: Deque[int] = deque()
+        for s in sources:
+            sid = self.cell_id(s)
+            if dist[sid] < 0:
+                dist[sid] = 0
+                queue.append(sid)
+
+        while queue:
+            current = queue.popleft()
+            next_dist = dist[current] + 1
+            base = current * 4
+            for n in adjacency[base:base + 4]:
+                if n >= 0 and dist[n] < 0:
+                    dist[n] = next_dist
+                    queue.append(n)
+        return dist
+
+    def distance_field(self, sources: Iterable[Coord]) -> Dict[Coord, int]:
+        """Multi-source BFS: step distance from every reachable cell to the nearest source."""
+        w = self.width
+        return {(cid % w, cid // w): d for cid, d in enumerate(self.distance_ids(sources)) if d >= 0}
+
+
+class LandmarkHeuristic:
+    """ALT heuristic: BFS distance tables from a few landmarks, combined via the triangle inequality.
+
+    For any landmark L, |d(L, n) - d(L, goal)| <= d(n, goal), so the max over landmarks (and Manhattan)
+    is still admissible and consistent, but far tighter than Manhattan alone around obstacles.
+    Landmarks are picked by farthest-point selection so they sit on the map's periphery.
+    """
+
+    def __init__(self, grid: Grid, count: int = 4):
+        self.width = grid.width
+        self.landmarks: List[Coord] = []
+        self.tables: List[array] = []
+
+        seed = next((s for s in grid.safe_zones if grid.passable(s)), None)
+        if seed is None:
+            seed = next(((x, y) for y in range(grid.height) for x in range(grid.width)
+                         if grid.passable((x, y))), None)
+        if seed is None:
+            return
+
+        # Distance to the nearest chosen landmark (initially: to the seed); -1 marks unreachable cells
+        min_dist = list(grid.distance_ids([seed]))
+        for _ in range(count):
+            best_id = max(range(len(min_dist)), key=min_dist.__getitem__)
+            if min_dist[best_id] <= 0 and self.landmarks:
+                break # Every reachable cell is already a landmark
+            landmark = grid.coord(best_id)
+            table = grid.distance_ids([landmark])
+            self.landmarks.append(landmark)
+            self.tables.append(table)
+            min_dist = [m if m < t else t for m, t in zip(min_dist, table)]
+
+    def heuristic_to(self, goal: Coord) -> Callable[[Coord], int]:
+        """Returns h(pos) for a fixed goal; the goal's table entries are looked up once."""
+        w = self.width
+        gx, gy = goal
+        goal_id = gy * w + gx
+        pairs = [(table, table[goal_id]) for table in self.tables if table[goal_id] >= 0]
+
+        def h(pos: Coord) -> int:
+            best = abs(pos[0] - gx) + abs(pos[1] - gy)
+            pos_id = pos[1] * w + pos[0]
+            for table, goal_dist in pairs:
+                d = table[pos_id]
+                if d >= 0:
+                    d = d - goal_dist if d > goal_dist else goal_dist - d
+                    if d > best:
+                        best = d
+            return best
+
+        return h
+
+
+# Grid backends selectable by name (e.g. from setup_new_game or the headless runner)
+GRID_BACKENDS = {"set": Grid, "array": ArrayGrid}
+
+
 def manhattan(a: Coord, b: Coord) -> int:
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
\ No newline at end of file
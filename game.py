@@ -1,79 +1,251 @@
+import random
+import time
+import numpy as np
 from typing import List
 from agent import Human, Zombie
+from agentstore import AgentStore, grid_masks
 from environment import Grid, Coord
-from typing import Set, Dict
+from danger import DangerMap
+from spatial import SpatialIndex
+from telemetry import Telemetry, SearchStats
+from pathcache import PathCache
+from typing import Set, Dict, Optional
+
+
+ZOMBIE_PATHING_MODES = ("astar", "flowfield", "hpa", "jps")
 
 
 class Game:
-    def __init__(self, grid: Grid, humans: List[Human], zombies: List[Zombie]):
+    def __init__(self, grid: Grid, humans: List[Human], zombies: List[Zombie], verbose: bool = True,
+                 zombie_pathing: str = "astar", danger_radius: int = 1, danger_weight: int = 1000,
+                 danger_falloff: str = "flat", index: Optional[SpatialIndex] = None,
+                 path_cache: Optional[PathCache] = None):
+        if zombie_pathing not in ZOMBIE_PATHING_MODES:
+            raise ValueError(f"Unknown zombie pathing mode '{zombie_pathing}'. Expected one of {ZOMBIE_PATHING_MODES}.")
         self.grid = grid
         self.humans = humans
         self.zombies = zombies
         self.turn = 0
         self.game_over = False
+        self.generation_time = 0.0 # Seconds spent generating the map (set by setup_new_game)
+        self.verbose = verbose # Headless runs switch off the console messages
+        # "astar": one search per zombie per turn. "flowfield": one shared distance field from all humans per turn.
+        # "hpa": one hierarchical search per zombie per turn over the grid's shared cluster graph.
+        # "jps": like "astar", but each search is a Jump Point Search.
+        self.zombie_pathing = zombie_pathing
+        # Shape of the danger penalty the human AI applies around zombies (see danger.DangerMap)
+        self.danger_radius = danger_radius
+        self.danger_weight = danger_weight
+        self.danger_falloff = danger_falloff
+        self._danger: Optional[DangerMap] = None # Reused and updated incrementally by danger_map()
+
+        # Optional per-turn instrumentation (telemetry.Telemetry); None keeps the hot loop untouched
+        self.telemetry: Optional[Telemetry] = None
+
+        # Optional replay.ReplayRecorder that appends a frame after every step
+        self.replay = None
+        self.seed: Optional[int] = None # random.seed used to generate this game (set by setup_new_game)
+
+        # Optional LRU cache of zombie A* routes, shared by every zombie of this game
+        self.path_cache = path_cache
+        for z in zombies:
+            z.path_cache = path_cache
+            z.search = "jps" if zombie_pathing == "jps" else "astar"
+
+        # Struct-of-arrays positions; humans and zombies become handles onto it
+        self.store = AgentStore(max(64, 2 * (len(humans) + len(zombies))))
+        for agent in humans + zombies:
+            self.store.attach(agent)
+        self._zombie_slots = np.array([z._slot for z in zombies], dtype=np.int64)
+        self._masks_key = None
+        self._masks = None
+        # Bulk flow-field wandering draws from the random module's stream so random.seed still fixes games
+        self._rng = np.random.default_rng(random.getrandbits(64))
+
+        # Bucket index of the humans for the zombies' nearest-human queries, updated incrementally
+        # whenever a human's pos changes. Zombies are not indexed: they only live in the store.
+        self.index = index if index is not None else SpatialIndex(grid.width, grid.height)
+        for h in humans:
+            if h._index is not self.index:
+                self.index.add(h)
+
+    def masks(self):
+        """Flat (passable, safe) boolean arrays by cell id, rebuilt when the map changes."""
+        key = (self.grid.version, len(self.grid.safe_zones))
+        if key != self._masks_key:
+            self._masks = grid_masks(self.grid)
+            self._masks_key = key
+        return self._masks
+
+    def zombie_slots(self) -> np.ndarray:
+        """Store slots of self.zombies, in list order."""
+        if len(self._zombie_slots) != len(self.zombies):
+            # Zombies were added to the list from outside Game
+            for z in self.zombies[len(self._zombie_slots):]:
+                if z._store is not self.store:
+                    self.store.attach(z)
+            self._zombie_slots = np.array([z._slot for z in self.zombies], dtype=np.int64)
+        return self._zombie_slots
+
+    def human_slots(self) -> np.ndarray:
+        """Store slots of self.humans, in list order."""
+        return np.array([h._slot for h in self.humans], dtype=np.int64)
+
+    def nearest_human_cells(self, slots: np.ndarray) -> np.ndarray:
+        """Cell id of the human nearest (Manhattan) to each agent in `slots`."""
+        humans = self.human_slots()
+        hx, hy = self.store.xs[humans].astype(np.int64), self.store.ys[humans].astype(np.int64)
+        gaps = (np.abs(self.store.xs[slots].astype(np.int64)[:, None] - hx)
+                + np.abs(self.store.ys[slots].astype(np.int64)[:, None] - hy))
+        nearest = gaps.argmin(axis=1)
+        return hy[nearest] * self.grid.width + hx[nearest]
+
+    def zombie_positions(self) -> np.ndarray:
+        """(n, 2) array of zombie (x, y) positions."""
+        slots = self.zombie_slots()
+        return np.column_stack((self.store.xs[slots], self.store.ys[slots]))
+
+    def danger_map(self) -> DangerMap:
+        """This game's DangerMap moved to the current zombie positions.
+
+        The map is kept between turns so only the cells around zombies that moved are touched; it is
+        rebuilt when danger_radius, danger_weight or danger_falloff were changed.
+        """
+        danger = self._danger
+        if danger is None or (danger.radius, danger.weight, danger.falloff) != (
+                self.danger_radius, self.danger_weight, self.danger_falloff):
+            self._danger = DangerMap(self.grid, self.zombie_positions(), self.danger_radius,
+                                     self.danger_weight, self.danger_falloff)
+        else:
+            danger.update(self.zombie_positions())
+        return self._danger
 
     def human_turn(self, direction: str):
         """Move all humans in the specified direction and check victory."""
         if self.game_over or not self.humans:
             return
+        telemetry = self.telemetry
+        if telemetry is not None:
+            start = time.perf_counter()
+
+        # Refresh the danger map once per turn and share it between all humans
+        danger = self.danger_map() if direction == "auto" else None
 
         for h in self.humans:
             # Pass zombies list for Human's 'auto' logic to avoid them
-            h.move(direction, self.zombies) 
+            if telemetry is not None:
+                stats = SearchStats()
+                h.move(direction, self.zombies, danger, stats)
+                if stats.expanded:
+                    telemetry.add_search(self.turn, stats)
+            else:
+                h.move(direction, self.zombies, danger) 
 
         self.check_victory()
+        if telemetry is not None:
+            telemetry.record_for(self.turn)["human_ms"] += (time.perf_counter() - start) * 1000
 
     # MODIFIED: Coordinated zombie movement
     def zombie_turn(self):
         """Move all zombies toward humans and handle catches, preventing collisions."""
         if self.game_over:
             return
+        telemetry = self.telemetry
+        if telemetry is not None:
+            start = time.perf_counter()
 
         # Track positions that a zombie has already claimed as its destination this turn.
         claimed_positions: Set[Coord] = set()
         pending_moves: Dict[Zombie, Coord] = {}
 
         # 1. Calculate all moves in order, respecting claimed spots
-        for z in self.zombies:
-            # The zombie treats all claimed_positions as temporary obstacles
-            next_pos = z.chase(self.humans, claimed_positions) 
-            
-            pending_moves[z] = next_pos
-            claimed_positions.add(next_pos) # Claim the position for this zombie
+        if self.zombie_pathing == "flowfield":
+            # One BFS from all humans serves every zombie, and the downhill step runs over the
+            # store's arrays, so no per-zombie Python work is done
+            dist = np.frombuffer(self.grid.distance_ids(h.pos for h in self.humans), dtype=np.int32)
+            passable, _ = self.masks()
+            slots = self.zombie_slots()
+            self.store.step_downhill(slots, dist, passable, self.grid.width, self.grid.height, self._rng,
+                                     self.nearest_human_cells(slots) if self.humans else None)
+        else:
+            # All zombies share the grid's cluster graph; it repairs itself if obstacles changed
+            hpa = self.grid.hierarchy() if self.zombie_pathing == "hpa" else None
+            for z in self.zombies:
+                # The zombie treats all claimed_positions as temporary obstacles
+                if telemetry is not None:
+                    stats = SearchStats()
+                    next_pos = z.chase(self.humans, claimed_positions, self.index, stats, hpa)
+                    telemetry.add_search(self.turn, stats)
+                else:
+                    next_pos = z.chase(self.humans, claimed_positions, self.index, hpa=hpa)
+                
+                pending_moves[z] = next_pos
+                claimed_positions.add(next_pos) # Claim the position for this zombie
 
         # 2. Execute all calculated moves
         for z, new_pos in pending_moves.items():
             z.move_to(new_pos)
 
-        # 3. Check for caught humans
+        # 3. Check for caught humans: one array membership test of human cells against zombie cells
         new_zombies = []
-        for z in self.zombies:
-            for h in list(self.humans):
-                if z.pos == h.pos:
+        caught = set()
+        width = self.grid.width
+        if self.humans:
+            human_cells = self.store.cell_ids(self.human_slots(), width)
+            hit = np.isin(human_cells, self.store.cell_ids(self.zombie_slots(), width))
+            for i in np.flatnonzero(hit).tolist():
+                h = self.humans[i]
+                if self.verbose:
                     print(f"Human at {h.pos} caught!")
-                    self.humans.remove(h)
-                    # The caught human becomes a new zombie
-                    new_zombies.append(Zombie(h.pos, self.grid))
+                self.index.remove(h)
+                self.store.kill(h._slot)
+                caught.add(h)
+                # The caught human becomes a new zombie
+                new_zombies.append(Zombie(h.pos, self.grid))
 
+        if caught:
+            self.humans[:] = [h for h in self.humans if h not in caught]
+        for z in new_zombies:
+            z.path_cache = self.path_cache
+            z.search = "jps" if self.zombie_pathing == "jps" else "astar"
+            self.store.attach(z)
         self.zombies.extend(new_zombies)
+        if new_zombies:
+            self._zombie_slots = np.concatenate((self._zombie_slots, [z._slot for z in new_zombies]))
         self.check_victory()
+        if telemetry is not None:
+            telemetry.record_for(self.turn)["zombie_ms"] += (time.perf_counter() - start) * 1000
 
     def check_victory(self):
         """Check if humans reached safe zones or all were caught."""
-        if self.humans and all(self.grid.is_safe(h.pos) for h in self.humans):
+        _, safe = self.masks()
+        if self.humans and safe[self.store.cell_ids(self.human_slots(), self.grid.width)].all():
             self.game_over = True
-            print("All humans reached safety! Humans win!")
+            if self.verbose:
+                print("All humans reached safety! Humans win!")
         elif not self.humans:
             self.game_over = True
-            print("All humans were caught! Zombies win!")
+            if self.verbose:
+                print("All humans were caught! Zombies win!")
 
     def step(self, human_direction: str):
         """Perform one game step: human moves, then zombies move."""
         if self.game_over:
             return
+        telemetry = self.telemetry
+        if telemetry is not None:
+            start = time.perf_counter()
 
         self.human_turn(human_direction)
         if not self.game_over:
             self.zombie_turn()
 
-        self.turn += 1
\ No newline at end of file
+        if telemetry is not None:
+            record = telemetry.record_for(self.turn)
+            record["step_ms"] = (time.perf_counter() - start) * 1000
+            record["humans"] = len(self.humans)
+            record["zombies"] = len(self.zombies)
+
+        self.turn += 1
+        if self.replay is not None:
+            self.replay.record(human_direction)
\ No newline at end of file
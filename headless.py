@@ -0,0 +1,146 @@
+"""Headless batch runner: plays full auto-mode episodes without pygame.
+
+Usage:
+    python headless.py --episodes 1000 --out results.jsonl
+    python headless.py --episodes 1000 --maps maps.zsm
+"""
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Iterable, Iterator, Optional
+
+from agent import HUMAN_PLANNERS
+from environment import GRID_BACKENDS
+from game import ZOMBIE_PATHING_MODES
+from maplib import MapLibrary
+from replay import ReplayRecorder
+from scenario import setup_new_game, GRID_SIZE, NUM_OBSTACLES, NUM_ZOMBIES, NUM_LANDMARKS
+
+_LIBRARIES: Dict[str, MapLibrary] = {} # Opened once per worker process and kept mapped
+
+
+def run_episode(seed: int, grid_size: int = GRID_SIZE, num_obstacles: int = NUM_OBSTACLES,
+                num_zombies: int = NUM_ZOMBIES, max_turns: Optional[int] = None,
+                zombie_pathing: str = "astar", grid_backend: str = "set",
+                human_planner: str = "astar", landmarks: int = NUM_LANDMARKS,
+                path_cache_size: int = 0, replay_dir: Optional[str] = None,
+                maps: Optional[str] = None) -> Dict:
+    """Plays one episode with the human in 'auto' mode and returns its result record.
+
+    With `maps` (a maplib library) the episode plays library map `seed % len(library)` instead
+    of generating one; the map's own size settings apply and the grid is always an ArrayGrid.
+    """
+    start = time.perf_counter()
+    if maps is None:
+        game = setup_new_game(grid_size, num_obstacles, num_zombies, verbose=False,
+                              zombie_pathing=zombie_pathing, grid_backend=grid_backend,
+                              human_planner=human_planner, landmarks=landmarks,
+                              path_cache_size=path_cache_size, seed=seed)
+    else:
+        library = _LIBRARIES.get(maps)
+        if library is None:
+            library = _LIBRARIES[maps] = MapLibrary(maps)
+        random.seed(seed) # The map needs no draws; this fixes the zombies' random fallback moves
+        game = library.game(seed % len(library), zombie_pathing=zombie_pathing, human_planner=human_planner,
+                            landmarks=landmarks, path_cache_size=path_cache_size)
+        grid_size = library.width
+    if max_turns is None:
+        # Generous cap so a stalled human (no path) cannot hang a worker forever
+        max_turns = grid_size * grid_size * 4
+
+    replay_path = None
+    if replay_dir is not None:
+        replay_path = os.path.join(replay_dir, f"seed-{seed}.zsr")
+        game.replay = ReplayRecorder(replay_path, game)
+    while not game.game_over and game.turn < max_turns:
+        game.step("auto")
+    wall_time = time.perf_counter() - start
+    if game.replay is not None:
+        game.replay.close()
+
+    if not game.game_over:
+        winner = "timeout"
+    else:
+        winner = "humans" if game.humans else "zombies"
+
+    result = {
+        "seed": seed,
+        "winner": winner,
+        "turns": game.turn,
+        "zombies": len(game.zombies),
+        "generation_time": round(game.generation_time, 6),
+        "wall_time": round(wall_time, 6),
+    }
+    if game.path_cache is not None:
+        result["path_cache_hits"] = game.path_cache.hits
+        result["path_cache_misses"] = game.path_cache.misses
+    if replay_path is not None:
+        result["replay"] = replay_path
+    return result
+
+
+def run_batch(seeds: Iterable[int], workers: Optional[int] = None, **episode_kwargs) -> Iterator[Dict]:
+    """Runs one episode per seed across a process pool, yielding results as they finish."""
+    seeds = list(seeds)
+    episode = partial(run_episode, **episode_kwargs)
+
+    if workers == 1:
+        for seed in seeds:
+            yield episode(seed)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    # Small chunks keep the pool busy without holding results back for too long
+    chunksize = max(1, len(seeds) // (workers * 16))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(episode, seeds, chunksize=chunksize):
+            yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Zombie Surviver episodes headlessly.")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first episode; episode i uses seed + i.")
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE)
+    parser.add_argument("--obstacles", type=int, default=NUM_OBSTACLES)
+    parser.add_argument("--zombies", type=int, default=NUM_ZOMBIES)
+    parser.add_argument("--max-turns", type=int, default=None)
+    parser.add_argument("--zombie-pathing", choices=ZOMBIE_PATHING_MODES, default="astar")
+    parser.add_argument("--grid-backend", choices=sorted(GRID_BACKENDS), default="set")
+    parser.add_argument("--human-planner", choices=HUMAN_PLANNERS, default="astar")
+    parser.add_argument("--path-cache", type=int, default=0, help="Zombie path cache LRU limit (0: disabled).")
+    parser.add_argument("--landmarks", type=int, default=NUM_LANDMARKS, help="ALT landmarks per map (0: Manhattan only).")
+    parser.add_argument("--maps", default=None, help="Play maps from this maplib library instead of generating them.")
+    parser.add_argument("--replay-dir", default=None, help="Write a replay of every episode into this directory.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument("--out", default="results.jsonl", help="JSON-lines file that receives one record per episode.")
+    args = parser.parse_args(argv)
+
+    if args.replay_dir is not None:
+        os.makedirs(args.replay_dir, exist_ok=True)
+    seeds = range(args.seed, args.seed + args.episodes)
+    wins = {"humans": 0, "zombies": 0, "timeout": 0}
+    start = time.perf_counter()
+
+    with open(args.out, "w") as out:
+        for result in run_batch(seeds, workers=args.workers, grid_size=args.grid_size,
+                                num_obstacles=args.obstacles, num_zombies=args.zombies,
+                                max_turns=args.max_turns, zombie_pathing=args.zombie_pathing,
+                                grid_backend=args.grid_backend, human_planner=args.human_planner,
+                                landmarks=args.landmarks, path_cache_size=args.path_cache,
+                                replay_dir=args.replay_dir, maps=args.maps):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            wins[result["winner"]] += 1
+
+    elapsed = time.perf_counter() - start
+    print(f"{args.episodes} episodes in {elapsed:.2f}s "
+          f"(humans {wins['humans']}, zombies {wins['zombies']}, timeouts {wins['timeout']}) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
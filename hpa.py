@@ -0,0 +1,257 @@
+import heapq
+from collections import deque
+from environment import Grid, Coord, manhattan
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+Cluster = Tuple[int, int]
+
+
+class HPAPlanner:
+    """Hierarchical pathfinding (HPA*) over a Grid split into cluster_size x cluster_size clusters.
+
+    Entrances are found on every border between neighboring clusters: each run of cells that is
+    open on both sides gets one entrance pair in its middle, or one at each end when the run is
+    long. Entrance cells are the nodes of an abstract graph; crossing a border costs 1 and
+    intra-cluster edges hold BFS distances inside the cluster. Intra-cluster edges are built the
+    first time a search touches a cluster, so huge maps do not pay for clusters nobody crosses.
+
+    A query plans a coarse route over the abstract graph and then refines it one cluster at a
+    time; `next_step` only refines the first leg. When obstacles change (detected through
+    grid.version), only the clusters containing changed cells and their borders are rebuilt.
+    """
+
+    LONG_ENTRANCE = 6 # Runs at least this long get two entrances instead of one
+
+    def __init__(self, grid: Grid, cluster_size: int = 16):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.clusters_x = (grid.width + cluster_size - 1) // cluster_size
+        self.clusters_y = (grid.height + cluster_size - 1) // cluster_size
+        self._border_entrances: Dict[Tuple[Cluster, Cluster], List[Tuple[Coord, Coord]]] = {}
+        self._nodes: Dict[Cluster, Set[Coord]] = {}
+        self._inter: Dict[Coord, Set[Coord]] = {} # Entrance cell -> entrance cells across a border
+        self._intra: Dict[Cluster, Dict[Coord, Dict[Coord, int]]] = {} # Built lazily per cluster
+        self._build()
+
+    # --- Construction ---
+    def cluster_of(self, pos: Coord) -> Cluster:
+        return (pos[0] // self.cluster_size, pos[1] // self.cluster_size)
+
+    def _bounds(self, cluster: Cluster) -> Tuple[int, int, int, int]:
+        """(x0, y0, x1, y1) of a cluster, upper bounds exclusive."""
+        cs = self.cluster_size
+        x0, y0 = cluster[0] * cs, cluster[1] * cs
+        return x0, y0, min(x0 + cs, self.grid.width), min(y0 + cs, self.grid.height)
+
+    def _in_cluster(self, pos: Coord, cluster: Cluster) -> bool:
+        return pos[0] // self.cluster_size == cluster[0] and pos[1] // self.cluster_size == cluster[1]
+
+    def _build(self):
+        self._obstacles = set(self.grid.obstacles)
+        self._version = self.grid.version
+        for cy in range(self.clusters_y):
+            for cx in range(self.clusters_x):
+                if cx + 1 < self.clusters_x:
+                    self._scan_border((cx, cy), (cx + 1, cy))
+                if cy + 1 < self.clusters_y:
+                    self._scan_border((cx, cy), (cx, cy + 1))
+
+    def _scan_border(self, a: Cluster, b: Cluster):
+        """Finds the entrances between cluster a and the cluster b to its right or below it."""
+        passable = self.grid.passable
+        x0, y0, x1, y1 = self._bounds(a)
+        if b[0] > a[0]:
+            pairs = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        else:
+            pairs = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+
+        entrances: List[Tuple[Coord, Coord]] = []
+        run: List[Tuple[Coord, Coord]] = []
+        for pair in pairs + [None]: # Trailing None closes the last run
+            if pair is not None and passable(pair[0]) and passable(pair[1]):
+                run.append(pair)
+                continue
+            if run:
+                if len(run) >= self.LONG_ENTRANCE:
+                    entrances.extend((run[0], run[-1]))
+                else:
+                    entrances.append(run[len(run) // 2])
+                run = []
+
+        self._border_entrances[(a, b)] = entrances
+        for cell_a, cell_b in entrances:
+            self._nodes.setdefault(a, set()).add(cell_a)
+            self._nodes.setdefault(b, set()).add(cell_b)
+            self._inter.setdefault(cell_a, set()).add(cell_b)
+            self._inter.setdefault(cell_b, set()).add(cell_a)
+
+    def _drop_border(self, a: Cluster, b: Cluster):
+        for cell_a, cell_b in self._border_entrances.pop((a, b), []):
+            self._inter[cell_a].discard(cell_b)
+            self._inter[cell_b].discard(cell_a)
+
+    def _cluster_bfs(self, source: Coord, cluster: Cluster) -> Dict[Coord, int]:
+        """Step distances from source to every cell reachable without leaving the cluster."""
+        dist: Dict[Coord, int] = {source: 0}
+        queue: Deque[Coord] = deque([source])
+        while queue:
+            current = queue.popleft()
+            next_dist = dist[current] + 1
+            for neighbor in self.grid.neighbors(current):
+                if neighbor not in dist and self._in_cluster(neighbor, cluster):
+                    dist[neighbor] = next_dist
+                    queue.append(neighbor)
+        return dist
+
+    def _intra_edges(self, cluster: Cluster) -> Dict[Coord, Dict[Coord, int]]:
+        edges = self._intra.get(cluster)
+        if edges is None:
+            nodes = self._nodes.get(cluster, set())
+            edges = {}
+            for node in nodes:
+                dist = self._cluster_bfs(node, cluster)
+                edges[node] = {other: dist[other] for other in nodes if other != node and other in dist}
+            self._intra[cluster] = edges
+        return edges
+
+    # --- Map changes ---
+    def refresh(self):
+        """Rebuilds only the clusters touched by obstacle changes since the last query."""
+        if self.grid.version == self._version:
+            return
+        changed = self._obstacles ^ self.grid.obstacles
+        self._obstacles = set(self.grid.obstacles)
+        self._version = self.grid.version
+        self.update_cells(changed)
+
+    def update_cells(self, cells):
+        """Recomputes entrances and intra-cluster edges around the given changed cells."""
+        dirty = {self.cluster_of(pos) for pos in cells}
+        borders = set()
+        for cx, cy in dirty:
+            for a, b in (((cx - 1, cy), (cx, cy)), ((cx, cy), (cx + 1, cy)),
+                         ((cx, cy - 1), (cx, cy)), ((cx, cy), (cx, cy + 1))):
+                if 0 <= a[0] and 0 <= a[1] and b[0] < self.clusters_x and b[1] < self.clusters_y:
+                    borders.add((a, b))
+
+        touched = {c for border in borders for c in border} | dirty
+        for border in borders:
+            self._drop_border(*border)
+        for cluster in touched:
+            # Rebuilt below from the surviving borders plus the rescanned ones
+            self._nodes[cluster] = set()
+            self._intra.pop(cluster, None)
+        for (a, b), entrances in self._border_entrances.items():
+            if a in touched or b in touched:
+                for cell_a, cell_b in entrances:
+                    self._nodes.setdefault(a, set()).add(cell_a)
+                    self._nodes.setdefault(b, set()).add(cell_b)
+        for border in borders:
+            self._scan_border(*border)
+        for cell in [c for c, across in self._inter.items() if not across]:
+            del self._inter[cell]
+
+    # --- Queries ---
+    def abstract_path(self, start: Coord, goal: Coord) -> Optional[List[Coord]]:
+        """Coarse route start -> entrance cells -> goal, or None if goal is unreachable."""
+        self.refresh()
+        if start == goal:
+            return [start]
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+
+        # Temporary edges linking start and goal to the entrances of their own clusters
+        start_dist = self._cluster_bfs(start, start_cluster)
+        start_links = {n: start_dist[n] for n in self._nodes.get(start_cluster, ()) if n in start_dist}
+        if goal_cluster == start_cluster and goal in start_dist:
+            start_links[goal] = start_dist[goal]
+        goal_dist = self._cluster_bfs(goal, goal_cluster)
+        goal_links = {n: goal_dist[n] for n in self._nodes.get(goal_cluster, ()) if n in goal_dist}
+
+        g_cost: Dict[Coord, int] = {start: 0}
+        came_from: Dict[Coord, Optional[Coord]] = {start: None}
+        priority_queue: List[Tuple[int, Coord]] = [(manhattan(start, goal), start)]
+        while priority_queue:
+            f, current = heapq.heappop(priority_queue)
+            if current == goal:
+                route: List[Coord] = []
+                while current is not None:
+                    route.append(current)
+                    current = came_from[current]
+                return route[::-1]
+            current_g = g_cost[current]
+            if f - manhattan(current, goal) > current_g:
+                continue # Stale queue entry
+
+            if current == start:
+                edges = list(start_links.items())
+            else:
+                edges = list(self._intra_edges(self.cluster_of(current)).get(current, {}).items())
+                if current in goal_links:
+                    edges.append((goal, goal_links[current]))
+            edges += [(across, 1) for across in self._inter.get(current, ())]
+            for neighbor, cost in edges:
+                new_g = current_g + cost
+                if neighbor not in g_cost or new_g < g_cost[neighbor]:
+                    g_cost[neighbor] = new_g
+                    came_from[neighbor] = current
+                    heapq.heappush(priority_queue, (new_g + manhattan(neighbor, goal), neighbor))
+        return None
+
+    def refine_leg(self, a: Coord, b: Coord, penalties: Optional[Dict[Coord, int]] = None,
+                   blocked: Optional[Set[Coord]] = None) -> Optional[List[Coord]]:
+        """Concrete cells from a (exclusive) to b (inclusive) for one leg of an abstract route.
+
+        Legs inside a cluster are searched with A* restricted to that cluster; `penalties` are
+        added to the priority like the human's danger-aware A*, and `blocked` cells (other than
+        b) are avoided like the zombie's claimed cells.
+        """
+        if a == b:
+            return []
+        if manhattan(a, b) == 1 and self.cluster_of(a) != self.cluster_of(b):
+            return [b] # Border crossing between two entrance cells
+        cluster = self.cluster_of(a)
+        g_cost: Dict[Coord, int] = {a: 0}
+        came_from: Dict[Coord, Optional[Coord]] = {a: None}
+        priority_queue: List[Tuple[int, Coord]] = [(manhattan(a, b), a)]
+        while priority_queue:
+            _, current = heapq.heappop(priority_queue)
+            if current == b:
+                path: List[Coord] = []
+                while came_from[current] is not None:
+                    path.append(current)
+                    current = came_from[current]
+                return path[::-1]
+            for neighbor in self.grid.neighbors(current):
+                if not self._in_cluster(neighbor, cluster):
+                    continue
+                if blocked is not None and neighbor in blocked and neighbor != b:
+                    continue
+                new_g = g_cost[current] + 1
+                if neighbor not in g_cost or new_g < g_cost[neighbor]:
+                    g_cost[neighbor] = new_g
+                    came_from[neighbor] = current
+                    penalty = penalties.get(neighbor, 0) if penalties is not None else 0
+                    heapq.heappush(priority_queue, (new_g + manhattan(neighbor, b) + penalty, neighbor))
+        return None
+
+    def find_path(self, start: Coord, goal: Coord, penalties: Optional[Dict[Coord, int]] = None) -> Optional[List[Coord]]:
+        """Fully refined path from start (exclusive) to goal (inclusive)."""
+        route = self.abstract_path(start, goal)
+        if route is None:
+            return None
+        path: List[Coord] = []
+        for a, b in zip(route, route[1:]):
+            leg = self.refine_leg(a, b, penalties)
+            if leg is None:
+                return None
+            path.extend(leg)
+        return path
+
+    def next_step(self, start: Coord, goal: Coord, blocked: Optional[Set[Coord]] = None) -> Optional[Coord]:
+        """First step towards goal, refining only the first leg of the coarse route."""
+        route = self.abstract_path(start, goal)
+        if route is None or len(route) < 2:
+            return None
+        leg = self.refine_leg(route[0], route[1], blocked=blocked)
+        return leg[0] if leg else None
@@ -0,0 +1,191 @@
+import heapq
+from array import array
+from environment import Grid, Coord
+from telemetry import SearchStats
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+
+class JumpTables:
+    """Per-map data for Jump Point Search, built once per obstacle layout (see Grid.jump_tables).
+
+    Cells are indexed on a copy of the map padded with a one-cell wall, so scans need no
+    bounds checks: index = (y + 1) * stride + x + 1. `mask` holds 1 for open cells. For
+    each horizontal direction, `stop[dx][i]` is the number of steps from cell i to the next
+    cell with a forced neighbor, or minus the number of steps to the last open cell when the
+    row runs into a wall first (0: blocked right away). A horizontal jump is then one lookup.
+    """
+
+    def __init__(self, grid: Grid):
+        self.width = grid.width
+        self.stride = grid.width + 2
+        stride = self.stride
+        mask = bytearray(stride * (grid.height + 2))
+        for y in range(grid.height):
+            row = (y + 1) * stride + 1
+            for x in range(grid.width):
+                if grid.passable((x, y)):
+                    mask[row + x] = 1
+        self.mask = mask
+
+        self.stop: Dict[int, array] = {}
+        for dx in (1, -1):
+            stop = array("i", [0]) * len(mask)
+            xs = range(grid.width - 1, -1, -1) if dx == 1 else range(grid.width)
+            for y in range(grid.height):
+                row = (y + 1) * stride + 1
+                for x in xs:
+                    i = row + x
+                    j = i + dx
+                    if not mask[j]:
+                        stop[i] = 0
+                    elif forced_horizontal(mask, j, dx, stride):
+                        stop[i] = 1
+                    else:
+                        ahead = stop[j]
+                        stop[i] = ahead + 1 if ahead > 0 else ahead - 1
+            self.stop[dx] = stop
+
+    def index(self, pos: Coord) -> int:
+        return (pos[1] + 1) * self.stride + pos[0] + 1
+
+    def coord(self, i: int) -> Coord:
+        return (i % self.stride - 1, i // self.stride - 1)
+
+
+def forced_horizontal(mask, i: int, dx: int, stride: int) -> bool:
+    """Moving horizontally into i, a cell above or below opens up that was walled off one step back."""
+    return ((mask[i - stride] and not mask[i - dx - stride]) or
+            (mask[i + stride] and not mask[i - dx + stride]))
+
+
+class JumpPointSearch:
+    """Jump Point Search for a 4-connected, uniform-cost grid.
+
+    Instead of pushing every neighbor, the search runs in straight lines and only stops at
+    jump points: the goal, or a cell where an obstacle ends and opens a new shortest route
+    (a forced neighbor). Moving vertically, every cell is also probed left and right, and
+    becomes a jump point if either probe finds one. Between jump points the path is straight,
+    so g-costs are Manhattan distances and far fewer nodes reach the heap in open areas.
+
+    Horizontal probes are table lookups (JumpTables), except in rows next to a `blocked`
+    cell: blocked cells (other than the goal) are obstacles for this search only, like the
+    zombies' claimed cells, so those rows are scanned cell by cell. Costs are uniform:
+    callers with per-cell costs must use A* instead.
+    """
+
+    def __init__(self, grid: Grid, goal: Coord, blocked: Optional[Set[Coord]] = None):
+        self.tables = grid.jump_tables()
+        tables = self.tables
+        self.stride = tables.stride
+        self.goal = tables.index(goal)
+        self.mask = tables.mask
+        self._scan_rows: Set[int] = set()
+        if blocked:
+            # Private copy with the blocked cells walled off; the tables are wrong next to them
+            self.mask = bytearray(tables.mask)
+            for pos in blocked:
+                if pos != goal and 0 <= pos[0] < grid.width and 0 <= pos[1] < grid.height:
+                    self.mask[tables.index(pos)] = 0
+                    self._scan_rows.update((pos[1], pos[1] + 1, pos[1] + 2)) # Padded rows y - 1 .. y + 1
+
+    def jump_horizontal(self, i: int, dx: int) -> int:
+        """First jump point from i moving dx along the row, or -1 at a dead end."""
+        goal = self.goal
+        stride = self.stride
+        if i // stride in self._scan_rows:
+            mask = self.mask
+            while True:
+                i += dx
+                if not mask[i]:
+                    return -1
+                if i == goal or forced_horizontal(mask, i, dx, stride):
+                    return i
+        steps = self.tables.stop[dx][i]
+        reach = steps if steps > 0 else -steps
+        if goal // stride == i // stride and 0 < (goal - i) * dx <= reach:
+            return goal
+        return i + dx * steps if steps > 0 else -1
+
+    def jump_vertical(self, i: int, dy: int) -> int:
+        """First jump point from i moving dy rows (dy = +-stride), or -1 at a dead end."""
+        mask, goal = self.mask, self.goal
+        while True:
+            i += dy
+            if not mask[i]:
+                return -1
+            if i == goal:
+                return i
+            if (mask[i - 1] and not mask[i - 1 - dy]) or (mask[i + 1] and not mask[i + 1 - dy]):
+                return i
+            # Vertical runs branch sideways anywhere, so a horizontal jump point makes this one
+            if self.jump_horizontal(i, 1) >= 0 or self.jump_horizontal(i, -1) >= 0:
+                return i
+
+    def search(self, start: Coord, heuristic: Optional[Callable[[Coord], int]] = None,
+               stats: Optional[SearchStats] = None) -> Optional[List[Coord]]:
+        """Full path from start (exclusive) to the goal (inclusive), or None if unreachable."""
+        tables, stride, goal = self.tables, self.stride, self.goal
+        coord = tables.coord
+        if heuristic is None:
+            gx, gy = coord(goal)
+            heuristic = lambda pos: abs(pos[0] - gx) + abs(pos[1] - gy)
+        origin = tables.index(start)
+        if origin == goal:
+            return []
+
+        g_cost: Dict[int, int] = {origin: 0}
+        came_from: Dict[int, int] = {origin: -1}
+        priority_queue: List[Tuple[int, int]] = [(heuristic(start), origin)]
+        closed: Set[int] = set()
+
+        while priority_queue:
+            _, current = heapq.heappop(priority_queue)
+            if current in closed:
+                continue
+            closed.add(current)
+            if stats is not None:
+                stats.expanded += 1
+            if current == goal:
+                return self._expand(current, came_from)
+
+            # Pruned directions: a horizontal run continues or turns; a vertical one too
+            parent = came_from[current]
+            if parent < 0:
+                moves = (1, -1, stride, -stride)
+            elif abs(current - parent) < stride:
+                dx = 1 if current > parent else -1
+                moves = (dx, stride, -stride)
+            else:
+                dy = stride if current > parent else -stride
+                moves = (dy, 1, -1)
+
+            for move in moves:
+                if move == 1 or move == -1:
+                    jump_point = self.jump_horizontal(current, move)
+                    run = abs(jump_point - current)
+                else:
+                    jump_point = self.jump_vertical(current, move)
+                    run = abs(jump_point - current) // stride
+                if jump_point < 0 or jump_point in closed:
+                    continue
+                new_g = g_cost[current] + run
+                if jump_point not in g_cost or new_g < g_cost[jump_point]:
+                    g_cost[jump_point] = new_g
+                    came_from[jump_point] = current
+                    heapq.heappush(priority_queue, (new_g + heuristic(coord(jump_point)), jump_point))
+                    if stats is not None:
+                        stats.pushed += 1
+                        stats.heap_peak = max(stats.heap_peak, len(priority_queue))
+        return None
+
+    def _expand(self, node: int, came_from: Dict[int, int]) -> List[Coord]:
+        """Fills in the straight runs between consecutive jump points."""
+        stride, coord = self.stride, self.tables.coord
+        path: List[Coord] = []
+        while came_from[node] >= 0:
+            parent = came_from[node]
+            step = (1 if node > parent else -1) * (1 if abs(node - parent) < stride else stride)
+            while node != parent:
+                path.append(coord(node))
+                node -= step
+        return path[::-1]
@@ -0,0 +1,235 @@
+import time
+from array import array
+from collections import Counter
+from environment import Grid, Coord
+from telemetry import SearchStats
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+MASK64 = (1 << 64) - 1
+HUMAN, ZOMBIE = 0, 1
+
+
+def zobrist_key(cell_id: int, kind: int, count: int = 1) -> int:
+    """64-bit key of `count` agents of `kind` on a cell (splitmix64 of the triple, so no key table is stored).
+
+    Zombies are hashed per occupied cell and count rather than one key each: XOR-ing equal
+    keys would let two zombies on one cell cancel out and collide with the empty cell.
+    """
+    z = (cell_id * 2 + kind + 1 + ((count - 1) << 48)) * 0x9E3779B97F4A7C15 & MASK64
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EB & MASK64
+    return z ^ (z >> 31)
+
+
+class LookaheadState(NamedTuple):
+    """Positions-only copy of a game from one human's point of view; the Grid is shared, not copied.
+
+    States are immutable: simulating a move builds a child state and leaves the parent intact,
+    so undoing a move during the search is just dropping the child. `key` is the Zobrist hash
+    (XOR of the human's key and one key per zombie-occupied cell and its zombie count), updated
+    incrementally from the parent's.
+    """
+    human: Coord
+    zombies: Tuple[Coord, ...]
+    key: int
+
+    @classmethod
+    def from_positions(cls, width: int, human: Coord, zombies: Iterable[Coord]) -> "LookaheadState":
+        zombies = tuple(zombies)
+        key = zobrist_key(human[1] * width + human[0], HUMAN)
+        for (x, y), count in Counter(zombies).items():
+            key ^= zobrist_key(y * width + x, ZOMBIE, count)
+        return cls(human, zombies, key)
+
+
+def move_zombie_key(key: int, counts: Dict[Coord, int], width: int, old: Coord, new: Coord) -> int:
+    """Updates `key` and the per-cell zombie `counts` for one zombie stepping from old to new."""
+    n = counts[old]
+    cell = old[1] * width + old[0]
+    key ^= zobrist_key(cell, ZOMBIE, n)
+    if n > 1:
+        key ^= zobrist_key(cell, ZOMBIE, n - 1)
+        counts[old] = n - 1
+    else:
+        del counts[old]
+    n = counts.get(new, 0)
+    cell = new[1] * width + new[0]
+    if n:
+        key ^= zobrist_key(cell, ZOMBIE, n)
+    counts[new] = n + 1
+    return key ^ zobrist_key(cell, ZOMBIE, n + 1)
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+class LookaheadPlanner:
+    """Depth-limited lookahead for the human AI, with iterative deepening under a search budget.
+
+    Each ply tries every human move (stay or one of the passable neighbors) and answers it with
+    a predicted zombie turn: zombies step, in list order, to the unclaimed neighbor that is
+    closest to the human by `grid.heuristic_to` (the same estimate their A* uses). Reaching a
+    safe zone wins before the zombies move; a zombie stepping onto the human loses. Leaves are
+    scored by BFS distance to the nearest safe zone, plus a small bonus for distance to the
+    nearest zombie.
+
+    Results go into a transposition table keyed on the state's Zobrist hash, which is kept
+    between turns (and dropped when the map changes) and orders moves at the next depth.
+    Depths 2 and up are abandoned once `node_budget` nodes have been searched this turn, and
+    the best move of the deepest finished depth is played. The node budget does not depend on
+    machine speed, so seeded games stay reproducible. A wall-clock `time_budget_ms` can be set
+    as well, for interactive play; moves then depend on timing. With both None it searches
+    exactly `max_depth` plies.
+    """
+
+    WIN = 1_000_000
+    LOSS = -1_000_000
+    SAFE_WEIGHT = 10 # Score lost per step of distance to the nearest safe zone
+    DANGER_CAP = 5 # Zombies farther than this (Manhattan) do not change a leaf's score
+
+    def __init__(self, grid: Grid, max_depth: int = 8, node_budget: Optional[int] = 150,
+                 time_budget_ms: Optional[float] = None, max_entries: int = 1 << 18):
+        self.grid = grid
+        self.max_depth = max_depth
+        self.node_budget = node_budget
+        self.time_budget_ms = time_budget_ms
+        self.max_entries = max_entries
+        self.table: Dict[int, Tuple[int, int, Optional[Coord]]] = {} # key -> (depth, value, best human move)
+        self.nodes = 0
+        self.depth_reached = 0
+        self._version = None
+        self._safe_dist: Optional[array] = None
+        self._deadline = 0.0
+
+    # --- Model ---
+    def _prepare(self):
+        """Per-map data: the safe zone distance field; the table is dropped when obstacles change."""
+        if self._version != self.grid.version or self._safe_dist is None:
+            self._safe_dist = self.grid.safe_distance_ids()
+            self.table.clear()
+            self._version = self.grid.version
+        elif len(self.table) > self.max_entries:
+            self.table.clear()
+
+    def human_moves(self, state: LookaheadState) -> List[Coord]:
+        return [state.human] + [n for n in self.grid.neighbors(state.human) if self.grid.passable(n)]
+
+    def simulate(self, state: LookaheadState, move: Coord) -> Tuple[Optional[LookaheadState], int]:
+        """Child state after the human steps to `move` and the zombies answer.
+
+        Returns (child, outcome) with outcome 1 for a win, -1 for a loss (child is then None)
+        and 0 otherwise.
+        """
+        if self.grid.is_safe(move):
+            return None, 1
+
+        width = self.grid.width
+        key = state.key
+        if move != state.human:
+            key ^= zobrist_key(state.human[1] * width + state.human[0], HUMAN)
+            key ^= zobrist_key(move[1] * width + move[0], HUMAN)
+
+        h = self.grid.heuristic_to(move)
+        counts = Counter(state.zombies)
+        claimed = set()
+        zombies = []
+        for pos in state.zombies:
+            best, best_h = pos, h(pos)
+            for n in self.grid.neighbors(pos):
+                if n in claimed or not self.grid.passable(n):
+                    continue
+                n_h = h(n)
+                if n_h < best_h:
+                    best, best_h = n, n_h
+            if best == move:
+                return None, -1
+            if best != pos:
+                key = move_zombie_key(key, counts, width, pos, best)
+            claimed.add(best)
+            zombies.append(best)
+        return LookaheadState(move, tuple(zombies), key), 0
+
+    def evaluate(self, state: LookaheadState) -> int:
+        x, y = state.human
+        dist = self._safe_dist[y * self.grid.width + x]
+        if dist < 0:
+            dist = self.grid.width * self.grid.height
+        nearest = min((abs(zx - x) + abs(zy - y) for zx, zy in state.zombies), default=self.DANGER_CAP)
+        return -self.SAFE_WEIGHT * dist + min(nearest, self.DANGER_CAP)
+
+    # --- Search ---
+    def _search(self, state: LookaheadState, depth: int, budgeted: bool) -> int:
+        if budgeted and ((self.node_budget is not None and self.nodes >= self.node_budget)
+                         or (self.time_budget_ms is not None and time.perf_counter() > self._deadline)):
+            raise _OutOfBudget
+        self.nodes += 1
+
+        entry = self.table.get(state.key)
+        if entry is not None and entry[0] >= depth:
+            return entry[1]
+        if depth == 0:
+            value = self.evaluate(state)
+            self.table[state.key] = (0, value, None)
+            return value
+
+        moves = self.human_moves(state)
+        if entry is not None and entry[2] in moves:
+            # Best move of a shallower search first
+            moves.remove(entry[2])
+            moves.insert(0, entry[2])
+
+        best_value, best_move = None, None
+        for move in moves:
+            child, outcome = self.simulate(state, move)
+            if outcome > 0:
+                value = self.WIN + depth # Sooner wins score higher
+            elif outcome < 0:
+                value = self.LOSS - depth # Sooner losses score lower
+            else:
+                value = self._search(child, depth - 1, budgeted)
+            if best_value is None or value > best_value:
+                best_value, best_move = value, move
+        self.table[state.key] = (depth, best_value, best_move)
+        return best_value
+
+    def principal_variation(self, state: LookaheadState, depth: int) -> List[Coord]:
+        """Planned human steps, read back from the table (for the path overlay)."""
+        line: List[Coord] = []
+        while depth > 0 and state is not None:
+            entry = self.table.get(state.key)
+            if entry is None or entry[2] is None:
+                break
+            move = entry[2]
+            line.append(move)
+            state, _ = self.simulate(state, move)
+            depth -= 1
+        return line
+
+    def plan(self, human: Coord, zombies: Iterable[Coord], stats: Optional[SearchStats] = None) -> List[Coord]:
+        """Searches ever deeper from the current position until the budget runs out.
+
+        Returns the principal variation: its first cell is the move to play (the human's own
+        cell when staying put is best). Empty only if the human cannot move at all.
+        """
+        self._prepare()
+        root = LookaheadState.from_positions(self.grid.width, human, zombies)
+        budgeted = self.node_budget is not None or self.time_budget_ms is not None
+        if self.time_budget_ms is not None:
+            self._deadline = time.perf_counter() + self.time_budget_ms / 1000
+        self.nodes = 0
+        self.depth_reached = 0
+
+        for depth in range(1, self.max_depth + 1):
+            try:
+                # Depth 1 always finishes, so there is a move even with no budget left
+                value = self._search(root, depth, budgeted and depth > 1)
+            except _OutOfBudget:
+                break
+            self.depth_reached = depth
+            if value >= self.WIN or value <= self.LOSS:
+                break # Forced result, deeper search cannot change it
+
+        if stats is not None:
+            stats.expanded += self.nodes
+        return self.principal_variation(root, self.depth_reached)
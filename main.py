@@ -1,137 +1,105 @@
-import random
-from environment import Grid, manhattan, Coord
-from agent import Human, Zombie
-from game import Game
-from visualization import Visualizer
-from typing import Set, List, Tuple
-import pygame
+"""Entry point of the interactive simulation.
+
+Usage:
+    python main.py [--seed N] [--record game.zsr]
+
+Importing this module has no side effects: pygame, the window and the first game are only
+created by main().
+"""
+import argparse
+import os
 import time
+from scenario import setup_new_game
+from replay import ReplayRecorder
+
+
+def replay_path(base: str, games_played: int) -> str:
+    """Replay file of the n-th game of a session: base for the first, then base-1, base-2, ..."""
+    if games_played == 0:
+        return base
+    stem, ext = os.path.splitext(base)
+    return f"{stem}-{games_played}{ext}"
+
+
+def stop_recording(game):
+    if game.replay is not None:
+        game.replay.close()
+        print(f"Replay saved to {game.replay.path}")
+        game.replay = None
+
+
+def main(argv=None):
+    # Reference point for the cold start report; module import costs are best read with
+    # `python -X importtime main.py`
+    launched = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Play Zombie Surviver.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed the first game so it can be reproduced.")
+    parser.add_argument("--record", default=None,
+                        help="Replay file for the first game; later games get -1, -2, ... before the extension.")
+    args = parser.parse_args(argv)
+
+    # Rendering is only needed from here on, so pygame is not loaded by importing this module
+    start = time.perf_counter()
+    import pygame
+    from visualization import Visualizer
+    imported = time.perf_counter()
+
+    games_played = 0
 
-# --- Configuration (Constants) ---
-GRID_SIZE = 15
-NUM_OBSTACLES = 30
-NUM_ZOMBIES = 3
-
-# Global Visualizer instance (or None if not initialized)
-viz: Visualizer = None
-
-
-def choose_max_distance_positions(grid_size: int) -> Tuple[Set[Coord], Coord]:
-    """Chooses a Safe Zone and a Human Start position that are maximally distant."""
-    all_possible_coords = [(x, y) for x in range(grid_size) for y in range(grid_size)]
-    
-    # 1. Pick a random point P1
-    p1 = random.choice(all_possible_coords)
-
-    # 2. Find the point P2 that is maximally distant from P1 (max distance is usually diagonal)
-    p2 = max(
-        all_possible_coords, 
-        key=lambda pos: manhattan(pos, p1)
-    )
-    
-    # Randomly assign p1 and p2 to Safe Zone and Human Start
-    if random.choice([True, False]):
-        SAFE_ZONE_POS: Set[Coord] = {p1}
-        HUMAN_START_POS: Coord = p2
-    else:
-        SAFE_ZONE_POS: Set[Coord] = {p2}
-        HUMAN_START_POS: Coord = p1
-        
-    return SAFE_ZONE_POS, HUMAN_START_POS
-
-
-def setup_new_game() -> Game:
-    """Sets up a new Grid, Humans, and Zombies, ensuring map connectivity."""
-    
-    # --- Randomize Safe Zone and Human Start ---
-    SAFE_ZONE_POS, HUMAN_START_POS = choose_max_distance_positions(GRID_SIZE)
-    EXCLUDED_POSITIONS = SAFE_ZONE_POS.union({HUMAN_START_POS})
-    
-    # Initialize the grid
-    grid = Grid(GRID_SIZE, GRID_SIZE)
-
-    # Add the randomized safe zone
-    for pos in SAFE_ZONE_POS:
-        grid.add_safe_zone(pos)
-
-    # Loop to ensure map is solvable
-    is_connected = False
-    attempts = 0
-    while not is_connected:
-        attempts += 1
-        # 1. Generate random obstacles (need to reset obstacles for each retry)
-        grid.obstacles = set() 
-        grid.generate_random_obstacles(NUM_OBSTACLES, EXCLUDED_POSITIONS)
-        
-        # 2. Check for connectivity from Human start to Safe Zones
-        is_connected = grid.check_connectivity(HUMAN_START_POS, grid.safe_zones)
-        
-        if not is_connected:
-            pass
+    # --- Initialize game and visualization ---
+    game = setup_new_game(seed=args.seed)
+    if args.record is not None:
+        game.replay = ReplayRecorder(replay_path(args.record, games_played), game)
+    setup_done = time.perf_counter()
+    viz = Visualizer(game.grid)
+    window_done = time.perf_counter()
+    first_frame = True
+
+    # --- Main loop ---
+    running = True
+    while running:
+
+        # 1. Game in progress (Non-Game Over)
+        if not game.game_over:
+            new_game_requested = viz.draw(game)
+
+            if game.game_over:
+                print("Game Over. Awaiting user input...")
+                stop_recording(game)
+                viz.draw(game)
+
+        # 2. Game is over (Awaiting New Game button press)
         else:
-            print(f"Map successfully generated and connected after {attempts} attempts.")
-            break
-        
-        if attempts > 1000:
-            raise RuntimeError("Failed to generate a connected map after 1000 attempts. Check configuration.")
-
-    # --- Spawn agents ---
-    humans = [Human(HUMAN_START_POS, grid)]
-    zombies: List[Zombie] = []
-    
-    for _ in range(NUM_ZOMBIES):
-        while True:
-            # Zombie spawn is still in the general Top-Left area (0 to GRID_SIZE//2 + 1) to ensure a chase distance
-            z_x = random.randrange(0, GRID_SIZE // 2 + 1)
-            z_y = random.randrange(0, GRID_SIZE // 2 + 1)
-            z_pos: Coord = (z_x, z_y)
-            
-            # Check for initial distance 
-            if (grid.passable(z_pos) and 
-                z_pos not in EXCLUDED_POSITIONS and 
-                z_pos not in {z.pos for z in zombies} and
-                manhattan(z_pos, HUMAN_START_POS) > (GRID_SIZE * 0.75)): # Ensure distance is still large
-                zombies.append(Zombie(z_pos, grid))
-                break
-
-    print(f"Game Initialized: Grid {GRID_SIZE}x{GRID_SIZE}, {len(grid.obstacles)} Obstacles, {len(zombies)} Zombies.")
-    print(f"Safe Zone: {SAFE_ZONE_POS}, Human Start: {HUMAN_START_POS}")
-    
-    return Game(grid, humans, zombies)
-
-# --- Initialize game and visualization ---
-game = setup_new_game()
-viz = Visualizer(game.grid)
-
-
-# --- Main loop ---
-running = True
-while running:
-    
-    # 1. Game in progress (Non-Game Over)
-    if not game.game_over:
-        new_game_requested = viz.draw(game) 
-        
-        if game.game_over:
-            print("Game Over. Awaiting user input...")
-            viz.draw(game) 
-            
-    # 2. Game is over (Awaiting New Game button press)
-    else:
-        new_game_requested = viz.draw(game) 
-        
-        if new_game_requested:
-            print("Starting a new game...")
-            # Setup a completely new game with new random positions/map
-            new_game = setup_new_game()
-            viz.grid = new_game.grid
-            game = new_game
-            
-    
-    # Check for quit events that might have been set by the visualizer
-    if not pygame.get_init():
-        running = False
-        
-print("Game loop finished.")
-if pygame.get_init():
-    pygame.quit()
\ No newline at end of file
+            new_game_requested = viz.draw(game)
+
+            if new_game_requested:
+                print("Starting a new game...")
+                # Setup a completely new game with new random positions/map
+                new_game = setup_new_game()
+                games_played += 1
+                if args.record is not None:
+                    new_game.replay = ReplayRecorder(replay_path(args.record, games_played), new_game)
+                viz.grid = new_game.grid
+                game = new_game
+
+        if first_frame:
+            first_frame = False
+            now = time.perf_counter()
+            print(f"First frame {(now - launched) * 1000:.0f} ms after main(): "
+                  f"pygame {(imported - start) * 1000:.0f} ms, "
+                  f"game setup {(setup_done - imported) * 1000:.0f} ms, "
+                  f"window + sprites {(window_done - setup_done) * 1000:.0f} ms, "
+                  f"first draw {(now - window_done) * 1000:.0f} ms.")
+
+        # Check for quit events that might have been set by the visualizer
+        if not pygame.get_init():
+            running = False
+
+    stop_recording(game)
+    print("Game loop finished.")
+    if pygame.get_init():
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
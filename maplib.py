@@ -0,0 +1,206 @@
+"""Seeded map libraries: thousands of pre-generated, validated maps in one memory-mapped file.
+
+Usage:
+    python maplib.py build maps.zsm --count 5000 --seed 0
+    python maplib.py show maps.zsm --index 42
+"""
+import argparse
+import mmap
+import struct
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+from environment import ArrayGrid
+from scenario import build_game, setup_new_game, GRID_SIZE, NUM_OBSTACLES, NUM_ZOMBIES, NUM_LANDMARKS
+
+MAGIC = b"ZSML"
+VERSION = 1
+
+# magic, version, width, height, zombies per map, obstacles per map, map count; padded to 24 so the seeds stay aligned
+_HEADER = struct.Struct("<4sHHHHII4x")
+
+
+def record_size(width: int, height: int, zombies: int) -> int:
+    """Bytes per map: safe zone distances (i4 per cell), human and zombie cells (u4), cell flags (u1 per cell).
+
+    Rounded up to 8 so every record, and its distance field, stays aligned.
+    """
+    cells = width * height
+    size = 4 * cells + 4 * (1 + zombies) + cells
+    return (size + 7) // 8 * 8
+
+
+def build_library(path: str, seeds: List[int], grid_size: int = GRID_SIZE, num_obstacles: int = NUM_OBSTACLES,
+                  num_zombies: int = NUM_ZOMBIES, verbose: bool = True) -> int:
+    """Generates one map per seed with setup_new_game and writes them to `path`; returns the map count.
+
+    Each map is exactly the one `setup_new_game(..., seed=seed)` builds. It is checked before
+    it is stored: the human must reach the safe zone, and every zombie must stand on an open
+    cell. Seeds are stored sorted, which is what `MapLibrary.index_of` searches.
+    """
+    seeds = sorted(set(seeds))
+    size = record_size(grid_size, grid_size, num_zombies)
+    cells = grid_size * grid_size
+    start = time.perf_counter()
+    with open(path, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, VERSION, grid_size, grid_size, num_zombies, num_obstacles, len(seeds)))
+        out.write(np.array(seeds, dtype="<i8").tobytes())
+
+        for n, seed in enumerate(seeds):
+            game = setup_new_game(grid_size, num_obstacles, num_zombies, verbose=False, grid_backend="array",
+                                  landmarks=0, seed=seed)
+            grid = game.grid
+            human = grid.cell_id(game.humans[0].pos)
+            zombies = [grid.cell_id(z.pos) for z in game.zombies]
+            dist = grid.safe_distance_ids()
+            if dist[human] < 0:
+                raise RuntimeError(f"Seed {seed}: the human cannot reach the safe zone.")
+            if any(grid.cells[z] & ArrayGrid.OBSTACLE for z in zombies):
+                raise RuntimeError(f"Seed {seed}: a zombie spawned on an obstacle.")
+
+            record = bytearray(size)
+            record[:4 * cells] = np.asarray(dist, dtype="<i4").tobytes()
+            record[4 * cells:4 * cells + 4 * (1 + num_zombies)] = np.array([human] + zombies, dtype="<u4").tobytes()
+            flags = 4 * cells + 4 * (1 + num_zombies)
+            record[flags:flags + cells] = grid.cells
+            out.write(record)
+            if verbose and (n + 1) % 1000 == 0:
+                print(f"  {n + 1}/{len(seeds)} maps", file=sys.stderr)
+
+    if verbose:
+        print(f"{len(seeds)} maps ({grid_size}x{grid_size}, {num_obstacles} obstacles, {num_zombies} zombies) "
+              f"in {time.perf_counter() - start:.2f}s -> {path}")
+    return len(seeds)
+
+
+class MapLibrary:
+    """Memory-mapped reader for files written by build_library.
+
+    Records have a fixed size, so map i lives at a computed offset and loading it is O(1)
+    whatever the library size. `grid(i)` wraps the record's cell flags and distance field
+    without copying either. The file is mapped read-only, so a grid copies its flags on its
+    first obstacle or safe zone change and drops the shared distance field once its obstacles
+    change; no grid (or game) ever touches another's map. Loading a map draws nothing from
+    the random module.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.height, self.num_zombies, self.num_obstacles, count = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a map library.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported map library version {version} (expected {VERSION}).")
+        self.seeds = np.frombuffer(self._map, dtype="<i8", count=count, offset=_HEADER.size)
+        self.record_size = record_size(self.width, self.height, self.num_zombies)
+        self._data = _HEADER.size + 8 * count # Records start here
+        if len(self._map) < self._data + count * self.record_size:
+            raise ValueError(f"{path} is truncated.")
+        self._view = memoryview(self._map)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.seeds)
+
+    def close(self):
+        # Grids handed out keep views of their flags and distance field, so the map is only unmapped once they are gone
+        self.seeds = None
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+    def _record(self, index: int) -> memoryview:
+        if not 0 <= index < len(self.seeds):
+            raise IndexError(f"Map {index} is outside the library (0-{len(self.seeds) - 1}).")
+        offset = self._data + index * self.record_size
+        return self._view[offset:offset + self.record_size]
+
+    def index_of(self, seed: int) -> int:
+        """Position of the map generated from `seed`."""
+        i = int(np.searchsorted(self.seeds, seed))
+        if i == len(self.seeds) or self.seeds[i] != seed:
+            raise KeyError(f"No map for seed {seed} in this library.")
+        return i
+
+    def seed(self, index: int) -> int:
+        return int(self.seeds[index])
+
+    def spawns(self, index: int):
+        """(human start, zombie spawns) of map `index`."""
+        cells = self.width * self.height
+        ids = self._record(index)[4 * cells:4 * cells + 4 * (1 + self.num_zombies)].cast("I")
+        coords = [(cid % self.width, cid // self.width) for cid in ids]
+        return coords[0], coords[1:]
+
+    def grid(self, index: int) -> ArrayGrid:
+        """A fresh ArrayGrid viewing map `index` (flags copied on first write), with safe zone distances precomputed."""
+        cells = self.width * self.height
+        record = self._record(index)
+        flags = 4 * cells + 4 * (1 + self.num_zombies)
+        return ArrayGrid.from_cells(self.width, self.height, record[flags:flags + cells],
+                                    safe_distances=record[:4 * cells].cast("i"))
+
+    def game(self, index: int, verbose: bool = False, zombie_pathing: str = "astar", human_planner: str = "astar",
+             landmarks: int = NUM_LANDMARKS, path_cache_size: int = 0):
+        """A new Game on map `index`, set up like setup_new_game would (only Game seeds its generator from random)."""
+        human, zombies = self.spawns(index)
+        game = build_game(self.grid(index), human, zombies, verbose=verbose, zombie_pathing=zombie_pathing,
+                          human_planner=human_planner, landmarks=landmarks, path_cache_size=path_cache_size)
+        game.seed = self.seed(index)
+        return game
+
+
+def render(library: MapLibrary, index: int) -> str:
+    """Text view of a map: # obstacle, S safe zone, H human start, Z zombie spawn."""
+    grid = library.grid(index)
+    human, zombies = library.spawns(index)
+    rows = [["."] * library.width for _ in range(library.height)]
+    for symbol, cells in (("#", grid.obstacles), ("S", grid.safe_zones), ("Z", zombies), ("H", [human])):
+        for x, y in cells:
+            rows[y][x] = symbol
+    return "\n".join("".join(row) for row in rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect a Zombie Surviver map library.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Generate maps for a range of seeds.")
+    build.add_argument("path")
+    build.add_argument("--count", type=int, default=1000)
+    build.add_argument("--seed", type=int, default=0, help="Seed of the first map; map i uses seed + i.")
+    build.add_argument("--grid-size", type=int, default=GRID_SIZE)
+    build.add_argument("--obstacles", type=int, default=NUM_OBSTACLES)
+    build.add_argument("--zombies", type=int, default=NUM_ZOMBIES)
+    show = commands.add_parser("show", help="Print one map of a library.")
+    show.add_argument("path")
+    show.add_argument("--index", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build_library(args.path, range(args.seed, args.seed + args.count), args.grid_size, args.obstacles,
+                      args.zombies)
+        return
+
+    with MapLibrary(args.path) as library:
+        human, zombies = library.spawns(args.index)
+        print(f"{len(library)} maps of {library.width}x{library.height}; map {args.index}: "
+              f"seed {library.seed(args.index)}, human {human}, zombies {zombies}, "
+              f"{library.grid(args.index).safe_distance_ids()[human[1] * library.width + human[0]]} steps to safety")
+        print(render(library, args.index))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from environment import Coord
+from typing import List, Optional, Set, Tuple
+
+CacheKey = Tuple[Coord, Coord, int] # (cell, goal, grid.version)
+
+
+class PathCache:
+    """Bounded LRU cache of zombie paths, keyed on (start, goal, map version).
+
+    Only true shortest paths may be stored: detours found around one turn's claimed cells
+    are not, and Zombie.a_star_search keeps them out. A stored path is registered under every
+    cell along it, because the rest of a shortest path is itself a shortest path from that
+    cell. A zombie standing anywhere on a cached path (including a follower on another
+    zombie's route) can reuse its remainder without searching. Each entry is only a
+    reference into the shared path tuple, so memory grows with the number of keys, which
+    `max_entries` bounds.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[Tuple[Coord, ...], int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def next_step(self, start: Coord, goal: Coord, version: int, occupied_cells: Set[Coord]) -> Optional[Coord]:
+        """Next step of a cached path from start to goal, if one exists and is not blocked this turn."""
+        key = (start, goal, version)
+        entry = self._entries.get(key)
+        if entry is not None:
+            path, index = entry
+            step = path[index]
+            # Cheap validity check: only the next cell matters for this turn's claims
+            if step == goal or step not in occupied_cells:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return step
+        self.misses += 1
+        return None
+
+    def store(self, start: Coord, path: List[Coord], goal: Coord, version: int):
+        """Stores a shortest path from start (exclusive) to goal (inclusive)."""
+        if not path:
+            return
+        route = tuple(path)
+        self._put((start, goal, version), (route, 0))
+        for i, cell in enumerate(route[:-1]):
+            self._put((cell, goal, version), (route, i + 1))
+
+    def _put(self, key: CacheKey, value: Tuple[Tuple[Coord, ...], int]):
+        entries = self._entries
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,269 @@
+"""Compact binary replays: record a game turn by turn, then seek to any turn of the file.
+
+Usage:
+    python replay.py game.zsr --turn 120
+"""
+import argparse
+import mmap
+import struct
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from environment import GRID_BACKENDS, Coord, Grid
+
+MAGIC = b"ZSRP"
+INDEX_MAGIC = b"ZSRI"
+VERSION = 1
+
+# Human input of the step that produced a frame ("" for the initial frame)
+INPUTS = ("", "up", "down", "left", "right", "auto")
+# One byte per agent in a delta frame: stay, up, down, left, right
+MOVES = np.array([(0, 0), (0, -1), (0, 1), (-1, 0), (1, 0)], dtype=np.int64)
+
+KEYFRAME = 1
+DELTA = 0
+
+_HEADER = struct.Struct("<4sHIIqHI") # magic, version, width, height, seed (-1: none), keyframe interval, obstacles
+_COUNT = struct.Struct("<I")
+_FRAME = struct.Struct("<BBIII") # kind, input, humans, zombies, caught
+_TRAILER = struct.Struct("<QI4s") # index offset, frame count, magic
+
+
+class ReplayFrame(NamedTuple):
+    turn: int
+    input: str
+    humans: List[Coord]
+    zombies: List[Coord]
+
+
+class ReplayRecorder:
+    """Writes a game to a replay file; attach with `game.replay = ReplayRecorder(path, game)`.
+
+    The header holds the map (size, seed, obstacle and safe zone cell ids). Frame 0 is the
+    starting position and every game.step appends one more: a keyframe with the absolute cell
+    of every agent every `keyframe_interval` turns, otherwise a delta with one move byte per
+    agent plus the humans caught that turn. `close()` appends the frame offset index that
+    lets `Replay` seek.
+    """
+
+    def __init__(self, path: str, game, keyframe_interval: int = 64):
+        self.path = path
+        self.game = game
+        self.width = game.grid.width
+        self.keyframe_interval = keyframe_interval
+        self.offsets: List[int] = []
+        self._file = open(path, "wb")
+
+        grid = game.grid
+        seed = getattr(game, "seed", None)
+        obstacles = sorted(grid.cell_id(p) for p in grid.obstacles)
+        safe_zones = sorted(grid.cell_id(p) for p in grid.safe_zones)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, grid.width, grid.height, -1 if seed is None else seed,
+                                      keyframe_interval, len(obstacles)))
+        self._file.write(np.array(obstacles, dtype="<u4").tobytes())
+        self._file.write(_COUNT.pack(len(safe_zones)))
+        self._file.write(np.array(safe_zones, dtype="<u4").tobytes())
+
+        self._snapshot()
+        self._write_keyframe("")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _snapshot(self):
+        """Remembers the agents of the frame just written, for the next delta."""
+        store = self.game.store
+        self._human_slots = self.game.human_slots()
+        self._zombie_slots = self.game.zombie_slots()
+        self._hx = store.xs[self._human_slots].astype(np.int64)
+        self._hy = store.ys[self._human_slots].astype(np.int64)
+        self._zx = store.xs[self._zombie_slots].astype(np.int64)
+        self._zy = store.ys[self._zombie_slots].astype(np.int64)
+
+    def _write_keyframe(self, direction: str):
+        self.offsets.append(self._file.tell())
+        self._file.write(_FRAME.pack(KEYFRAME, INPUTS.index(direction), len(self._hx), len(self._zx), 0))
+        self._file.write((self._hy * self.width + self._hx).astype("<u4").tobytes())
+        self._file.write((self._zy * self.width + self._zx).astype("<u4").tobytes())
+
+    def record(self, direction: str):
+        """Appends the frame for the turn game.step just finished."""
+        prev_humans, prev_zombies = self._human_slots, self._zombie_slots
+        prev_hx, prev_hy, prev_zx, prev_zy = self._hx, self._hy, self._zx, self._zy
+        self._snapshot()
+        if len(self.offsets) % self.keyframe_interval == 0:
+            self._write_keyframe(direction)
+            return
+
+        # Survivors keep their order, and each caught human becomes a zombie appended at its cell
+        survived = np.isin(prev_humans, self._human_slots)
+        caught = np.flatnonzero(~survived)
+        n_old = len(prev_zombies)
+        dx = np.concatenate((self._hx - prev_hx[survived], self._zx[:n_old] - prev_zx))
+        dy = np.concatenate((self._hy - prev_hy[survived], self._zy[:n_old] - prev_zy))
+        if (len(self._zombie_slots) - n_old != len(caught)
+                or not np.array_equal(self._zombie_slots[:n_old], prev_zombies)
+                or (np.abs(dx) + np.abs(dy) > 1).any()):
+            # Something a delta cannot express (agents added from outside, a jump): store absolute cells
+            self._write_keyframe(direction)
+            return
+
+        moves = np.select([dy < 0, dy > 0, dx < 0, dx > 0], [1, 2, 3, 4], 0).astype(np.uint8)
+        self.offsets.append(self._file.tell())
+        self._file.write(_FRAME.pack(DELTA, INPUTS.index(direction), len(self._hx), len(self._zx), len(caught)))
+        if len(caught):
+            new_cells = self._zy[n_old:] * self.width + self._zx[n_old:]
+            self._file.write(np.column_stack((caught, new_cells)).astype("<u4").tobytes())
+        self._file.write(moves.tobytes())
+
+    def close(self):
+        """Appends the frame index and trailer; the file is only seekable in O(1) after this."""
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        self._file.write(np.array(self.offsets, dtype="<u8").tobytes())
+        self._file.write(_TRAILER.pack(index_offset, len(self.offsets), INDEX_MAGIC))
+        self._file.close()
+
+
+class Replay:
+    """Memory-mapped reader for files written by ReplayRecorder.
+
+    `frame(turn)` looks the turn's keyframe up in the offset index (every
+    `keyframe_interval`-th frame is one) and applies at most keyframe_interval - 1 deltas,
+    so seeking costs the same at turn 10 and at turn 10 million. Files from a run that died
+    before `close()` have no index; it is rebuilt with one scan over the frames.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.height, seed, self.keyframe_interval, n_obstacles = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a replay file.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version} (expected {VERSION}).")
+        self.seed: Optional[int] = None if seed < 0 else seed
+
+        offset = _HEADER.size
+        self.obstacles = self._cells(offset, n_obstacles)
+        offset += 4 * n_obstacles
+        (n_safe,) = _COUNT.unpack_from(self._map, offset)
+        offset += _COUNT.size
+        self.safe_zones = self._cells(offset, n_safe)
+        offset += 4 * n_safe
+
+        index_magic = None
+        if len(self._map) >= offset + _TRAILER.size:
+            index_offset, count, index_magic = _TRAILER.unpack_from(self._map, len(self._map) - _TRAILER.size)
+        if index_magic == INDEX_MAGIC:
+            self.offsets = np.frombuffer(self._map, dtype="<u8", count=count, offset=index_offset)
+        else:
+            self.offsets = self._scan(offset)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def close(self):
+        # Drop the index view first: an mmap with exported buffers refuses to close
+        self.offsets = None
+        self._map.close()
+        self._file.close()
+
+    def _cells(self, offset: int, count: int) -> List[Coord]:
+        ids = np.frombuffer(self._map, dtype="<u4", count=count, offset=offset).astype(np.int64)
+        return list(zip((ids % self.width).tolist(), (ids // self.width).tolist()))
+
+    def _frame_size(self, kind: int, humans: int, zombies: int, caught: int) -> int:
+        if kind == KEYFRAME:
+            return _FRAME.size + 4 * (humans + zombies)
+        return _FRAME.size + 8 * caught + humans + zombies - caught
+
+    def _scan(self, offset: int) -> np.ndarray:
+        """Frame offsets of an unfinished file, stopping at a truncated last frame."""
+        offsets = []
+        while offset + _FRAME.size <= len(self._map):
+            kind, _, humans, zombies, caught = self._unpack_frame(offset)
+            size = self._frame_size(kind, humans, zombies, caught)
+            if offset + size > len(self._map):
+                break
+            offsets.append(offset)
+            offset += size
+        return np.array(offsets, dtype=np.uint64)
+
+    def _unpack_frame(self, offset: int):
+        return _FRAME.unpack_from(self._map, offset)
+
+    def grid(self, backend: str = "set") -> Grid:
+        """A fresh Grid with the recorded map."""
+        return GRID_BACKENDS[backend](self.width, self.height, set(self.obstacles), set(self.safe_zones))
+
+    def frame(self, turn: int) -> ReplayFrame:
+        """Agent positions after `turn` steps (turn 0: the starting position)."""
+        if not 0 <= turn < len(self.offsets):
+            raise IndexError(f"Turn {turn} is outside the replay (0-{len(self.offsets) - 1}).")
+        hx = hy = zx = zy = None
+        for t in range(turn - turn % self.keyframe_interval, turn + 1):
+            offset = int(self.offsets[t])
+            kind, direction, humans, zombies, caught = self._unpack_frame(offset)
+            offset += _FRAME.size
+            if kind == KEYFRAME:
+                cells = np.frombuffer(self._map, dtype="<u4", count=humans + zombies, offset=offset).astype(np.int64)
+                xs, ys = cells % self.width, cells // self.width
+                hx, hy, zx, zy = xs[:humans], ys[:humans], xs[humans:], ys[humans:]
+                continue
+
+            pairs = np.frombuffer(self._map, dtype="<u4", count=2 * caught, offset=offset).astype(np.int64)
+            caught_idx, new_cells = pairs[0::2], pairs[1::2]
+            offset += 8 * caught
+            moves = MOVES[np.frombuffer(self._map, dtype=np.uint8, count=humans + zombies - caught, offset=offset)]
+            survived = np.ones(len(hx), dtype=bool)
+            survived[caught_idx] = False
+            hx = hx[survived] + moves[:humans, 0]
+            hy = hy[survived] + moves[:humans, 1]
+            zx = np.concatenate((zx + moves[humans:, 0], new_cells % self.width))
+            zy = np.concatenate((zy + moves[humans:, 1], new_cells // self.width))
+
+        return ReplayFrame(turn, INPUTS[direction], list(zip(hx.tolist(), hy.tolist())),
+                           list(zip(zx.tolist(), zy.tolist())))
+
+
+def render(replay: Replay, frame: ReplayFrame) -> str:
+    """Text view of a frame: # obstacle, S safe zone, H human, Z zombie."""
+    rows = [["."] * replay.width for _ in range(replay.height)]
+    for symbol, cells in (("#", replay.obstacles), ("S", replay.safe_zones), ("Z", frame.zombies),
+                          ("H", frame.humans)):
+        for x, y in cells:
+            rows[y][x] = symbol
+    return "\n".join("".join(row) for row in rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect a Zombie Surviver replay file.")
+    parser.add_argument("path")
+    parser.add_argument("--turn", type=int, default=None, help="Turn to show (default: the last one).")
+    parser.add_argument("--no-map", action="store_true", help="Print positions only, without the map view.")
+    args = parser.parse_args(argv)
+
+    with Replay(args.path) as replay:
+        turn = len(replay) - 1 if args.turn is None else args.turn
+        frame = replay.frame(turn)
+        print(f"{replay.width}x{replay.height}, seed {replay.seed}, {len(replay)} frames (turns 0-{len(replay) - 1})")
+        print(f"Turn {frame.turn} (input {frame.input or '-'}): humans {frame.humans}, {len(frame.zombies)} zombies")
+        if not args.no_map:
+            print(render(replay, frame))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import random
+import time
+from environment import GRID_BACKENDS, Grid, manhattan, Coord
+from agent import Human, Zombie
+from game import Game
+from pathcache import PathCache
+from typing import Set, List, Optional, Tuple
+
+# --- Configuration (Constants) ---
+GRID_SIZE = 15
+NUM_OBSTACLES = 30
+NUM_ZOMBIES = 3
+NUM_LANDMARKS = 4 # Landmarks for the ALT heuristic (0 keeps plain Manhattan)
+
+
+def choose_max_distance_positions(grid_size: int) -> Tuple[Set[Coord], Coord]:
+    """Chooses a Safe Zone and a Human Start position that are maximally distant."""
+    all_possible_coords = [(x, y) for x in range(grid_size) for y in range(grid_size)]
+
+    # 1. Pick a random point P1
+    p1 = random.choice(all_possible_coords)
+
+    # 2. Find the point P2 that is maximally distant from P1 (max distance is usually diagonal)
+    p2 = max(
+        all_possible_coords,
+        key=lambda pos: manhattan(pos, p1)
+    )
+
+    # Randomly assign p1 and p2 to Safe Zone and Human Start
+    if random.choice([True, False]):
+        SAFE_ZONE_POS: Set[Coord] = {p1}
+        HUMAN_START_POS: Coord = p2
+    else:
+        SAFE_ZONE_POS: Set[Coord] = {p2}
+        HUMAN_START_POS: Coord = p1
+
+    return SAFE_ZONE_POS, HUMAN_START_POS
+
+
+def setup_new_game(grid_size: int = GRID_SIZE, num_obstacles: int = NUM_OBSTACLES,
+                   num_zombies: int = NUM_ZOMBIES, verbose: bool = True,
+                   zombie_pathing: str = "astar", grid_backend: str = "set",
+                   human_planner: str = "astar", landmarks: int = NUM_LANDMARKS,
+                   path_cache_size: int = 0, seed: Optional[int] = None) -> Game:
+    """Sets up a new Grid, Humans, and Zombies, ensuring map connectivity.
+
+    With a seed the random module is seeded first, so the map and the whole game that
+    follows (zombie fallback moves included) can be reproduced.
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    # --- Randomize Safe Zone and Human Start ---
+    SAFE_ZONE_POS, HUMAN_START_POS = choose_max_distance_positions(grid_size)
+    EXCLUDED_POSITIONS = SAFE_ZONE_POS.union({HUMAN_START_POS})
+
+    # Initialize the grid ("set" is the plain Grid, "array" the bytearray-backed ArrayGrid)
+    grid = GRID_BACKENDS[grid_backend](grid_size, grid_size)
+
+    # Add the randomized safe zone
+    for pos in SAFE_ZONE_POS:
+        grid.add_safe_zone(pos)
+
+    # Single-pass generation: obstacles that would cut the human off from safety are skipped, nothing is retried
+    gen_start = time.perf_counter()
+    grid.generate_connected_obstacles(num_obstacles, HUMAN_START_POS, EXCLUDED_POSITIONS)
+    generation_time = time.perf_counter() - gen_start
+    if verbose:
+        print(f"Map generated and connected in {generation_time * 1000:.1f} ms.")
+
+    # --- Spawn agents ---
+    zombie_spawns: List[Coord] = []
+    taken: Set[Coord] = set() # Spawned cells, for O(1) collision checks at any zombie count
+    for _ in range(num_zombies):
+        spawn_attempts = 0
+        while True:
+            spawn_attempts += 1
+            # Zombie spawn is still in the general Top-Left area (0 to grid_size//2 + 1) to ensure a chase distance.
+            # A human starting near that area can leave no valid cell in it, so widen to the whole map eventually.
+            spawn_range = grid_size // 2 + 1 if spawn_attempts <= 1000 else grid_size
+            z_x = random.randrange(0, spawn_range)
+            z_y = random.randrange(0, spawn_range)
+            z_pos: Coord = (z_x, z_y)
+
+            if spawn_attempts > 100000:
+                raise RuntimeError("Failed to place a zombie far enough from the human. Check configuration.")
+
+            # Check for initial distance
+            if (grid.passable(z_pos) and
+                z_pos not in EXCLUDED_POSITIONS and
+                z_pos not in taken and
+                manhattan(z_pos, HUMAN_START_POS) > (grid_size * 0.75)): # Ensure distance is still large
+                zombie_spawns.append(z_pos)
+                taken.add(z_pos)
+                break
+
+    game = build_game(grid, HUMAN_START_POS, zombie_spawns, verbose=verbose, zombie_pathing=zombie_pathing,
+                      human_planner=human_planner, landmarks=landmarks, path_cache_size=path_cache_size)
+    game.generation_time = generation_time
+    game.seed = seed
+    return game
+
+
+def build_game(grid: Grid, human_start: Coord, zombie_spawns: List[Coord], verbose: bool = True,
+               zombie_pathing: str = "astar", human_planner: str = "astar", landmarks: int = NUM_LANDMARKS,
+               path_cache_size: int = 0) -> Game:
+    """Places the human and zombies on a finished map and wraps them in a Game.
+
+    Used by setup_new_game and by maplib.MapLibrary, whose maps are already generated;
+    nothing here draws from the random module (Game's own generator aside).
+    """
+    # The map is static for the whole game, so landmark tables are paid for once here
+    if landmarks > 0:
+        landmark_start = time.perf_counter()
+        grid.prepare_landmarks(landmarks)
+        if verbose:
+            print(f"{landmarks} landmarks prepared in {(time.perf_counter() - landmark_start) * 1000:.1f} ms.")
+
+    humans = [Human(human_start, grid, planner=human_planner)]
+    zombies = [Zombie(pos, grid) for pos in zombie_spawns] # Game indexes humans only; zombies live in its store
+
+    if verbose:
+        print(f"Game Initialized: Grid {grid.width}x{grid.height}, {len(grid.obstacles)} Obstacles, {len(zombies)} Zombies.")
+        print(f"Safe Zone: {grid.safe_zones}, Human Start: {human_start}")
+
+    path_cache = PathCache(path_cache_size) if path_cache_size > 0 else None
+    return Game(grid, humans, zombies, verbose=verbose, zombie_pathing=zombie_pathing, path_cache=path_cache)
@@ -0,0 +1,82 @@
+import time
+from typing import Callable, Optional
+
+
+class TickScheduler:
+    """Fixed-timestep scheduler that runs game ticks independently of the render rate.
+
+    Real time is accumulated and converted into whole ticks at `tick_rate * speed` ticks per
+    second, so a slow renderer runs several ticks per frame (frame skipping) and a fast one runs
+    none on some frames. With fast-forward on, ticks run back to back until the frame's time
+    budget (1 / render_rate) is used up.
+    """
+
+    MIN_SPEED = 0.125
+    MAX_SPEED = 1024.0
+
+    def __init__(self, tick_rate: float = 10.0, render_rate: float = 30.0, speed: float = 1.0,
+                 max_ticks_per_frame: int = 1000):
+        self.tick_rate = tick_rate
+        self.render_rate = render_rate
+        self.speed = speed
+        self.fast_forward = False # "As fast as possible": ignore tick_rate, fill the frame budget
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+        self.last_time: Optional[float] = None
+
+    @property
+    def alpha(self) -> float:
+        """Fraction of the next tick already elapsed (for renderers that interpolate)."""
+        return min(self.accumulator, 1.0)
+
+    def faster(self):
+        self.speed = min(self.speed * 2, self.MAX_SPEED)
+
+    def slower(self):
+        self.speed = max(self.speed / 2, self.MIN_SPEED)
+
+    def toggle_fast_forward(self):
+        self.fast_forward = not self.fast_forward
+
+    def pause(self):
+        """Stops accumulating time, e.g. while no input is driving the game."""
+        self.accumulator = 0.0
+        self.last_time = None
+
+    def run(self, tick: Callable[[], bool], now: Optional[float] = None) -> int:
+        """Runs the ticks due since the last call. `tick` returns False to stop early (e.g. game over).
+
+        Returns the number of ticks run.
+        """
+        now = time.perf_counter() if now is None else now
+        if self.last_time is None:
+            # First frame after a pause: act immediately instead of waiting a full tick
+            elapsed = 0.0
+            self.accumulator = max(self.accumulator, 1.0)
+        else:
+            elapsed = now - self.last_time
+        self.last_time = now
+
+        if self.fast_forward:
+            deadline = now + 1.0 / self.render_rate
+            ticks = 0
+            while ticks < self.max_ticks_per_frame:
+                ticks += 1
+                if not tick() or time.perf_counter() >= deadline:
+                    break
+            return ticks
+
+        self.accumulator += elapsed * self.tick_rate * self.speed
+
+        ticks = 0
+        while self.accumulator >= 1.0 and ticks < self.max_ticks_per_frame:
+            self.accumulator -= 1.0
+            ticks += 1
+            if not tick():
+                self.accumulator = 0.0
+                break
+
+        # Drop backlog the renderer could never catch up on (avoids a spiral of death)
+        if ticks >= self.max_ticks_per_frame:
+            self.accumulator = 0.0
+        return ticks
@@ -0,0 +1,155 @@
+import heapq
+from array import array
+from environment import Grid, Coord
+from telemetry import SearchStats
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+
+class BucketQueue:
+    """Priority queue of int items with integer priorities: one bucket per priority value.
+
+    Only the distinct priorities present are kept in a heap, and each bucket is a small heap of
+    plain ints, so no (priority, item) tuples are built. With unit steps and a consistent
+    heuristic, A* sees only a handful of distinct f-values at a time, so the priority heap stays
+    tiny. Ties pop in increasing item order. Priorities need not be monotone: pushing below the
+    current minimum is fine, which the danger penalties (added to the priority only) rely on.
+    """
+    __slots__ = ("buckets", "keys", "size")
+
+    def __init__(self):
+        self.buckets: Dict[int, List[int]] = {}
+        self.keys: List[int] = [] # Heap of the priorities that have a non-empty bucket
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, priority: int, item: int):
+        bucket = self.buckets.get(priority)
+        if bucket is None:
+            self.buckets[priority] = [item]
+            heapq.heappush(self.keys, priority)
+        else:
+            heapq.heappush(bucket, item)
+        self.size += 1
+
+    def pop(self) -> int:
+        """Removes and returns the smallest item of the lowest priority."""
+        priority = self.keys[0]
+        bucket = self.buckets[priority]
+        item = heapq.heappop(bucket)
+        if not bucket:
+            del self.buckets[priority]
+            heapq.heappop(self.keys)
+        self.size -= 1
+        return item
+
+
+class SearchResult(NamedTuple):
+    path: Optional[List[Coord]] # From start (exclusive) to goal (inclusive); None if unreachable
+    stats: SearchStats
+
+
+class SearchEngine:
+    """A* over grid cells shared by Human and Zombie, built once per obstacle layout (see Grid.search_engine).
+
+    Nodes are numbered x-major (x * height + y), so the smallest node in a BucketQueue bucket is
+    the smallest (x, y) and ties on f break exactly like the (f, coord) heap this replaces; the
+    human's routes, and so game outcomes, depend on that order. Neighbors come from a per-node
+    tuple of passable neighbor nodes, and g-costs and parents live in flat arrays indexed by
+    node. The arrays are reused between searches: a node's entries only count if its stamp
+    matches the current search, so nothing is cleared or allocated per call. Stale duplicates
+    in the open list are skipped when popped instead of being expanded again.
+    """
+
+    def __init__(self, grid: Grid):
+        self.width = grid.width
+        self.height = grid.height
+        h = grid.height
+        n = grid.width * grid.height
+        self.coords: List[Coord] = [(node // h, node % h) for node in range(n)]
+        # Same neighbor order as Grid.neighbors: right, left, down, up
+        self.neighbors: List[Tuple[int, ...]] = [
+            tuple(x * h + y for x, y in grid.neighbors(pos)) if grid.passable(pos) else ()
+            for pos in self.coords
+        ]
+        self.g = array("i", [0]) * n
+        self.parent = array("i", [-1]) * n
+        self.closed_g = array("i", [0]) * n # g-cost a cell had when it was last expanded
+        self.seen = array("I", [0]) * n # Search stamp: g and parent are valid for this search
+        self.closed = array("I", [0]) * n # Search stamp: closed_g is valid for this search
+        self.stamp = 0
+
+    def find_path(self, start: Coord, goal: Coord, heuristic: Optional[Callable[[Coord], int]] = None,
+                  penalties: Optional[Dict[Coord, int]] = None, blocked: Optional[Set[Coord]] = None,
+                  stats: Optional[SearchStats] = None) -> SearchResult:
+        """Shortest path from start to goal.
+
+        `penalties` are extra costs added to a cell's priority only, never to its g-cost, so a
+        dangerous cell is explored late but the path cost stays its length (the rule the human's
+        A* has always used). Cells in `blocked`, other than the goal, are never entered. Counters
+        are added to `stats` if given, so one object can cover several searches of a turn.
+        """
+        if stats is None:
+            stats = SearchStats()
+        if heuristic is None:
+            gx, gy = goal
+            heuristic = lambda pos: abs(pos[0] - gx) + abs(pos[1] - gy)
+        w, h = self.width, self.height
+        origin = start[0] * h + start[1]
+        target = goal[0] * h + goal[1]
+        cost = {x * h + y: p for (x, y), p in penalties.items()} if penalties else {}
+        walls = {x * h + y for x, y in blocked if 0 <= x < w and 0 <= y < h} if blocked else set()
+        walls.discard(target)
+
+        if self.stamp == 0xFFFFFFFF:
+            # Stamps wrapped around: clear them once rather than trust a stale match
+            self.seen = array("I", [0]) * len(self.seen)
+            self.closed = array("I", [0]) * len(self.closed)
+            self.stamp = 0
+        self.stamp += 1
+        stamp = self.stamp
+        g, parent, seen, closed, closed_g = self.g, self.parent, self.seen, self.closed, self.closed_g
+        neighbors, coords = self.neighbors, self.coords
+
+        seen[origin] = stamp
+        g[origin] = 0
+        parent[origin] = -1
+        queue = BucketQueue()
+        queue.push(heuristic(start), origin)
+        expanded = pushed = peak = 0
+        path: Optional[List[Coord]] = None
+
+        while queue.size:
+            current = queue.pop()
+            current_g = g[current]
+            if closed[current] == stamp and closed_g[current] <= current_g:
+                continue # Stale duplicate: already expanded with this g-cost
+            closed[current] = stamp
+            closed_g[current] = current_g
+            expanded += 1
+
+            if current == target:
+                path = []
+                while current != origin:
+                    path.append(coords[current])
+                    current = parent[current]
+                path.reverse()
+                break
+
+            new_g = current_g + 1
+            for neighbor in neighbors[current]:
+                if neighbor in walls or (seen[neighbor] == stamp and new_g >= g[neighbor]):
+                    continue
+                seen[neighbor] = stamp
+                g[neighbor] = new_g
+                parent[neighbor] = current
+                queue.push(new_g + heuristic(coords[neighbor]) + cost.get(neighbor, 0), neighbor)
+                pushed += 1
+                if queue.size > peak:
+                    peak = queue.size
+
+        stats.expanded += expanded
+        stats.pushed += pushed
+        stats.heap_peak = max(stats.heap_peak, peak)
+        return SearchResult(path, stats)
@@ -0,0 +1,519 @@
+"""Asyncio game server: many concurrent headless sessions behind one local TCP socket.
+
+Usage:
+    python server.py --port 8765 --workers 4
+    python server.py --bots 200 --turns 100 --workers 4
+
+The protocol is one JSON object per line in both directions. Requests name an "op":
+
+    {"op": "new", "seed": 1, "grid_size": 15}          -> state (the sender is subscribed)
+    {"op": "join", "session": 3}                        -> state
+    {"op": "move", "session": 3, "direction": "auto"}   -> diff, pushed to every subscriber
+    {"op": "autoplay", "session": 3, "on": true}        -> the server steps it in "auto" at --tick-rate
+    {"op": "leave", "session": 3}
+    {"op": "close", "session": 3}
+    {"op": "stats"}                                     -> per-session tick latency
+
+Cells are sent as ids (y * width + x). A state message holds the whole board. A diff only
+holds what changed since the previous one: "humans" (all human cells, present only if one
+moved or was caught) and "zombies" (flat [index, cell, ...] pairs for zombies that moved
+or were added). Games are stepped in executors, never on the event loop.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Set
+
+from agent import HUMAN_PLANNERS
+from game import Game, ZOMBIE_PATHING_MODES
+from scenario import setup_new_game, GRID_SIZE, NUM_OBSTACLES, NUM_ZOMBIES
+
+DIRECTIONS = ("up", "down", "left", "right", "auto")
+
+# A subscriber with more than this many bytes waiting in its socket buffer is dropped
+MAX_BUFFERED = 1 << 20
+
+
+class GameHost:
+    """The games one executor worker owns, each with the last board its subscribers were sent.
+
+    Everything here runs inside the worker (a thread or a process), so only session ids,
+    directions and the state/diff dicts cross between it and the event loop.
+
+    Games draw from the random module, so each one gets its own random.Random, whose state
+    is swapped into the module while that game is created or stepped and saved back after.
+    A seeded session then replays the same whatever else runs on the worker, and no session
+    reseeds the module for the rest of the process (the event loop's thread included).
+    """
+
+    def __init__(self):
+        self.games: Dict[int, Game] = {}
+        self.max_turns: Dict[int, int] = {}
+        self.boards: Dict[int, tuple] = {} # Session id -> (human cells, zombie cells) last sent
+        self.rngs: Dict[int, random.Random] = {}
+
+    @contextmanager
+    def _random_state(self, session_id: int):
+        """Runs the block with the module-level random generator set to this session's."""
+        rng = self.rngs[session_id]
+        saved = random.getstate()
+        random.setstate(rng.getstate())
+        try:
+            yield
+        finally:
+            rng.setstate(random.getstate())
+            random.setstate(saved)
+
+    def create(self, session_id: int, options: Dict) -> Dict:
+        grid_size = int(options.get("grid_size", GRID_SIZE))
+        zombie_pathing = options.get("zombie_pathing", "astar")
+        human_planner = options.get("human_planner", "astar")
+        if zombie_pathing not in ZOMBIE_PATHING_MODES:
+            raise ValueError(f"Unknown zombie pathing mode {zombie_pathing!r}.")
+        if human_planner not in HUMAN_PLANNERS:
+            raise ValueError(f"Unknown human planner {human_planner!r}.")
+        self.rngs[session_id] = random.Random()
+        try:
+            with self._random_state(session_id):
+                game = setup_new_game(grid_size, int(options.get("obstacles", NUM_OBSTACLES)),
+                                      int(options.get("zombies", NUM_ZOMBIES)), verbose=False,
+                                      zombie_pathing=zombie_pathing, human_planner=human_planner,
+                                      seed=options.get("seed"))
+        except Exception:
+            del self.rngs[session_id]
+            raise
+        self.games[session_id] = game
+        self.max_turns[session_id] = int(options.get("max_turns", grid_size * grid_size * 4))
+        self.boards[session_id] = self.cells(game)
+        return self.state(session_id)
+
+    def remove(self, session_id: int):
+        self.games.pop(session_id, None)
+        self.max_turns.pop(session_id, None)
+        self.boards.pop(session_id, None)
+        self.rngs.pop(session_id, None)
+
+    @staticmethod
+    def cells(game: Game):
+        width = game.grid.width
+        humans = game.store.cell_ids(game.human_slots(), width).tolist()
+        zombies = game.store.cell_ids(game.zombie_slots(), width).tolist()
+        return humans, zombies
+
+    def winner(self, session_id: int) -> Optional[str]:
+        game = self.games[session_id]
+        if game.game_over:
+            return "humans" if game.humans else "zombies"
+        if game.turn >= self.max_turns[session_id]:
+            return "timeout"
+        return None
+
+    def state(self, session_id: int) -> Dict:
+        """Full board, sent when a connection subscribes."""
+        game = self.games[session_id]
+        grid = game.grid
+        humans, zombies = self.boards[session_id]
+        return {
+            "type": "state",
+            "session": session_id,
+            "turn": game.turn,
+            "width": grid.width,
+            "height": grid.height,
+            "obstacles": sorted(grid.cell_id(p) for p in grid.obstacles),
+            "safe": sorted(grid.cell_id(p) for p in grid.safe_zones),
+            "humans": humans,
+            "zombies": zombies,
+            "winner": self.winner(session_id),
+        }
+
+    def advance(self, session_id: int, direction: str) -> Dict:
+        """Steps the game once and returns the diff against the last board sent."""
+        game = self.games[session_id]
+        with self._random_state(session_id):
+            game.step(direction)
+        old_humans, old_zombies = self.boards[session_id]
+        humans, zombies = self.cells(game)
+        diff = {"type": "diff", "session": session_id, "turn": game.turn}
+        if humans != old_humans:
+            diff["humans"] = humans
+        moved = []
+        for i, cell in enumerate(zombies):
+            if i >= len(old_zombies) or old_zombies[i] != cell:
+                moved += (i, cell)
+        if moved:
+            diff["zombies"] = moved
+        winner = self.winner(session_id)
+        if winner is not None:
+            diff["winner"] = winner
+        self.boards[session_id] = (humans, zombies)
+        return diff
+
+
+# The GameHost of this process; module-level so process pool workers can reach it by function name
+_HOST = GameHost()
+
+
+def host_create(session_id: int, options: Dict) -> Dict:
+    return _HOST.create(session_id, options)
+
+
+def host_state(session_id: int) -> Dict:
+    return _HOST.state(session_id)
+
+
+def host_advance(session_id: int, direction: str) -> Dict:
+    return _HOST.advance(session_id, direction)
+
+
+def host_remove(session_id: int):
+    _HOST.remove(session_id)
+
+
+class Session:
+    """Event loop side of one game: its worker, subscribers and tick latency."""
+
+    def __init__(self, session_id: int, shard: Executor):
+        self.id = session_id
+        self.shard = shard # Executor whose GameHost owns the game
+        self.subscribers: Set["Connection"] = set()
+        self.lock = asyncio.Lock() # Steps of one game never overlap
+        self.autoplay: Optional[asyncio.Task] = None
+        self.latencies: Deque[float] = deque(maxlen=1024) # Tick latency in ms, request received -> diff sent
+        self.ticks = 0
+        self.turn = 0
+        self.winner: Optional[str] = None
+
+    def latency_summary(self) -> Dict:
+        latencies = sorted(self.latencies)
+        summary = {"session": self.id, "turn": self.turn, "ticks": self.ticks,
+                   "subscribers": len(self.subscribers), "winner": self.winner}
+        if latencies:
+            summary.update({
+                "mean_ms": round(statistics.fmean(latencies), 3),
+                "p50_ms": round(latencies[len(latencies) // 2], 3),
+                "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3),
+                "max_ms": round(latencies[-1], 3),
+            })
+        return summary
+
+
+class Connection:
+    """One client socket; writes never wait, and a client that stops reading is dropped."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.sessions: Set[Session] = set()
+
+    def send(self, message: Dict) -> bool:
+        """Queues one message; False if the connection is gone or too far behind."""
+        if self.writer.is_closing():
+            return False
+        if self.writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+            self.writer.close()
+            return False
+        self.writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+        return True
+
+
+class GameServer:
+    """Hosts many Game sessions on one event loop.
+
+    Games live in shards, and each shard is a single-worker executor. With `workers=0`
+    (the default) there is one shard: a thread in this process, where games share the GIL
+    with the loop. `workers=N` starts N single-process pools instead, and sessions are
+    spread over them round-robin. Each process keeps its games between ticks, so only the
+    direction goes in and the diff comes out. A tick is queued behind its session's lock,
+    and its latency is recorded per session, from the request arriving to the diff being
+    queued for every subscriber. A session is closed when its last subscriber leaves.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, tick_rate: float = 10.0,
+                 workers: int = 0, max_sessions: int = 1000):
+        self.host = host
+        self.port = port
+        self.tick_rate = tick_rate
+        if workers > 0:
+            self.shards: List[Executor] = [ProcessPoolExecutor(1) for _ in range(workers)]
+        else:
+            self.shards = [ThreadPoolExecutor(1, thread_name_prefix="game")]
+        self.max_sessions = max_sessions
+        self.sessions: Dict[int, Session] = {}
+        self._next_id = 1
+        self._creating = 0 # Sessions whose game is still being set up, counted against max_sessions
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._handlers: Set[asyncio.Task] = set() # One per open connection
+        self._connections: Set[Connection] = set()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1] # Resolves port 0 to the one picked
+        return self
+
+    async def close(self):
+        for session in list(self.sessions.values()):
+            self.close_session(session)
+        if self._server is not None:
+            self._server.close()
+            # Closing the transports ends each handler's read loop, so none is left to cancel
+            for conn in list(self._connections):
+                conn.writer.close()
+            if self._handlers:
+                await asyncio.wait(self._handlers)
+            await self._server.wait_closed()
+        for shard in self.shards:
+            shard.shutdown(wait=False, cancel_futures=True)
+
+    # --- Connections ---
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        conn = Connection(writer)
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        self._connections.add(conn)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    reply = await self.handle(conn, request, time.perf_counter())
+                except (ValueError, KeyError, TypeError, AttributeError, RuntimeError) as e:
+                    reply = {"type": "error", "message": str(e)}
+                if reply is not None and not conn.send(reply):
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            for session in list(conn.sessions):
+                self.unsubscribe(conn, session)
+            writer.close()
+            self._connections.discard(conn)
+            self._handlers.discard(handler)
+
+    async def handle(self, conn: Connection, request: Dict, received: float) -> Optional[Dict]:
+        """Answers one request. Moves are queued, and their diff goes to all subscribers."""
+        op = request.get("op")
+        loop = asyncio.get_running_loop()
+        if op == "new":
+            session, state = await self.new_session(request)
+            self.subscribe(conn, session)
+            return state
+        if op == "stats":
+            return self.stats()
+
+        session = self.sessions.get(request.get("session"))
+        if session is None:
+            raise ValueError(f"Unknown session {request.get('session')!r}.")
+        if op == "join":
+            self.subscribe(conn, session)
+            return await loop.run_in_executor(session.shard, host_state, session.id)
+        if op == "move":
+            direction = request.get("direction")
+            if direction not in DIRECTIONS:
+                raise ValueError(f"Unknown direction {direction!r}. Expected one of {DIRECTIONS}.")
+            if session.winner is not None:
+                raise ValueError(f"Session {session.id} is over (winner: {session.winner}).")
+            # Run as a task so this connection's next request is read while the game steps
+            self._spawn(self.tick(session, direction, received, conn))
+            return None
+        if op == "autoplay":
+            self.set_autoplay(session, bool(request.get("on", True)))
+            return None
+        if op == "leave":
+            self.unsubscribe(conn, session)
+            return None
+        if op == "close":
+            self.close_session(session)
+            return None
+        raise ValueError(f"Unknown op {op!r}.")
+
+    def subscribe(self, conn: Connection, session: Session):
+        session.subscribers.add(conn)
+        conn.sessions.add(session)
+
+    def unsubscribe(self, conn: Connection, session: Session):
+        session.subscribers.discard(conn)
+        conn.sessions.discard(session)
+        if not session.subscribers:
+            self.close_session(session)
+
+    # --- Sessions ---
+    async def new_session(self, request: Dict):
+        """Creates a game on the next shard; returns the session and its first state message."""
+        # The slot is reserved before the await, so concurrent requests cannot all pass the check
+        if len(self.sessions) + self._creating >= self.max_sessions:
+            raise ValueError(f"Server is full ({self.max_sessions} sessions).")
+        self._creating += 1
+        try:
+            session_id = self._next_id
+            self._next_id += 1
+            session = Session(session_id, self.shards[session_id % len(self.shards)])
+            options = {key: request[key] for key in ("seed", "grid_size", "obstacles", "zombies", "max_turns",
+                                                     "zombie_pathing", "human_planner") if key in request}
+            state = await asyncio.get_running_loop().run_in_executor(session.shard, host_create, session_id,
+                                                                     options)
+        finally:
+            self._creating -= 1
+        session.winner = state["winner"]
+        self.sessions[session_id] = session
+        if request.get("autoplay"):
+            self.set_autoplay(session, True)
+        return session, state
+
+    def close_session(self, session: Session):
+        if self.sessions.pop(session.id, None) is None:
+            return
+        self.set_autoplay(session, False)
+        for conn in list(session.subscribers):
+            conn.sessions.discard(session)
+        session.subscribers.clear()
+        session.shard.submit(host_remove, session.id)
+
+    async def tick(self, session: Session, direction: str, received: float, conn: Optional[Connection] = None):
+        """Steps the session once on its shard and pushes the diff to its subscribers.
+
+        `conn` is the connection that asked for the move, if any. A move that cannot be played
+        (the session ended or was closed while it waited, or the step failed) is answered
+        there with an error, so a client waiting for a reply is never left hanging.
+        """
+        async with session.lock:
+            if session.winner is not None or session.id not in self.sessions:
+                if conn is not None:
+                    reason = (f"is over (winner: {session.winner})" if session.winner is not None
+                              else "was closed")
+                    conn.send({"type": "error", "session": session.id, "message": f"Session {session.id} {reason}."})
+                return
+            try:
+                diff = await asyncio.get_running_loop().run_in_executor(session.shard, host_advance,
+                                                                        session.id, direction)
+            except Exception as e:
+                if conn is not None:
+                    conn.send({"type": "error", "session": session.id, "message": f"Move failed: {e}"})
+                raise
+            session.ticks += 1
+            session.turn = diff["turn"]
+            session.winner = diff.get("winner")
+            for conn in list(session.subscribers):
+                if not conn.send(diff):
+                    self.unsubscribe(conn, session)
+            session.latencies.append((time.perf_counter() - received) * 1000)
+
+    def set_autoplay(self, session: Session, on: bool):
+        if session.autoplay is not None:
+            session.autoplay.cancel()
+            session.autoplay = None
+        if on:
+            session.autoplay = self._spawn(self._autoplay(session))
+
+    async def _autoplay(self, session: Session):
+        interval = 1.0 / self.tick_rate
+        next_tick = time.perf_counter()
+        while session.winner is None and session.id in self.sessions:
+            await self.tick(session, "auto", next_tick)
+            # Fixed schedule: a slow tick shortens the wait before the next one instead of drifting
+            next_tick = max(next_tick + interval, time.perf_counter())
+            await asyncio.sleep(next_tick - time.perf_counter())
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        # The loop only keeps weak references to tasks
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task):
+        """Drops a finished task, printing its exception if it failed (no one else awaits it)."""
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            print(f"Server task {task.get_name()} failed:", file=sys.stderr)
+            traceback.print_exception(type(error), error, error.__traceback__)
+
+    def stats(self) -> Dict:
+        sessions = [s.latency_summary() for s in self.sessions.values()]
+        latencies = sorted(ms for s in self.sessions.values() for ms in s.latencies)
+        total = {"sessions": len(sessions), "ticks": sum(s["ticks"] for s in sessions)}
+        if latencies:
+            total["p50_ms"] = round(latencies[len(latencies) // 2], 3)
+            total["p99_ms"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3)
+        return {"type": "stats", "total": total, "sessions": sessions}
+
+
+# --- Local bot clients ---
+async def run_bot(host: str, port: int, seed: int, turns: int) -> List[float]:
+    """Plays one session in 'auto' mode, one move per reply; returns round-trip times in ms."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(json.dumps({"op": "new", "seed": seed}).encode() + b"\n")
+        state = json.loads(await reader.readline())
+        round_trips = []
+        for _ in range(turns):
+            start = time.perf_counter()
+            writer.write(json.dumps({"op": "move", "session": state["session"], "direction": "auto"}).encode()
+                         + b"\n")
+            diff = json.loads(await reader.readline())
+            round_trips.append((time.perf_counter() - start) * 1000)
+            if "winner" in diff:
+                break
+        return round_trips
+    finally:
+        writer.close()
+
+
+async def run_bots(sessions: int, turns: int, tick_rate: float = 10.0, workers: int = 0):
+    """Starts a server on a free local port and drives it with one bot per session."""
+    server = await GameServer(port=0, tick_rate=tick_rate, workers=workers).start()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run_bot(server.host, server.port, seed, turns) for seed in range(sessions)))
+    elapsed = time.perf_counter() - start
+    await server.close()
+
+    round_trips = sorted(ms for bot in results for ms in bot)
+    print(f"{sessions} sessions, {len(round_trips)} ticks in {elapsed:.2f}s "
+          f"({len(round_trips) / elapsed:.0f} ticks/s); round trip p50 {round_trips[len(round_trips) // 2]:.2f} ms, "
+          f"p99 {round_trips[int(len(round_trips) * 0.99)]:.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve many Zombie Surviver sessions over a local socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tick-rate", type=float, default=10.0, help="Turns per second of autoplay sessions.")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Game worker processes (0: step games on one thread of this process).")
+    parser.add_argument("--bots", type=int, default=0,
+                        help="Instead of serving, run this many local bot sessions against a fresh server.")
+    parser.add_argument("--turns", type=int, default=100, help="Moves per bot session.")
+    args = parser.parse_args(argv)
+
+    if args.bots:
+        asyncio.run(run_bots(args.bots, args.turns, args.tick_rate, args.workers))
+        return
+
+    async def serve():
+        server = await GameServer(args.host, args.port, args.tick_rate, args.workers).start()
+        print(f"Serving on {server.host}:{server.port}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
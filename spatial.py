@@ -0,0 +1,80 @@
+from environment import Coord, manhattan
+from typing import Dict, List, Optional, Tuple
+
+
+class SpatialIndex:
+    """Bucketed index of agents for nearest-agent queries, kept up to date incrementally as agents move.
+
+    Agents of each kind ("human" / "zombie") are grouped into bucket_size x bucket_size blocks,
+    and `nearest` searches rings of blocks outward. Agents register here through `add`; their
+    `pos` setter then calls `move` on every step.
+    """
+
+    def __init__(self, width: int, height: int, bucket_size: int = 8):
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+        self._buckets: Dict[str, Dict[Tuple[int, int], List]] = {}
+        self._seq = 0 # Insertion order, used to break nearest-agent ties like min() over a list would
+
+    def _bucket(self, pos: Coord) -> Tuple[int, int]:
+        return (pos[0] // self.bucket_size, pos[1] // self.bucket_size)
+
+    def add(self, agent):
+        agent._index = self
+        agent._seq = self._seq
+        self._seq += 1
+        self._insert(agent.kind, agent, agent.pos)
+
+    def remove(self, agent):
+        self._delete(agent.kind, agent, agent.pos)
+        agent._index = None
+
+    def move(self, agent, old: Coord, new: Coord):
+        if self._bucket(old) != self._bucket(new):
+            self._delete(agent.kind, agent, old)
+            self._insert(agent.kind, agent, new)
+
+    def _insert(self, kind: str, agent, pos: Coord):
+        self._buckets.setdefault(kind, {}).setdefault(self._bucket(pos), []).append(agent)
+
+    def _delete(self, kind: str, agent, pos: Coord):
+        bucket_key = self._bucket(pos)
+        bucket = self._buckets[kind][bucket_key]
+        bucket.remove(agent)
+        if not bucket:
+            del self._buckets[kind][bucket_key]
+
+    # --- Queries ---
+    def nearest(self, pos: Coord, kind: str):
+        """Nearest agent of the given kind by Manhattan distance, searching rings of buckets outward."""
+        buckets = self._buckets.get(kind)
+        if not buckets:
+            return None
+
+        bx, by = self._bucket(pos)
+        max_ring = max(self.width, self.height) // self.bucket_size + 1
+        best = None
+        best_key: Optional[Tuple[int, int]] = None
+        for r in range(max_ring + 1):
+            for key in self._ring(bx, by, r):
+                for agent in buckets.get(key, ()):
+                    agent_key = (manhattan(agent.pos, pos), agent._seq)
+                    if best_key is None or agent_key < best_key:
+                        best, best_key = agent, agent_key
+            # Anything in ring r + 1 is at least r * bucket_size + 1 away
+            if best_key is not None and best_key[0] <= r * self.bucket_size:
+                break
+        return best
+
+    @staticmethod
+    def _ring(bx: int, by: int, r: int):
+        if r == 0:
+            yield (bx, by)
+            return
+        for x in range(bx - r, bx + r + 1):
+            yield (x, by - r)
+            yield (x, by + r)
+        for y in range(by - r + 1, by + r):
+            yield (bx - r, y)
+            yield (bx + r, y)
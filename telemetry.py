@@ -0,0 +1,62 @@
+import json
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class SearchStats:
+    """Counters filled in by one A* search."""
+    __slots__ = ("expanded", "pushed", "heap_peak", "fallback")
+
+    def __init__(self):
+        self.expanded = 0 # Nodes popped from the priority queue
+        self.pushed = 0 # Nodes pushed onto the priority queue
+        self.heap_peak = 0 # Largest priority queue size seen
+        self.fallback = False # Zombie search found no path and fell back to a random move
+
+
+class Telemetry:
+    """Optional per-turn instrumentation for Game, kept in an in-memory ring buffer.
+
+    Game only touches this when `game.telemetry` is set, so the disabled cost is one
+    attribute check per turn and one `is None` check per search.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.records: Deque[Dict] = deque(maxlen=capacity)
+        self._current: Optional[Dict] = None
+
+    def record_for(self, turn: int) -> Dict:
+        """The record for the given turn, started (and appended to the buffer) on first use."""
+        if self._current is None or self._current["turn"] != turn:
+            self._current = {
+                "turn": turn,
+                "step_ms": 0.0,
+                "human_ms": 0.0,
+                "zombie_ms": 0.0,
+                "searches": 0,
+                "nodes_expanded": 0,
+                "nodes_pushed": 0,
+                "heap_peak": 0,
+                "fallback_moves": 0,
+                "humans": 0,
+                "zombies": 0,
+            }
+            self.records.append(self._current)
+        return self._current
+
+    def add_search(self, turn: int, stats: SearchStats):
+        record = self.record_for(turn)
+        record["searches"] += 1
+        record["nodes_expanded"] += stats.expanded
+        record["nodes_pushed"] += stats.pushed
+        record["heap_peak"] = max(record["heap_peak"], stats.heap_peak)
+        record["fallback_moves"] += stats.fallback
+
+    def latest(self) -> Optional[Dict]:
+        return self.records[-1] if self.records else None
+
+    def dump_jsonl(self, path: str):
+        """Writes the buffered records, oldest first, one JSON object per line."""
+        with open(path, "w") as out:
+            for record in self.records:
+                out.write(json.dumps(record) + "\n")
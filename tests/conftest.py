@@ -0,0 +1,67 @@
+import os
+import random
+import sys
+from collections import deque
+
+import pytest
+
+# The modules live at the repository root, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from environment import GRID_BACKENDS  # noqa: E402
+
+
+def random_grid(seed: int, size: int = 20, density: float = 0.3, backend: str = "set", safe_zones: int = 1):
+    """A seeded size x size grid with uniformly random obstacles and `safe_zones` open safe cells."""
+    rng = random.Random(seed)
+    cells = [(x, y) for x in range(size) for y in range(size)]
+    obstacles = set(rng.sample(cells, int(len(cells) * density)))
+    open_cells = [c for c in cells if c not in obstacles]
+    safe = set(rng.sample(open_cells, safe_zones))
+    return GRID_BACKENDS[backend](size, size, obstacles, safe)
+
+
+def open_cells(grid):
+    """Every passable cell of grid."""
+    return [(x, y) for x in range(grid.width) for y in range(grid.height) if grid.passable((x, y))]
+
+
+def all_cells(grid):
+    """Every cell of grid, row by row."""
+    return [(x, y) for y in range(grid.height) for x in range(grid.width)]
+
+
+def endpoints(grid, seed):
+    """A seeded (start, goal) pair of passable cells."""
+    rng = random.Random(seed)
+    cells = open_cells(grid)
+    return rng.choice(cells), rng.choice(cells)
+
+
+def bfs(grid, start, blocked=()):
+    """Reference step distances from start over passable cells, treating `blocked` as walls."""
+    dist = {start: 0}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for n in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if grid.in_bounds(n) and grid.passable(n) and n not in blocked and n not in dist:
+                dist[n] = dist[(x, y)] + 1
+                queue.append(n)
+    return dist
+
+
+def assert_valid_path(grid, start, path, goal, blocked=()):
+    """Every step is a passable 4-neighbor of the previous cell, and the path ends on goal."""
+    prev = start
+    for cell in path:
+        assert abs(cell[0] - prev[0]) + abs(cell[1] - prev[1]) == 1, f"{prev} -> {cell} is not a step"
+        assert grid.passable(cell), f"{cell} is an obstacle"
+        assert cell == goal or cell not in blocked, f"{cell} is blocked"
+        prev = cell
+    assert prev == goal
+
+
+@pytest.fixture(params=sorted(GRID_BACKENDS))
+def backend(request):
+    return request.param
@@ -0,0 +1,25 @@
+import numpy as np
+
+from agentstore import AgentStore
+from headless import run_episode
+
+
+def test_flowfield_ties_do_not_stall_the_game():
+    # Seed 5 used to time out: the human stepped between two cells and the zombies, breaking
+    # ties by a fixed neighbor order, mirrored it for 900 turns
+    result = run_episode(5, zombie_pathing="flowfield")
+    assert result["winner"] != "timeout"
+    assert result["turns"] < 200
+
+
+def test_ties_close_the_larger_gap_to_the_target():
+    # Open 5x5 field, human at (4, 4): from (2, 0) both right and down are one step closer,
+    # but the y gap is the larger, so the zombie steps down
+    width = height = 5
+    xs, ys = np.meshgrid(np.arange(width), np.arange(height))
+    dist = (np.abs(xs - 4) + np.abs(ys - 4)).ravel().astype(np.int32)
+    store = AgentStore()
+    slots = store.add_many("zombie", np.array([2]), np.array([0]))
+    cells = store.step_downhill(slots, dist, np.ones(width * height, dtype=bool), width, height,
+                                np.random.default_rng(0), np.array([4 * width + 4]))
+    assert cells.tolist() == [1 * width + 2]
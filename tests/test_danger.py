@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from conftest import open_cells, random_grid
+from danger import DangerMap
+
+
+@pytest.mark.parametrize("falloff", ["flat", "linear"])
+@pytest.mark.parametrize("seed", range(6))
+def test_updates_match_a_fresh_map(falloff, seed):
+    grid = random_grid(seed)
+    rng = random.Random(seed)
+    cells = open_cells(grid)
+    zombies = rng.sample(cells, 8)
+    danger = DangerMap(grid, zombies, radius=2, weight=900, falloff=falloff)
+    for _ in range(10):
+        # Move some zombies, stack others on one cell and drop one now and then
+        zombies = [rng.choice(cells) if rng.random() < 0.4 else z for z in zombies]
+        zombies[0] = zombies[1]
+        if rng.random() < 0.3:
+            zombies.pop()
+        danger.update(zombies)
+        fresh = DangerMap(grid, zombies, radius=2, weight=900, falloff=falloff)
+        assert danger.penalties == fresh.penalties
+        assert 0 not in danger.penalties.values()
+    assert (danger.costs == fresh.costs).all()
+
+
+def test_penalties_follow_the_falloff():
+    grid = random_grid(0, density=0.0)
+    flat = DangerMap(grid, [(5, 5), (5, 5)], radius=1, weight=1000)
+    assert flat.penalty((5, 5)) == flat.penalty((5, 6)) == 2000
+    assert flat.penalty((6, 6)) == 0
+    linear = DangerMap(grid, [(5, 5)], radius=1, weight=1000, falloff="linear")
+    assert linear.penalty((5, 5)) == 1000 and linear.penalty((4, 5)) == 500
+    with pytest.raises(ValueError):
+        DangerMap(grid, [], falloff="cubic")
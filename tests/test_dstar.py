@@ -0,0 +1,65 @@
+import pytest
+
+from conftest import assert_valid_path, bfs, endpoints, random_grid
+from dstar import DStarLite
+
+SEEDS = range(12)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_dstar_lite_reaches_nearest_safe_zone(backend, seed):
+    grid = random_grid(seed, backend=backend, safe_zones=3)
+    start, _ = endpoints(grid, seed)
+    planner = DStarLite(grid, start, grid.safe_zones)
+    planner.update(start, {})
+    path = planner.path()
+    reachable = [d for cell, d in bfs(grid, start).items() if cell in grid.safe_zones]
+    if not reachable:
+        assert path is None
+    else:
+        assert len(path) == min(reachable)
+        assert_valid_path(grid, start, path, path[-1] if path else start)
+        assert not path or path[-1] in grid.safe_zones
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_dstar_lite_repairs_after_moves_and_penalties(seed):
+    grid = random_grid(seed, density=0.2)
+    start, _ = endpoints(grid, seed)
+    planner = DStarLite(grid, start, grid.safe_zones)
+    planner.update(start, {})
+    path = planner.path()
+    if not path:
+        return
+    # Walk two steps, then penalize the next cell of the route heavily: the repaired plan must
+    # match a planner built from scratch for the same position and penalties
+    pos = path[min(1, len(path) - 1)]
+    penalties = {path[min(2, len(path) - 1)]: 1000}
+    planner.update(pos, penalties)
+    fresh = DStarLite(grid, pos, grid.safe_zones)
+    fresh.update(pos, penalties)
+    assert planner.g.get(pos) == fresh.g.get(pos)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_dstar_lite_repairs_after_new_obstacles(backend, seed):
+    grid = random_grid(seed, density=0.2, backend=backend, safe_zones=3)
+    start, _ = endpoints(grid, seed)
+    planner = DStarLite(grid, start, grid.safe_zones)
+    planner.update(start, {})
+    path = planner.path()
+    if not path or len(path) < 3:
+        return
+    # Wall off the middle of the current route (safe zone included if it is that short)
+    grid.add_obstacle(path[len(path) // 2])
+    planner.update(start, {})
+    reachable = [d for cell, d in bfs(grid, start).items() if cell in grid.safe_zones]
+    repaired = planner.path()
+    if not reachable:
+        assert repaired is None
+    else:
+        assert len(repaired) == min(reachable)
+        assert_valid_path(grid, start, repaired, repaired[-1])
+    fresh = DStarLite(grid, start, grid.safe_zones)
+    fresh.update(start, {})
+    assert planner.g.get(start) == fresh.g.get(start)
@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from conftest import all_cells
+from environment import ArrayGrid, Grid
+
+SEEDS = range(8)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_generated_obstacles_keep_start_connected(backend, seed):
+    random.seed(seed)
+    grid = Grid(30, 30, safe_zones={(29, 29)}) if backend == "set" else ArrayGrid(30, 30, safe_zones={(29, 29)})
+    start = (0, 0)
+    path = grid.generate_connected_obstacles(400, start, {(1, 0)})
+    assert len(grid.obstacles) == 400
+    assert (1, 0) not in grid.obstacles
+    assert grid.check_connectivity(start, grid.safe_zones)
+    assert path[-1] in grid.safe_zones
+    assert not any(cell in grid.obstacles for cell in path)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_generator_only_rejects_cut_cells(seed):
+    # Asking for an obstacle on every free cell places every one that can go: each cell left
+    # open is then a cut cell whose removal would separate start from the safe zones
+    random.seed(seed)
+    size = 12
+    grid = Grid(size, size, safe_zones={(size - 1, size - 1), (size - 1, 0)})
+    start = (0, 0)
+    with pytest.raises(ValueError, match="without cutting"):
+        grid.generate_connected_obstacles(size * size - 1 - len(grid.safe_zones), start, set())
+    assert grid.check_connectivity(start, grid.safe_zones)
+    for cell in all_cells(grid):
+        if grid.passable(cell) and cell != start and cell not in grid.safe_zones:
+            grid.obstacles.add(cell)
+            assert not grid.check_connectivity(start, grid.safe_zones), f"{cell} could have been an obstacle"
+            grid.obstacles.discard(cell)
@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from conftest import all_cells, random_grid
+from environment import ArrayGrid
+
+SEEDS = range(8)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_array_grid_neighbors_match_set_grid(seed):
+    grid = random_grid(seed)
+    array_grid = ArrayGrid.from_grid(grid)
+    for cell in all_cells(grid):
+        assert array_grid.neighbors(cell) == grid.neighbors(cell)
+
+    # Adding obstacles patches the adjacency in place; it must match a grid built from scratch
+    rng = random.Random(seed)
+    for cell in rng.sample(all_cells(grid), 30):
+        grid.add_obstacle(cell)
+        array_grid.add_obstacle(cell)
+    rebuilt = ArrayGrid.from_grid(grid)
+    for cell in all_cells(grid):
+        assert array_grid.neighbors(cell) == grid.neighbors(cell) == rebuilt.neighbors(cell)
+
+
+def test_new_obstacle_loses_its_own_edges(backend):
+    grid = random_grid(0, density=0.0, backend=backend)
+    grid.neighbors((5, 5)) # Fills the neighbor cache before the change
+    grid.add_obstacle((5, 5))
+    assert grid.neighbors((5, 5)) == []
+    assert (5, 5) not in grid.neighbors((5, 6))
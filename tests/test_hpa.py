@@ -0,0 +1,30 @@
+import random
+
+import pytest
+
+from conftest import assert_valid_path, bfs, endpoints, open_cells, random_grid
+from environment import Grid
+
+SEEDS = range(12)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_hpa_finds_valid_paths_after_refresh(seed):
+    grid = random_grid(seed, size=40, density=0.2)
+    start, goal = endpoints(grid, seed)
+    planner = grid.hierarchy(cluster_size=8)
+    assert (planner.find_path(start, goal) is None) == (goal not in bfs(grid, start))
+
+    # New obstacles only rebuild the clusters they touch; the result must still match a rebuilt grid
+    rng = random.Random(seed)
+    for cell in rng.sample(open_cells(grid), 40):
+        if cell not in (start, goal):
+            grid.add_obstacle(cell)
+    dist = bfs(grid, start)
+    path = planner.find_path(start, goal)
+    assert (path is None) == (goal not in dist)
+    if path is not None:
+        assert len(path) >= dist[goal] # HPA* is near-optimal, not optimal
+        assert_valid_path(grid, start, path, goal)
+        rebuilt = Grid(grid.width, grid.height, grid.obstacles, grid.safe_zones)
+        assert len(rebuilt.hierarchy(cluster_size=8).find_path(start, goal)) == len(path)
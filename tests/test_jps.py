@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from conftest import assert_valid_path, bfs, endpoints, open_cells, random_grid
+from jps import JumpPointSearch
+
+SEEDS = range(12)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_jps_matches_bfs(backend, seed):
+    grid = random_grid(seed, backend=backend)
+    start, goal = endpoints(grid, seed)
+    dist = bfs(grid, start)
+    path = JumpPointSearch(grid, goal).search(start)
+    assert (path is None) == (goal not in dist)
+    if path is not None:
+        assert len(path) == dist[goal]
+        assert_valid_path(grid, start, path, goal)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_jps_tables_follow_new_obstacles(seed):
+    grid = random_grid(seed, density=0.15)
+    start, goal = endpoints(grid, seed)
+    JumpPointSearch(grid, goal).search(start) # Builds the tables for the old layout
+    rng = random.Random(seed)
+    for cell in rng.sample(open_cells(grid), 15):
+        if cell not in (start, goal):
+            grid.add_obstacle(cell)
+    dist = bfs(grid, start)
+    path = JumpPointSearch(grid, goal).search(start)
+    assert (path is None) == (goal not in dist)
+    if path is not None:
+        assert len(path) == dist[goal]
+        assert_valid_path(grid, start, path, goal)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_jps_blocked_cells(seed):
+    grid = random_grid(seed, density=0.2)
+    start, goal = endpoints(grid, seed)
+    rng = random.Random(seed)
+    blocked = {c for c in rng.sample(open_cells(grid), 20) if c != start}
+    dist = bfs(grid, start, blocked - {goal})
+    path = JumpPointSearch(grid, goal, blocked).search(start)
+    assert (path is None) == (goal not in dist)
+    if path is not None:
+        assert len(path) == dist[goal]
+        assert_valid_path(grid, start, path, goal, blocked)
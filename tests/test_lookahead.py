@@ -0,0 +1,63 @@
+import random
+from collections import Counter
+
+import pytest
+
+from conftest import random_grid
+from lookahead import HUMAN, ZOMBIE, LookaheadPlanner, LookaheadState, move_zombie_key, zobrist_key
+from scenario import setup_new_game
+
+
+def test_stacked_zombies_do_not_cancel_out():
+    width = 10
+    alone = LookaheadState.from_positions(width, (0, 0), [])
+    stacked = LookaheadState.from_positions(width, (0, 0), [(3, 3), (3, 3)])
+    single = LookaheadState.from_positions(width, (0, 0), [(3, 3)])
+    assert len({alone.key, stacked.key, single.key}) == 3
+    assert zobrist_key(33, ZOMBIE, 2) != zobrist_key(33, ZOMBIE) ^ zobrist_key(33, ZOMBIE)
+    assert zobrist_key(33, HUMAN) != zobrist_key(33, ZOMBIE)
+
+
+def test_incremental_key_matches_a_fresh_hash():
+    rng = random.Random(0)
+    width = 8
+    zombies = [(rng.randrange(width), rng.randrange(width)) for _ in range(6)]
+    key = LookaheadState.from_positions(width, (0, 0), zombies).key
+    counts = Counter(zombies)
+    for _ in range(500):
+        i = rng.randrange(len(zombies))
+        old = zombies[i]
+        # Small moves keep zombies piling onto shared cells
+        new = (min(width - 1, max(0, old[0] + rng.choice((-1, 0, 1)))), old[1])
+        key = move_zombie_key(key, counts, width, old, new)
+        zombies[i] = new
+        assert counts == Counter(zombies)
+        assert key == LookaheadState.from_positions(width, (0, 0), zombies).key
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_simulated_children_hash_like_fresh_states(seed):
+    grid = random_grid(seed, size=12, density=0.2)
+    rng = random.Random(seed)
+    open_cells = [(x, y) for x in range(12) for y in range(12) if grid.passable((x, y)) and not grid.is_safe((x, y))]
+    planner = LookaheadPlanner(grid)
+    state = LookaheadState.from_positions(grid.width, rng.choice(open_cells), rng.sample(open_cells, 4))
+    for _ in range(20):
+        child, _ = planner.simulate(state, rng.choice(planner.human_moves(state)))
+        if child is None:
+            break
+        assert child.key == LookaheadState.from_positions(grid.width, child.human, child.zombies).key
+        state = child
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_default_budget_is_deterministic(seed):
+    def play():
+        game = setup_new_game(15, 40, 4, verbose=False, human_planner="lookahead", seed=seed)
+        moves = []
+        while not game.game_over and game.turn < 40:
+            game.step("auto")
+            moves.append([h.pos for h in game.humans])
+        return moves
+
+    assert play() == play()
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from maplib import MapLibrary, build_library, render
+from scenario import setup_new_game
+
+SIZE, OBSTACLES, ZOMBIES = 15, 50, 4
+
+
+@pytest.fixture(scope="module")
+def library(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("maps") / "maps.zsm")
+    build_library(path, [7, 3, 11, 5], SIZE, OBSTACLES, ZOMBIES, verbose=False)
+    with MapLibrary(path) as lib:
+        yield lib
+
+
+def test_seeds_are_sorted_and_indexed(library):
+    assert [library.seed(i) for i in range(len(library))] == [3, 5, 7, 11]
+    assert library.index_of(7) == 2
+    with pytest.raises(KeyError):
+        library.index_of(4)
+    with pytest.raises(IndexError):
+        library.grid(len(library))
+
+
+@pytest.mark.parametrize("seed", [3, 5, 7, 11])
+def test_map_equals_setup_new_game(library, seed):
+    expected = setup_new_game(SIZE, OBSTACLES, ZOMBIES, verbose=False, grid_backend="array", landmarks=0, seed=seed)
+    state = random.getstate()
+    library.grid(library.index_of(seed))
+    assert random.getstate() == state # Loading a map draws nothing
+    game = library.game(library.index_of(seed), landmarks=0)
+    assert game.seed == seed
+    assert game.grid.obstacles == expected.grid.obstacles
+    assert game.grid.safe_zones == expected.grid.safe_zones
+    assert [h.pos for h in game.humans] == [h.pos for h in expected.humans]
+    assert [z.pos for z in game.zombies] == [z.pos for z in expected.zombies]
+    assert list(game.grid.safe_distance_ids()) == list(expected.grid.safe_distance_ids())
+
+
+def test_games_do_not_share_obstacles(library):
+    game = library.game(0)
+    human, zombies = library.spawns(0)
+    cell = next((x, y) for y in range(SIZE) for x in range(SIZE)
+                if game.grid.passable((x, y)) and not game.grid.is_safe((x, y))
+                and (x, y) != human and (x, y) not in zombies)
+    distances = list(library.grid(0).safe_distance_ids())
+    assert not isinstance(game.grid.cells, bytearray) # Loading views the record; nothing is copied yet
+    game.grid.add_obstacle(cell)
+    assert isinstance(game.grid.cells, bytearray)
+    assert not game.grid.passable(cell)
+
+    fresh = library.game(0)
+    assert fresh.grid.passable(cell)
+    assert cell not in fresh.grid.obstacles
+    assert list(fresh.grid.safe_distance_ids()) == distances
+    # The changed grid recomputes its own field instead of reading the stored one
+    assert game.grid.safe_distance_ids()[game.grid.cell_id(cell)] == -1
+
+
+def test_render_marks_every_agent(library):
+    text = render(library, 1)
+    assert text.count("H") == 1
+    assert text.count("S") == 1
+    assert text.count("Z") == len(set(library.spawns(1)[1]))
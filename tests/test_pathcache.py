@@ -0,0 +1,47 @@
+import pytest
+
+from agent import Zombie
+from conftest import bfs
+from environment import Grid
+from pathcache import PathCache
+from scenario import setup_new_game
+
+
+@pytest.mark.parametrize("zombie_pathing", ["astar", "jps"])
+@pytest.mark.parametrize("seed", range(6))
+def test_cache_holds_only_shortest_paths(seed, zombie_pathing):
+    game = setup_new_game(20, 80, 8, verbose=False, zombie_pathing=zombie_pathing, path_cache_size=4096, seed=seed)
+    cache = game.path_cache
+    while not game.game_over and game.turn < 60:
+        game.step("auto")
+        distances = {}
+        for (cell, goal, version), (route, index) in cache._entries.items():
+            if version != game.grid.version:
+                continue
+            if goal not in distances:
+                distances[goal] = bfs(game.grid, goal)
+            assert len(route) - index == distances[goal][cell], f"{cell} -> {goal} is cached as a detour"
+
+
+def test_detour_around_claimed_cells_is_not_stored():
+    # A corridor with one side opening: the straight route is claimed, so the zombie detours
+    grid = Grid(5, 3, obstacles={(1, 0), (2, 0), (3, 0)})
+    zombie = Zombie((0, 1), grid)
+    zombie.path_cache = PathCache()
+    step = zombie.a_star_search((0, 1), (4, 1), occupied_cells={(1, 1)})
+    assert step == (0, 2)
+    assert len(zombie.path_cache) == 0
+
+    # Unobstructed, the same search is cached under every cell of the route
+    assert zombie.a_star_search((0, 1), (4, 1), occupied_cells=set()) == (1, 1)
+    assert len(zombie.path_cache) == 4
+    assert zombie.path_cache.next_step((2, 1), (4, 1), grid.version, set()) == (3, 1)
+
+
+def test_cache_misses_after_the_map_changes():
+    grid = Grid(5, 3)
+    cache = PathCache()
+    cache.store((0, 1), [(1, 1), (2, 1), (3, 1)], (3, 1), grid.version)
+    assert cache.next_step((0, 1), (3, 1), grid.version, set()) == (1, 1)
+    grid.add_obstacle((2, 1))
+    assert cache.next_step((0, 1), (3, 1), grid.version, set()) is None
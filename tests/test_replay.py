@@ -0,0 +1,67 @@
+import shutil
+
+import pytest
+
+from replay import Replay, ReplayRecorder
+from scenario import setup_new_game
+
+
+def record_game(path, seed, keyframe_interval=4, turns=60):
+    """Plays a seeded game in auto mode with a recorder attached; returns the recorder and the positions per turn."""
+    game = setup_new_game(15, 40, 4, verbose=False, seed=seed)
+    recorder = game.replay = ReplayRecorder(str(path), game, keyframe_interval)
+    frames = [([h.pos for h in game.humans], [z.pos for z in game.zombies])]
+    while not game.game_over and game.turn < turns:
+        game.step("auto")
+        frames.append(([h.pos for h in game.humans], [z.pos for z in game.zombies]))
+    return game, recorder, frames
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_frames_match_the_recorded_game(tmp_path, seed):
+    game, recorder, frames = record_game(tmp_path / "game.zsr", seed)
+    recorder.close()
+    with Replay(str(tmp_path / "game.zsr")) as replay:
+        assert len(replay) == len(frames)
+        assert replay.seed == seed
+        assert set(replay.obstacles) == game.grid.obstacles
+        assert set(replay.safe_zones) == game.grid.safe_zones
+        # Seek out of order so no state carries over between lookups
+        for turn in reversed(range(len(frames))):
+            frame = replay.frame(turn)
+            assert frame.turn == turn
+            assert (frame.humans, frame.zombies) == frames[turn]
+            assert frame.input == ("auto" if turn else "")
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_unclosed_file_is_rescanned(tmp_path, seed):
+    _, recorder, frames = record_game(tmp_path / "game.zsr", seed)
+    recorder._file.flush() # Like a run that died before close(): frames but no index
+    shutil.copy(tmp_path / "game.zsr", tmp_path / "crashed.zsr")
+    with Replay(str(tmp_path / "crashed.zsr")) as replay:
+        assert len(replay) == len(frames)
+        for turn in range(len(frames)):
+            frame = replay.frame(turn)
+            assert (frame.humans, frame.zombies) == frames[turn]
+    recorder.close()
+
+
+def test_truncated_last_frame_is_dropped(tmp_path):
+    _, recorder, frames = record_game(tmp_path / "game.zsr", 0)
+    recorder._file.flush()
+    data = (tmp_path / "game.zsr").read_bytes()
+    (tmp_path / "torn.zsr").write_bytes(data[:-1])
+    with Replay(str(tmp_path / "torn.zsr")) as replay:
+        assert len(replay) == len(frames) - 1
+        last = replay.frame(len(replay) - 1)
+        assert (last.humans, last.zombies) == frames[len(replay) - 1]
+    recorder.close()
+
+
+def test_frame_out_of_range(tmp_path):
+    _, recorder, frames = record_game(tmp_path / "game.zsr", 0)
+    recorder.close()
+    with Replay(str(tmp_path / "game.zsr")) as replay:
+        with pytest.raises(IndexError):
+            replay.frame(len(frames))
@@ -0,0 +1,23 @@
+import pytest
+
+from conftest import all_cells, bfs, random_grid
+
+SEEDS = range(8)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_safe_distances_follow_the_map(backend, seed):
+    grid = random_grid(seed, backend=backend, safe_zones=3)
+    field = grid.distance_field(grid.safe_zones)
+    for cell in all_cells(grid):
+        assert grid.safe_distance_ids()[grid.cell_id(cell)] == field.get(cell, -1)
+        zone = grid.nearest_safe_zone(cell)
+        if cell not in field:
+            assert zone is None
+        else:
+            assert zone in grid.safe_zones and bfs(grid, cell)[zone] == field[cell]
+
+    # The cached field is dropped when an obstacle appears
+    cell = next(c for c in all_cells(grid) if grid.passable(c) and c not in grid.safe_zones)
+    grid.add_obstacle(cell)
+    assert grid.safe_distance_ids()[grid.cell_id(cell)] == -1
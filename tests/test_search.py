@@ -0,0 +1,51 @@
+import heapq
+import random
+
+import pytest
+
+from conftest import assert_valid_path, bfs, endpoints, open_cells, random_grid
+from search import BucketQueue
+
+SEEDS = range(12)
+
+
+def test_bucket_queue_pops_like_a_heap():
+    rng = random.Random(0)
+    queue, heap = BucketQueue(), []
+    for _ in range(2000):
+        if heap and rng.random() < 0.4:
+            assert queue.pop() == heapq.heappop(heap)[1]
+        else:
+            entry = (rng.randrange(50), rng.randrange(1000))
+            queue.push(*entry)
+            heapq.heappush(heap, entry)
+        assert len(queue) == len(heap)
+    while heap:
+        assert queue.pop() == heapq.heappop(heap)[1]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_search_engine_matches_bfs(backend, seed):
+    grid = random_grid(seed, backend=backend)
+    start, goal = endpoints(grid, seed)
+    dist = bfs(grid, start)
+    path = grid.search_engine().find_path(start, goal).path
+    if goal not in dist:
+        assert path is None
+    else:
+        assert len(path) == dist[goal]
+        assert_valid_path(grid, start, path, goal)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_search_engine_blocked_cells(seed):
+    grid = random_grid(seed, density=0.2)
+    start, goal = endpoints(grid, seed)
+    rng = random.Random(seed)
+    blocked = {c for c in rng.sample(open_cells(grid), 20) if c != start}
+    dist = bfs(grid, start, blocked - {goal})
+    path = grid.search_engine().find_path(start, goal, blocked=blocked).path
+    assert (path is None) == (goal not in dist)
+    if path is not None:
+        assert len(path) == dist[goal]
+        assert_valid_path(grid, start, path, goal, blocked)
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import random
+
+from server import GameServer
+
+OPTIONS = {"grid_size": 10, "obstacles": 10, "zombies": 2}
+
+
+async def request(reader, writer, message):
+    writer.write(json.dumps(message).encode() + b"\n")
+    return json.loads(await asyncio.wait_for(reader.readline(), 5))
+
+
+def run(scenario, **server_options):
+    async def main():
+        server = await GameServer(port=0, **server_options).start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_concurrent_new_requests_respect_max_sessions():
+    async def scenario(server):
+        async def new(seed):
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            return await request(reader, writer, {"op": "new", "seed": seed, **OPTIONS})
+        return await asyncio.gather(*(new(seed) for seed in range(6)))
+
+    replies = run(scenario, max_sessions=2)
+    assert sorted(r["type"] for r in replies) == ["error"] * 4 + ["state"] * 2
+
+
+def test_move_on_a_finished_session_is_answered():
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        state = await request(reader, writer, {"op": "new", "seed": 1, "max_turns": 3, **OPTIONS})
+        move = {"op": "move", "session": state["session"], "direction": "auto"}
+        while "winner" not in (reply := await request(reader, writer, move)):
+            assert reply["type"] == "diff"
+        return await request(reader, writer, move)
+
+    reply = run(scenario)
+    assert reply["type"] == "error"
+    assert "is over" in reply["message"]
+
+
+def test_seeded_sessions_leave_the_random_module_alone():
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        state = await request(reader, writer, {"op": "new", "seed": 5, **OPTIONS})
+        for _ in range(3):
+            await request(reader, writer, {"op": "move", "session": state["session"], "direction": "auto"})
+        return state
+
+    random.seed(123)
+    expected = random.random()
+    random.seed(123)
+    first = run(scenario)
+    assert random.random() == expected
+    assert run(scenario)["obstacles"] == first["obstacles"]
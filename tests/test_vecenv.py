@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from conftest import bfs
+from environment import Grid
+from vecenv import VecGame
+
+
+def game_grid(env, i):
+    """Game i of the shared board as its own Grid, and its human's cell."""
+    s = env.size
+    passable = env.passable.reshape(env.num_envs, s + 1, s)[i, 1:]
+    obstacles = {(x, y) for y in range(s) for x in range(s) if not passable[y, x]}
+    origin = (i * (s + 1) + 1) * s
+    human = int(env.humans[i]) - origin
+    return Grid(s, s, obstacles), (human % s, human // s), origin
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_batched_bfs_matches_per_game_bfs(seed):
+    env = VecGame(16, grid_size=12, num_obstacles=40, num_zombies=3, seed=seed)
+    rng = np.random.default_rng(seed)
+    for _ in range(5):
+        dist = env.distances()
+        zombies = env.store.cell_ids(env.zombie_slots, env.width).reshape(env.num_envs, env.num_zombies)
+        for i in range(env.num_envs):
+            grid, human, origin = game_grid(env, i)
+            expected = bfs(grid, human)
+            for cell in zombies[i]:
+                local = int(cell) - origin
+                assert dist[cell] == expected.get((local % env.size, local // env.size), -1)
+            # Every labeled cell carries its exact distance, even where the BFS stopped early
+            for y in range(env.size):
+                for x in range(env.size):
+                    d = dist[origin + y * env.size + x]
+                    if d >= 0:
+                        assert d == expected[(x, y)]
+        env.step(rng.integers(0, 5, env.num_envs))
+
+
+def test_games_stay_inside_their_rows():
+    env = VecGame(8, grid_size=10, num_obstacles=20, num_zombies=4, seed=1)
+    rng = np.random.default_rng(1)
+    s = env.size
+    for _ in range(50):
+        env.step(rng.integers(0, 5, env.num_envs))
+        rows = env.humans // s
+        assert (rows % (s + 1) != 0).all() # Never on a wall row
+        game_of_human = rows // (s + 1)
+        assert (game_of_human == np.arange(env.num_envs)).all()
+        zombie_rows = env.store.cell_ids(env.zombie_slots, env.width) // s
+        assert (zombie_rows // (s + 1) == np.repeat(np.arange(env.num_envs), env.num_zombies)).all()
@@ -0,0 +1,217 @@
+import numpy as np
+from agentstore import AgentStore
+from scenario import GRID_SIZE, NUM_OBSTACLES, NUM_ZOMBIES
+from typing import Dict, Optional, Tuple
+
+# Action codes: stay, up, down, left, right (same order as replay.MOVES)
+ACTION_DX = np.array([0, 0, 0, -1, 1], dtype=np.int64)
+ACTION_DY = np.array([0, -1, 1, 0, 0], dtype=np.int64)
+NUM_ACTIONS = 5
+
+
+class VecGame:
+    """N independent games stepped together, for RL training.
+
+    All games share one flat board: game i owns rows i*(size+1)+1 .. i*(size+1)+size of a
+    (N*(size+1)) x size grid, and the row above each game is a wall. Walls keep BFS and zombie
+    moves inside their own game, so one batched BFS from every human and one
+    `AgentStore.step_downhill` call move the zombies of all games at once, the same way
+    Game's "flowfield" mode does for one game.
+
+    `step(actions)` applies one action per game (see ACTION_DX / ACTION_DY) and returns
+    (observations, rewards, dones, info). A human on a safe zone after its move wins (+1),
+    one caught by a zombie loses (-1), and `max_turns` truncates an episode (0). Finished
+    games are reset in place before `step` returns, so the observation of a done game is
+    the first one of its next episode. Resets generate all their maps in one batch too, so
+    no per-game Python loop runs anywhere in a step.
+    """
+
+    def __init__(self, num_envs: int, grid_size: int = GRID_SIZE, num_obstacles: int = NUM_OBSTACLES,
+                 num_zombies: int = NUM_ZOMBIES, max_turns: Optional[int] = None, step_penalty: float = 0.0,
+                 seed: Optional[int] = None):
+        self.num_envs = num_envs
+        self.size = grid_size
+        self.num_zombies = num_zombies
+        self.num_obstacles = num_obstacles
+        self.max_turns = max_turns if max_turns is not None else grid_size * grid_size * 4
+        self.step_penalty = step_penalty
+        self._rng = np.random.default_rng(seed)
+
+        # Flat board: width size, (size + 1) rows per game with the first one a wall
+        self.width = grid_size
+        self.rows = num_envs * (grid_size + 1)
+        self.passable = np.zeros(self.rows * self.width, dtype=bool)
+        self.safe = np.zeros(self.rows * self.width, dtype=bool)
+        self.humans = np.zeros(num_envs, dtype=np.int64) # Board cell of each game's human
+        self.turns = np.zeros(num_envs, dtype=np.int64)
+        self.store = AgentStore(num_envs * num_zombies)
+        self.store.add_many("zombie", np.zeros(num_envs * num_zombies), np.zeros(num_envs * num_zombies))
+        self.zombie_slots = np.arange(num_envs * num_zombies)
+        columns = np.arange(self.rows * self.width) % self.width
+        self._not_first_col = columns != 0
+        self._not_last_col = columns != self.width - 1
+        self.reset()
+
+    # --- Layout ---
+    def _generate(self, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """k new layouts at once, solvable by construction but not drawn like setup_new_game's maps.
+
+        The safe zone and human start are a random cell and the cell farthest from it, and
+        zombies take distinct valid cells, preferring the top-left quadrant, as in
+        setup_new_game. Obstacles differ: setup_new_game places them one at a time and rejects
+        only cut cells (Grid.generate_connected_obstacles), which is inherently sequential.
+        Here a random monotone corridor from start to safety is reserved instead, and the
+        obstacles are a uniform sample of the other cells. Layouts are therefore biased
+        towards an open straight-ish route, so agents trained here see easier maps than the
+        game's. Returns (obstacles (k, C) bool, safe cell, start cell, zombie cells (k, Z)),
+        with C = size * size and cells as y * size + x.
+        """
+        rng, s = self._rng, self.size
+        cells = s * s
+        rows = np.arange(k)[:, None]
+        ys, xs = np.divmod(np.arange(cells), s)
+
+        # Farthest point from a random one (first maximum in x-major order, like choose_max_distance_positions)
+        p1 = rng.integers(0, cells, k)
+        x_major = np.arange(cells).reshape(s, s).T.ravel() # x-major position -> cell id
+        d = np.abs(xs[x_major] - (p1 % s)[:, None]) + np.abs(ys[x_major] - (p1 // s)[:, None])
+        p2 = x_major[d.argmax(axis=1)]
+        swap = rng.random(k) < 0.5
+        safe, start = np.where(swap, p1, p2), np.where(swap, p2, p1)
+
+        # Staircase corridor: shuffle nx x-steps and ny y-steps (padding sorts last)
+        sx, sy, gx, gy = start % s, start // s, safe % s, safe // s
+        nx, ny = np.abs(gx - sx), np.abs(gy - sy)
+        slot = np.arange(2 * s)[None, :]
+        valid = slot < (nx + ny)[:, None]
+        order = np.where(valid, rng.random((k, 2 * s)), 2.0).argsort(axis=1)
+        is_x = (order < nx[:, None]) & valid
+        is_y = ~is_x & valid
+        cx = sx[:, None] + np.sign(gx - sx)[:, None] * is_x.cumsum(axis=1)
+        cy = sy[:, None] + np.sign(gy - sy)[:, None] * is_y.cumsum(axis=1)
+        reserved = np.zeros((k, cells), dtype=bool)
+        reserved[rows, np.where(valid, cy * s + cx, start[:, None])] = True
+        reserved[np.arange(k), safe] = True
+        reserved[np.arange(k), start] = True
+
+        count = self.num_obstacles
+        if count > cells - reserved.sum(axis=1).max():
+            raise ValueError(f"Cannot place {count} obstacles on a {s}x{s} map.")
+        keys = np.where(reserved, np.inf, rng.random((k, cells)))
+        obstacles = np.zeros((k, cells), dtype=bool)
+        if count:
+            obstacles[rows, np.argpartition(keys, count - 1, axis=1)[:, :count]] = True
+
+        # Zombies: far from the start on open non-safe cells; the quadrant first, then the whole map
+        far = (np.abs(xs - sx[:, None]) + np.abs(ys - sy[:, None])) > s * 0.75
+        open_cell = far & ~obstacles & ~reserved
+        corridor_ok = reserved & far
+        corridor_ok[np.arange(k), safe] = False
+        corridor_ok[np.arange(k), start] = False
+        quadrant = (xs < s // 2 + 1) & (ys < s // 2 + 1)
+        keys = np.where(open_cell | corridor_ok, rng.random((k, cells)) + ~quadrant, np.inf)
+        zombies = np.argpartition(keys, self.num_zombies - 1, axis=1)[:, :self.num_zombies]
+        if np.isinf(keys[rows, zombies]).any():
+            raise RuntimeError("Failed to place a zombie far enough from the human. Check configuration.")
+        return obstacles, safe, start, zombies
+
+    def reset(self, envs: Optional[np.ndarray] = None) -> np.ndarray:
+        """Starts new episodes (all games by default) and returns the observations."""
+        envs = np.arange(self.num_envs) if envs is None else np.asarray(envs)
+        obstacles, safe, start, zombies = self._generate(len(envs))
+        s, n = self.size, self.num_envs
+
+        # (N, size + 1, size) views of the board; row 0 of each game is its wall
+        passable = self.passable.reshape(n, s + 1, s)
+        safe_board = self.safe.reshape(n, s + 1, s)
+        passable[envs, 1:, :] = ~obstacles.reshape(-1, s, s)
+        safe_board[envs, 1:, :] = False
+        origin = (envs * (s + 1) + 1) * s # Board cell of each game's (0, 0)
+        self.safe[origin + safe] = True
+        self.humans[envs] = origin + start
+
+        slots = (envs[:, None] * self.num_zombies + np.arange(self.num_zombies)).ravel()
+        board_cells = (origin[:, None] + zombies).ravel()
+        self.store.xs[slots] = board_cells % s
+        self.store.ys[slots] = board_cells // s
+        self.turns[envs] = 0
+        return self.observe()
+
+    # --- Simulation ---
+    def distances(self) -> np.ndarray:
+        """Batched BFS distance (-1: unreachable) from each game's human, as a flat board array.
+
+        Stops once every zombie's cell is reached: only its neighbors one step closer matter
+        to step_downhill, and those are labeled by then.
+        """
+        width = self.width
+        size = self.rows * width
+        dist = np.full(size, -1, dtype=np.int32)
+        dist[self.humans] = 0
+        frontier = np.zeros(size, dtype=bool)
+        frontier[self.humans] = True
+        unvisited = self.passable & ~frontier
+        spread = np.empty_like(frontier)
+        zombies = self.store.cell_ids(self.zombie_slots, width)
+
+        # Contiguous 1-D shifts; the column masks stop left/right moves from wrapping to the next row
+        d = 0
+        while (dist[zombies] < 0).any() and frontier.any():
+            d += 1
+            spread[:width] = False
+            spread[width:] = frontier[:-width]
+            spread[:-width] |= frontier[width:]
+            spread[1:] |= frontier[:-1] & self._not_last_col[:-1]
+            spread[:-1] |= frontier[1:] & self._not_first_col[1:]
+            spread &= unvisited
+            unvisited ^= spread
+            np.copyto(dist, d, where=spread)
+            frontier, spread = spread, frontier
+        return dist
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """Advances every game by one turn; see the class docstring for the return values."""
+        width = self.width
+        actions = np.asarray(actions, dtype=np.int64)
+
+        # 1. Humans: blocked or off-board moves stay put (walls keep them inside their game)
+        hx = self.humans % width + ACTION_DX[actions]
+        hy = self.humans // width + ACTION_DY[actions]
+        target = np.clip(hy, 0, self.rows - 1) * width + np.clip(hx, 0, width - 1)
+        ok = (hx >= 0) & (hx < width) & (hy >= 0) & (hy < self.rows) & self.passable[target]
+        self.humans = np.where(ok, target, self.humans)
+        won = self.safe[self.humans]
+
+        # 2. Zombies: one downhill step on the batched distance field
+        dist = self.distances()
+        cells = self.store.step_downhill(self.zombie_slots, dist, self.passable, width, self.rows, self._rng,
+                                         np.repeat(self.humans, self.num_zombies))
+
+        # 3. Catches and results (reaching safety first wins, like Game.step)
+        caught = (cells.reshape(self.num_envs, self.num_zombies) == self.humans[:, None]).any(axis=1) & ~won
+        self.turns += 1
+        truncated = ~won & ~caught & (self.turns >= self.max_turns)
+        dones = won | caught | truncated
+        rewards = won.astype(np.float32) - caught.astype(np.float32) - np.float32(self.step_penalty)
+        info = {"won": won, "caught": caught, "truncated": truncated, "turns": self.turns.copy()}
+
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            self.reset(finished)
+        return self.observe(), rewards, dones, info
+
+    # --- Observations ---
+    def observe(self) -> np.ndarray:
+        """(N, 4, size, size) uint8 planes: obstacles, safe zones, human, zombies."""
+        n, size, width = self.num_envs, self.size, self.width
+        obs = np.zeros((n, 4, size, size), dtype=np.uint8)
+        # Dropping each game's wall row gives (N, size, size) views of the board
+        obs[:, 0] = ~self.passable.reshape(n, size + 1, width)[:, 1:, :]
+        obs[:, 1] = self.safe.reshape(n, size + 1, width)[:, 1:, :]
+
+        env_ids = np.arange(n)
+        obs[env_ids, 2, self.humans // width % (size + 1) - 1, self.humans % width] = 1
+        zombie_cells = self.store.cell_ids(self.zombie_slots, width)
+        zombie_envs = np.repeat(env_ids, self.num_zombies)
+        obs[zombie_envs, 3, zombie_cells // width % (size + 1) - 1, zombie_cells % width] = 1
+        return obs
@@ -1,7 +1,11 @@
+import hashlib
+import os
 import pygame
-import time
+from collections import OrderedDict
 from environment import Grid, Coord
-from typing import Tuple, List
+from scheduler import TickScheduler
+from telemetry import Telemetry
+from typing import Dict, Tuple, List, Optional
 
 CELL = 32
 
@@ -27,22 +31,104 @@ IMAGE_FILES = {
     'zombie': 'assets/zombie.jpeg'
 }
 
+# Scaled sprites are baked into one atlas per CELL size; the file name also changes when an asset does
+SPRITE_CACHE_DIR = 'assets/.cache'
+
+# Sprites already loaded by this process, by CELL size
+_SPRITES: Dict[int, Dict[str, "pygame.Surface"]] = {}
+
+# Rendered text surfaces kept by Visualizer.text; the info bar adds one per turn, so old ones are dropped
+TEXT_CACHE_SIZE = 256
+
+
+def sprite_atlas_path() -> str:
+    """Atlas file for the current CELL size and the current contents of IMAGE_FILES."""
+    digest = hashlib.sha1(str(CELL).encode())
+    for filename in IMAGE_FILES.values():
+        try:
+            info = os.stat(filename)
+            digest.update(f"{filename}:{info.st_size}:{info.st_mtime_ns}".encode())
+        except OSError:
+            digest.update(f"{filename}:missing".encode())
+    return os.path.join(SPRITE_CACHE_DIR, f"sprites-{CELL}-{digest.hexdigest()[:12]}.png")
+
 
 class Visualizer:
-    def __init__(self, grid: Grid):
+    def __init__(self, grid: Grid, tick_rate: float = 10.0, render_rate: float = 30.0):
         pygame.init()
-        self.grid = grid
+        self.grid = grid # Setter resets the cached static layer
         self.screen = pygame.display.set_mode((grid.width * CELL, grid.height * CELL + 40))
         pygame.display.set_caption("🧟 Zombie Surviver")
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont("consolas", 20, bold=True)
         self.big_font = pygame.font.SysFont("consolas", 40, bold=True)
+        self.small_font = pygame.font.SysFont("consolas", 14)
         self.images = self.load_images()
-        
+        self._text_cache: "OrderedDict[Tuple[pygame.font.Font, str, Tuple[int, int, int]], pygame.Surface]" = OrderedDict()
+
         # Button properties for New Game
         self.new_game_button_rect = pygame.Rect(0, 0, 0, 0)
 
+        # Game over overlay, button faces and stats box, allocated once per size (see ui_surfaces)
+        self._ui_size: Optional[Tuple[int, int]] = None
+        self._overlay: Optional[pygame.Surface] = None
+        self._button_faces: Dict[bool, pygame.Surface] = {}
+        self._stats_box: Optional[pygame.Surface] = None
+
+        # Simulation ticks are decoupled from rendering (see scheduler.TickScheduler)
+        self.scheduler = TickScheduler(tick_rate=tick_rate, render_rate=render_rate)
+        self.autoplay = False # TAB: keep playing in auto mode without holding SPACE
+        self.show_stats = False # F3: per-turn telemetry overlay
+
+        # Screen regions drawn over the static layer last frame (restored before the next one)
+        self._dirty_rects: List[pygame.Rect] = []
+
+    @property
+    def grid(self) -> Grid:
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid: Grid):
+        # The map is static during a game, so it is only pre-rendered again when the grid is replaced
+        self._grid = grid
+        self._static_layer = None
+        self._full_redraw = True
+
+    def build_static_layer(self) -> pygame.Surface:
+        """Pre-renders background, safe zones, obstacles and grid lines for the current grid."""
+        layer = pygame.Surface(self.screen.get_size()).convert()
+        layer.fill(UI_COLORS['BACKGROUND'])
+
+        for x in range(self.grid.width):
+            for y in range(self.grid.height):
+                rect = pygame.Rect(x * CELL, y * CELL, CELL, CELL)
+
+                # 1. Draw map features (Images/Fallbacks)
+                if (x, y) in self.grid.safe_zones:
+                    layer.blit(self.images['safe_zone'], rect)
+                elif (x, y) in self.grid.obstacles:
+                    layer.blit(self.images['obstacle'], rect)
+
+                # 2. Draw grid lines (cleaner)
+                pygame.draw.rect(layer, UI_COLORS['GRID_LINE'], rect, 1)
+
+        return layer
+
     def load_images(self):
+        """Sprites scaled to CELL, as views into one atlas surface decoded once per process and cached on disk."""
+        cached = _SPRITES.get(CELL)
+        if cached is not None:
+            return cached
+
+        atlas_path = sprite_atlas_path()
+        if os.path.exists(atlas_path):
+            try:
+                atlas = pygame.image.load(atlas_path).convert_alpha()
+                _SPRITES[CELL] = self.atlas_sprites(atlas)
+                return _SPRITES[CELL]
+            except pygame.error:
+                pass # Unreadable atlas: rebuild it from the sources below
+
         loaded_images = {}
         for key, filename in IMAGE_FILES.items():
             try:
@@ -66,7 +152,64 @@ class Visualizer:
                 
                 loaded_images[key] = surface
 
-        return loaded_images
+        # Bake all sprites into one strip so the next start decodes a single small PNG
+        atlas = pygame.Surface((CELL * len(IMAGE_FILES), CELL), pygame.SRCALPHA)
+        for i, key in enumerate(IMAGE_FILES):
+            atlas.blit(loaded_images[key], (i * CELL, 0))
+        try:
+            os.makedirs(SPRITE_CACHE_DIR, exist_ok=True)
+            pygame.image.save(atlas, atlas_path)
+        except (OSError, pygame.error) as e:
+            print(f"Warning: Could not write sprite cache '{atlas_path}': {e}")
+
+        # Draw from the atlas too, so a fresh bake and a cached start render from the same surface
+        _SPRITES[CELL] = self.atlas_sprites(atlas.convert_alpha())
+        return _SPRITES[CELL]
+
+    @staticmethod
+    def atlas_sprites(atlas: pygame.Surface) -> Dict[str, pygame.Surface]:
+        """One CELL x CELL subsurface of the atlas strip per IMAGE_FILES key."""
+        return {key: atlas.subsurface((i * CELL, 0, CELL, CELL)) for i, key in enumerate(IMAGE_FILES)}
+
+    def text(self, font: pygame.font.Font, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """Rendered label, reused while the same font, string and colour keep being drawn."""
+        key = (font, text, color)
+        label = self._text_cache.get(key)
+        if label is None:
+            label = font.render(text, True, color)
+            self._text_cache[key] = label
+            if len(self._text_cache) > TEXT_CACHE_SIZE:
+                self._text_cache.popitem(last=False)
+        else:
+            self._text_cache.move_to_end(key)
+        return label
+
+    def ui_surfaces(self):
+        """(Re)allocates the game over overlay, New Game button and its faces when the map size changes."""
+        size = (self.grid.width * CELL, self.grid.height * CELL)
+        if size == self._ui_size:
+            return
+        self._ui_size = size
+
+        self._overlay = pygame.Surface(size).convert()
+        self._overlay.set_alpha(150)
+        self._overlay.fill((0, 0, 0))
+
+        button_label = self.text(self.font, "New Game", UI_COLORS['BUTTON_TEXT'])
+        btn_width = button_label.get_width() + 40
+        btn_height = button_label.get_height() + 20
+        btn_x = size[0] // 2 - btn_width // 2
+        btn_y = size[1] // 2 + 10
+        self.new_game_button_rect = pygame.Rect(btn_x, btn_y, btn_width, btn_height)
+
+        # Both faces are drawn up front; hovering only picks the other one
+        self._button_faces = {}
+        for hover, color in ((False, UI_COLORS['BUTTON_NORMAL']), (True, UI_COLORS['BUTTON_HOVER'])):
+            face = pygame.Surface((btn_width, btn_height), pygame.SRCALPHA)
+            pygame.draw.rect(face, color, face.get_rect(), border_radius=5)
+            face.blit(button_label, ((btn_width - button_label.get_width()) // 2,
+                                     (btn_height - button_label.get_height()) // 2))
+            self._button_faces[hover] = face.convert_alpha()
 
     # NEW METHOD
     def get_center_coords(self, pos: Coord) -> Tuple[int, int]:
@@ -77,11 +220,11 @@ class Visualizer:
         return (center_x, center_y)
 
     # NEW METHOD
-    def draw_path(self, screen, game):
-        """Draws the human's calculated path as a black line."""
+    def draw_path(self, screen, game) -> Optional[pygame.Rect]:
+        """Draws the human's calculated path as a black line. Returns the area it covered."""
         
         if not game.humans:
-            return
+            return None
 
         human = game.humans[0]
         
@@ -89,13 +232,13 @@ class Visualizer:
         path_coords = [human.pos] + human.path
         
         if len(path_coords) < 2:
-            return
+            return None
 
         # Convert grid coords to pixel coords
         pixel_points = [self.get_center_coords(coord) for coord in path_coords]
         
         # Draw the main black line
-        pygame.draw.lines(
+        return pygame.draw.lines(
             screen, 
             (0, 255, 0), # Black color
             False,     # Do not close the line (open polyline)
@@ -123,58 +266,97 @@ class Visualizer:
         # --- Game Over Message (Color-coded) ---
         win_color = UI_COLORS['HUMAN_WIN'] if game.humans else UI_COLORS['ZOMBIE_WIN']
         result = " HUMANS WIN!" if game.humans else " ZOMBIES WIN!"
-        label = self.big_font.render(result, True, win_color)
-        
+        label = self.text(self.big_font, result, win_color)
+
         text_x = self.grid.width * CELL // 2 - label.get_width() // 2
         text_y = self.grid.height * CELL // 2 - label.get_height() - 20
         self.screen.blit(label, (text_x, text_y))
 
-        # --- New Game Button ---
-        button_text = "New Game"
-        button_label = self.font.render(button_text, True, UI_COLORS['BUTTON_TEXT'])
-        
-        btn_width = button_label.get_width() + 40
-        btn_height = button_label.get_height() + 20
-        btn_x = self.grid.width * CELL // 2 - btn_width // 2
-        btn_y = self.grid.height * CELL // 2 + 10
-
-        self.new_game_button_rect = pygame.Rect(btn_x, btn_y, btn_width, btn_height)
-        
-        # Draw the button and handle cursor
-        button_color = UI_COLORS['BUTTON_NORMAL']
-        if self.new_game_button_rect.collidepoint(mouse_pos):
-            button_color = UI_COLORS['BUTTON_HOVER']
+        # --- New Game Button (pre-rendered in ui_surfaces) and cursor ---
+        hover = self.new_game_button_rect.collidepoint(mouse_pos)
+        if hover:
             pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_HAND) # Change cursor to pointer
         else:
             pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_ARROW)
-
-        pygame.draw.rect(self.screen, button_color, self.new_game_button_rect, border_radius=5)
-        
-        text_x = btn_x + (btn_width - button_label.get_width()) // 2
-        text_y = btn_y + (btn_height - button_label.get_height()) // 2
-        self.screen.blit(button_label, (text_x, text_y))
+        self.screen.blit(self._button_faces[hover], self.new_game_button_rect)
 
         pygame.display.flip()
         self.clock.tick(10)
         
         return clicked
 
+    def draw_stats_overlay(self, game) -> Optional[pygame.Rect]:
+        """Draws the latest telemetry record in a translucent box. Returns the area it covered."""
+        record = game.telemetry.latest() if game.telemetry is not None else None
+        if record is None:
+            return None
+
+        lines = [
+            f"turn {record['turn']}  step {record['step_ms']:.2f} ms",
+            f"human {record['human_ms']:.2f} ms  zombie {record['zombie_ms']:.2f} ms",
+            f"searches {record['searches']}  expanded {record['nodes_expanded']}",
+            f"pushed {record['nodes_pushed']}  heap peak {record['heap_peak']}",
+            f"fallback moves {record['fallback_moves']}",
+        ]
+        labels = [self.text(self.small_font, line, UI_COLORS['TEXT']) for line in lines]
+        width = max(label.get_width() for label in labels) + 12
+        height = sum(label.get_height() for label in labels) + 12
+
+        # The box only grows, so it is reallocated a handful of times per session at most
+        box = self._stats_box
+        if box is None or box.get_width() < width or box.get_height() < height:
+            box = pygame.Surface((max(width, box.get_width() if box else 0),
+                                  max(height, box.get_height() if box else 0))).convert()
+            box.set_alpha(190)
+            box.fill(UI_COLORS['INFO_BAR'])
+            self._stats_box = box
+        rect = self.screen.blit(box, (4, 4), (0, 0, width, height))
+        y = 10
+        for label in labels:
+            self.screen.blit(label, (10, y))
+            y += label.get_height()
+        return rect
+
+    def held_direction(self) -> Optional[str]:
+        """Returns the move requested by the currently held key, if any."""
+        keys = pygame.key.get_pressed()
+        
+        # Player controlled movement
+        if keys[pygame.K_UP] or keys[pygame.K_w]:
+            return "up"
+        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
+            return "down"
+        elif keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            return "left"
+        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            return "right"
+        elif keys[pygame.K_SPACE]:
+            # Human AI mode (moves to safe zone avoiding zombies)
+            return "auto"
+        return None
+
+    def _tick(self, game, direction: str) -> bool:
+        """One simulation tick: human moves, then zombies chase. Returns False once the game is over."""
+        game.step(direction)
+        return not game.game_over
+
     def draw(self, game):
         """Handles input, updates game state, and draws the current frame."""
         
         if game.game_over:
+            # The overlay covers the whole map, so the next live frame must repaint everything
+            self._full_redraw = True
+
             # ... (Game over screen logic) ...
-            overlay = pygame.Surface((self.grid.width * CELL, self.grid.height * CELL))
-            overlay.set_alpha(150)
-            overlay.fill((0, 0, 0))
-            self.screen.blit(overlay, (0, 0))
+            self.ui_surfaces()
+            self.screen.blit(self._overlay, (0, 0))
             
             info_rect = pygame.Rect(0, self.grid.height * CELL, self.grid.width * CELL, 40)
             pygame.draw.rect(self.screen, UI_COLORS['INFO_BAR'], info_rect)
             
             result = " HUMANS WIN!" if game.humans else " ZOMBIES WIN!"
             win_color = UI_COLORS['HUMAN_WIN'] if game.humans else UI_COLORS['ZOMBIE_WIN']
-            label = self.font.render(result, True, win_color)
+            label = self.text(self.font, result, win_color)
             text_x = self.grid.width*CELL//2 - label.get_width()//2
             self.screen.blit(label, (text_x, self.grid.height * CELL + 10))
             
@@ -187,76 +369,88 @@ class Visualizer:
                 game.game_over = True
                 pygame.quit()
                 return
+            if event.type == pygame.KEYDOWN:
+                # Simulation speed controls
+                if event.key == pygame.K_TAB:
+                    self.autoplay = not self.autoplay
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    self.scheduler.faster()
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    self.scheduler.slower()
+                elif event.key == pygame.K_f:
+                    self.scheduler.toggle_fast_forward()
+                elif event.key == pygame.K_F3:
+                    self.show_stats = not self.show_stats
 
-        # ... (Movement logic remains the same) ...
-        keys = pygame.key.get_pressed()
-        moved = False
-        
-        # Player controlled movement
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            game.human_turn("up")
-            moved = True
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            game.human_turn("down")
-            moved = True
-        elif keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            game.human_turn("left")
-            moved = True
-        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            game.human_turn("right")
-            moved = True
-        elif keys[pygame.K_SPACE]:
-            # Human AI mode (moves to safe zone avoiding zombies)
-            game.human_turn("auto")
-            moved = True
+        # The stats overlay reads the game's telemetry ring buffer, so switch instrumentation on with it
+        if self.show_stats and game.telemetry is None:
+            game.telemetry = Telemetry()
 
-        # After human moves, zombies chase
-        if moved and not game.game_over:
-            time.sleep(0.1) # Slow down the game when a move is made
-            game.zombie_turn()
+        direction = self.held_direction()
+        if direction is None and self.autoplay:
+            direction = "auto"
+
+        # Game ticks run at the scheduler's rate, independently of how often we render
+        if direction:
+            self.scheduler.run(lambda: self._tick(game, direction))
+        else:
+            self.scheduler.pause()
             
         pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_ARROW) 
 
         # === DRAWING ===
-        self.screen.fill(UI_COLORS['BACKGROUND'])
+        if self._static_layer is None:
+            self._static_layer = self.build_static_layer()
 
-        # Draw grid cells (map features)
-        for x in range(self.grid.width):
-            for y in range(self.grid.height):
-                rect = pygame.Rect(x * CELL, y * CELL, CELL, CELL)
-                
-                # 1. Draw map features (Images/Fallbacks)
-                if (x, y) in self.grid.safe_zones:
-                    self.screen.blit(self.images['safe_zone'], rect)
-                elif (x, y) in self.grid.obstacles:
-                    self.screen.blit(self.images['obstacle'], rect)
-                
-                # 2. Draw grid lines (cleaner)
-                pygame.draw.rect(self.screen, UI_COLORS['GRID_LINE'], rect, 1)
+        if self._full_redraw:
+            self.screen.blit(self._static_layer, (0, 0))
+        else:
+            # Restore only what last frame drew over the static map
+            for rect in self._dirty_rects:
+                self.screen.blit(self._static_layer, rect, rect)
+
+        drawn: List[pygame.Rect] = []
 
         # NEW: Draw the shortest path line AFTER the map but BEFORE agents
         if not game.game_over:
-            self.draw_path(self.screen, game)
+            path_rect = self.draw_path(self.screen, game)
+            if path_rect is not None:
+                drawn.append(path_rect)
+
+        # 3. Draw agents (Images/Fallbacks), one Surface.blits batch per sprite
+        human_image = self.images['human']
+        drawn.extend(self.screen.blits([(human_image, (h.pos[0] * CELL, h.pos[1] * CELL))
+                                        for h in game.humans]))
 
-        # 3. Draw agents (Images/Fallbacks)
-        for h in game.humans:
-            pos = (h.pos[0] * CELL, h.pos[1] * CELL)
-            self.screen.blit(self.images['human'], pos)
+        # Zombie positions come straight from the agent store's arrays, not from each handle
+        zombie_image = self.images['zombie']
+        drawn.extend(self.screen.blits([(zombie_image, pos)
+                                        for pos in (game.zombie_positions() * CELL).tolist()]))
 
-        for z in game.zombies:
-            pos = (z.pos[0] * CELL, z.pos[1] * CELL)
-            self.screen.blit(self.images['zombie'], pos)
+        # Telemetry overlay (top-left), drawn over the map
+        if self.show_stats:
+            stats_rect = self.draw_stats_overlay(game)
+            if stats_rect is not None:
+                drawn.append(stats_rect)
 
         # 4. Bottom info bar
         info_rect = pygame.Rect(0, self.grid.height * CELL, self.grid.width * CELL, 40)
         pygame.draw.rect(self.screen, UI_COLORS['INFO_BAR'], info_rect)
+        drawn.append(info_rect)
 
         # Info text
-        text = f"Humans: {len(game.humans)} | Zombies: {len(game.zombies)} | Turn: {game.turn}"
-        label = self.font.render(text, True, UI_COLORS['TEXT'])
+        speed = "FF" if self.scheduler.fast_forward else f"x{self.scheduler.speed:g}"
+        text = f"Humans: {len(game.humans)} | Zombies: {len(game.zombies)} | Turn: {game.turn} | {speed}"
+        label = self.text(self.font, text, UI_COLORS['TEXT'])
         self.screen.blit(label, (10, self.grid.height * CELL + 10))
 
-        pygame.display.flip()
-        self.clock.tick(10)
+        if self._full_redraw:
+            pygame.display.flip()
+            self._full_redraw = False
+        else:
+            # Push only the regions that changed: last frame's rects (now cleared) and this frame's
+            pygame.display.update(self._dirty_rects + drawn)
+        self._dirty_rects = drawn
+        self.clock.tick(self.scheduler.render_rate)
 
         return False